@@ -0,0 +1,133 @@
+"""
+Per-chat turn serialization (chat actor model).
+
+Turns for one chat (tenant_id + chat_id) must run strictly one at a time and in
+arrival order: concurrent turns race on total_message_count, read different
+history snapshots and can answer out of order. Different chats stay fully parallel.
+
+Two layers:
+- In-process: an asyncio.Lock per chat key (FIFO wake-up order), created on demand
+  and dropped when no turn holds or waits for it.
+- Cross-process: a PostgreSQL transaction-level advisory lock on a dedicated
+  connection, so several API workers serialize the same chat too. Taken after the
+  in-process lock, so waiters in the same process don't each hold a DB connection.
+  Ending the transaction releases it - a cancelled turn or a connection that can't
+  be rolled back (invalidated, never returned to the pool) can't leave it held.
+
+Each turn holding the advisory lock uses one pooled connection for the whole turn
+on top of its own session, so the async pool (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+must cover 2 x WEBHOOK_WORKERS plus the outbox and background workers.
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict
+from sqlalchemy import text
+from storage.database import async_engine
+
+# Use a PostgreSQL advisory lock in addition to the in-process lock
+CHAT_ADVISORY_LOCK = os.getenv("CHAT_ADVISORY_LOCK", "true").lower() == "true"
+# Seconds to wait for another process's turn on the chat before running unserialized
+CHAT_ADVISORY_LOCK_TIMEOUT = float(os.getenv("CHAT_ADVISORY_LOCK_TIMEOUT", "120"))
+# Retry backoff while the advisory lock is held elsewhere
+ADVISORY_RETRY_MIN_SECONDS = 0.05
+ADVISORY_RETRY_MAX_SECONDS = 1.0
+
+
+class KeyedLock:
+    """asyncio locks keyed by string, removed once unused."""
+
+    def __init__(self):
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._users: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: str):
+        """Hold the lock for key (waiters are served in arrival order)."""
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        self._users[key] = self._users.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._users[key] -= 1
+            if self._users[key] == 0:
+                del self._users[key]
+                del self._locks[key]
+
+    def stats(self) -> dict:
+        """Number of chats with an active turn and turns waiting behind them."""
+        return {
+            "active_chats": len(self._locks),
+            "waiting_turns": sum(count - 1 for count in self._users.values()),
+        }
+
+
+_chat_locks = KeyedLock()
+
+
+def chat_key(tenant_id: str, chat_id: str) -> str:
+    """Lock key for a chat."""
+    return f"{tenant_id}:{chat_id}"
+
+
+async def _try_advisory_lock(conn, key: str) -> bool:
+    """Take the transaction-level advisory lock for key, retrying with backoff until the timeout."""
+    deadline = time.monotonic() + CHAT_ADVISORY_LOCK_TIMEOUT
+    delay = ADVISORY_RETRY_MIN_SECONDS
+    while True:
+        result = await conn.execute(text("SELECT pg_try_advisory_xact_lock(hashtextextended(:key, 0))"), {"key": key})
+        if result.scalar():
+            return True
+        left = deadline - time.monotonic()
+        if left <= 0:
+            return False
+        await asyncio.sleep(min(delay, left))
+        delay = min(delay * 2, ADVISORY_RETRY_MAX_SECONDS)
+
+
+@asynccontextmanager
+async def _advisory_lock(key: str):
+    """Hold a PostgreSQL advisory lock for key in a transaction on a dedicated connection."""
+    async with async_engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            if not await _try_advisory_lock(conn, key):
+                print(f"[Live][ChatLock] {key} | advisory lock not acquired in {CHAT_ADVISORY_LOCK_TIMEOUT:.0f}s, running without it")
+            yield
+        finally:
+            try:
+                # Nothing was written - rolling back just ends the transaction and its lock
+                await transaction.rollback()
+            except BaseException:
+                # Unknown state (cancelled or failed mid-rollback) - drop the connection
+                # instead of returning it to the pool with the lock possibly held
+                await conn.invalidate()
+                raise
+
+
+@asynccontextmanager
+async def chat_turn_lock(tenant_id: str, chat_id: str):
+    """
+    Serialize turns for one chat, within this process and across processes.
+
+    Usage:
+        async with chat_turn_lock(tenant_id, chat_id):
+            result = await process_message(...)
+            await adapter.send_message(...)
+    """
+    key = chat_key(tenant_id, str(chat_id))
+    async with _chat_locks.hold(key):
+        if CHAT_ADVISORY_LOCK:
+            async with _advisory_lock(key):
+                yield
+        else:
+            yield
+
+
+def get_chat_lock_stats() -> dict:
+    """In-process chat lock stats."""
+    return _chat_locks.stats()
@@ -0,0 +1,277 @@
+"""
+Fast path - answers simple catalog and price questions without an LLM call.
+
+"What do you have?" and "how much is the ribeye?" make up a large share of
+inbound traffic. When a tenant opts in (agent_settings.fast_path = true), the
+orchestrator tries this router first and answers straight from the cached
+TenantConfig.PRODUCTS with per-tenant templates. Anything it isn't confident
+about (extra wording, unknown or ambiguous product) falls back to the LLM.
+
+Per-tenant templates override the defaults per language:
+    agent_settings.fast_path_templates = {"he": {"price": "..."}, "en": {...}}
+Template fields: {company}, {currency}, {name}, {category}, {price}, {unit}, {description}
+"""
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Confidence required to answer a price question (see _match_product)
+MIN_PRICE_CONFIDENCE = 0.75
+# Max words in a message we try to answer - longer messages usually carry more than one ask
+MAX_QUESTION_WORDS = 10
+# Larger catalogs are better summarized by the LLM than listed in full
+MAX_CATALOG_ITEMS = 40
+
+DEFAULT_TEMPLATES = {
+    "en": {
+        "catalog_header": "Here's what we have at {company}:",
+        "catalog_category": "\n{category}:",
+        "catalog_item": "- {name}: {price} {currency} / {unit}",
+        "catalog_footer": "\nWhat would you like to order?",
+        "price": "{name} costs {price} {currency} per {unit}. How much would you like?",
+    },
+    "he": {
+        "catalog_header": "זה מה שיש לנו ב{company}:",
+        "catalog_category": "\n{category}:",
+        "catalog_item": "- {name}: {price} {currency} ל-{unit}",
+        "catalog_footer": "\nמה תרצו להזמין?",
+        "price": "המחיר של {name} הוא {price} {currency} ל-{unit}. כמה תרצו?",
+    },
+}
+
+# Whole-message catalog questions (after stripping greetings and punctuation)
+_CATALOG_PATTERNS = [
+    r"what (?:do|else do) you (?:have|sell|offer)(?: today)?",
+    r"what(?:'s| is) (?:available|on the menu|in stock)(?: today)?",
+    r"(?:can i |could i )?(?:see |get |have )?(?:the |your )?(?:menu|catalog|catalogue|price list|prices|products|product list)",
+    r"(?:send|show) (?:me )?(?:the |your )?(?:menu|catalog|catalogue|price list|prices|products)",
+    r"מה (?:יש|יש לכם|יש לך|יש היום|אתם מוכרים|אתה מוכר|את מוכרת|יש במלאי)",
+    r"(?:אפשר |תשלחו |תשלח |שלחו )?(?:לי )?(?:את )?(?:ה)?(?:תפריט|קטלוג|מחירון|מחירים|רשימת (?:ה)?מוצרים)",
+]
+
+# Price questions - the product name is captured
+_PRICE_PATTERNS = [
+    r"how much (?:is|are|does|do|for|is the|are the|for the|does the|do the) (?P<product>.+?)(?: cost| costs)?(?: per (?:kg|unit|piece))?",
+    r"(?:what(?:'s| is) the )?price (?:of|for) (?:the )?(?P<product>.+)",
+    r"(?P<product>.+?) price",
+    r"כמה (?:עולה|עולים|עולות|זה|יעלה) (?P<product>.+?)(?: לקילו| לק\"ג)?",
+    r"(?:מה )?(?:ה)?מחיר (?:של )?(?P<product>.+)",
+]
+
+_GREETING_RE = re.compile(
+    r"^(?:hi|hello|hey|good (?:morning|evening|afternoon)|היי|הי|שלום|בוקר טוב|ערב טוב|אהלן)[\s,!.]*",
+    re.IGNORECASE,
+)
+_TRAILING_RE = re.compile(r"^(.*?)(?:\s*(?:please|pls|בבקשה|thanks|thank you|תודה))?[\s?!.]*$", re.IGNORECASE)
+_HEBREW_RE = re.compile(r"[֐-׿]")
+_WORD_RE = re.compile(r"[\w֐-׿]+")
+_HEBREW_PREFIXES = "הובלמש"
+_FILLER_WORDS = {"the", "a", "an", "of", "for", "per", "kg", "your", "של", "את", "לקילו", "קילו"}
+
+
+@dataclass
+class FastPathAnswer:
+    """A deterministic reply and the intent that produced it."""
+    intent: str       # "catalog" or "price"
+    text: str
+    confidence: float
+
+
+class FastPathStats:
+    """Thread-safe hit/fallback counters (hits = LLM calls saved)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checked = 0
+        self.hits: Dict[str, int] = {"catalog": 0, "price": 0}
+        self.low_confidence = 0
+
+    def record(self, intent: Optional[str], low_confidence: bool = False) -> None:
+        with self._lock:
+            self.checked += 1
+            if intent:
+                self.hits[intent] += 1
+            elif low_confidence:
+                self.low_confidence += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            hits = sum(self.hits.values())
+            return {
+                "checked": self.checked,
+                "hits": dict(self.hits),
+                "llm_calls_saved": hits,
+                "low_confidence_fallbacks": self.low_confidence,
+                "hit_rate": round(hits / self.checked, 3) if self.checked else 0.0,
+            }
+
+
+_stats = FastPathStats()
+
+
+def get_fast_path_stats() -> dict:
+    """Fast-path counters since process start."""
+    return _stats.snapshot()
+
+
+def is_enabled(tenant_config) -> bool:
+    """Fast path is opt-in per tenant (agent_settings.fast_path)."""
+    return bool(tenant_config.SETTINGS.get("fast_path"))
+
+
+def _normalize(text: str) -> str:
+    """Lowercase, drop greetings and trailing politeness/punctuation."""
+    text = " ".join(text.strip().lower().split())
+    text = _GREETING_RE.sub("", text)
+    return _TRAILING_RE.match(text).group(1).strip(" ,")
+
+
+def _words(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def _word_matches(query_word: str, name_word: str) -> bool:
+    """Exact match, English plural, or Hebrew one-letter prefix (ה/ו/ב/ל/מ/ש)."""
+    if query_word == name_word or query_word.rstrip("s") == name_word.rstrip("s"):
+        return True
+    return (
+        len(query_word) > 2
+        and query_word[0] in _HEBREW_PREFIXES
+        and query_word[1:] == name_word
+    )
+
+
+def _match_product(query: str, products: List[dict]) -> Tuple[Optional[dict], float]:
+    """
+    Find the product a price question refers to.
+
+    Confidence weighs how much of the query is explained by the product name
+    (customers say "ribeye", not "Premium Ribeye Steak") over how much of the
+    name was mentioned. Ties between products mean the question is ambiguous
+    and confidence drops to 0. So does a partial name match made only of generic
+    words - a category ("beef" vs. Beef Sausages and a Ribeye in Beef) or words
+    that another product's name matches as well.
+    """
+    query_words = [w for w in _words(query) if w not in _FILLER_WORDS]
+    if not query_words:
+        return None, 0.0
+
+    scored = []
+    for product in products:
+        name_words = _words(product["name"])
+        if not name_words:
+            continue
+        name_matched = sum(1 for nw in name_words if any(_word_matches(qw, nw) for qw in query_words))
+        if not name_matched:
+            continue
+        matched_words = {qw for qw in query_words if any(_word_matches(qw, nw) for nw in name_words)}
+        score = 0.7 * len(matched_words) / len(query_words) + 0.3 * name_matched / len(name_words)
+        scored.append((score, product, matched_words, name_matched == len(name_words)))
+
+    if not scored:
+        return None, 0.0
+    scored.sort(key=lambda item: item[0], reverse=True)
+    best_score, best, best_words, full_name = scored[0]
+    if len(scored) > 1 and scored[1][0] >= best_score:
+        return None, 0.0
+
+    if not full_name:
+        # Only part of the name was said - make sure those words single out this product
+        category_words = {w for p in products for w in _words(p.get("category") or "")}
+        if all(any(_word_matches(qw, cw) for cw in category_words) for qw in best_words):
+            return None, 0.0
+        if any(best_words <= words for _, _, words, _ in scored[1:]):
+            return None, 0.0
+    return best, max(best_score, 0.0)
+
+
+def _format_price(price: float) -> str:
+    return f"{price:g}" if float(price).is_integer() else f"{price:.2f}"
+
+
+def _templates(tenant_config, language: str) -> dict:
+    """Default templates for the language, overlaid with the tenant's own."""
+    templates = dict(DEFAULT_TEMPLATES[language])
+    custom = tenant_config.SETTINGS.get("fast_path_templates") or {}
+    templates.update(custom.get(language) or {})
+    return templates
+
+
+def _product_fields(tenant_config, product: dict) -> dict:
+    return {
+        "company": tenant_config.COMPANY_NAME,
+        "currency": tenant_config.CURRENCY,
+        "name": product["name"],
+        "category": product["category"],
+        "price": _format_price(product["price"]),
+        "unit": product["unit"],
+        "description": product["description"],
+    }
+
+
+def _render_catalog(tenant_config, templates: dict) -> str:
+    lines = [templates["catalog_header"].format(company=tenant_config.COMPANY_NAME)]
+    current_category = None
+    for product in sorted(tenant_config.PRODUCTS, key=lambda p: (p["category"], p["name"])):
+        if product["category"] != current_category:
+            current_category = product["category"]
+            lines.append(templates["catalog_category"].format(category=current_category))
+        lines.append(templates["catalog_item"].format(**_product_fields(tenant_config, product)))
+    lines.append(templates["catalog_footer"].format(company=tenant_config.COMPANY_NAME))
+    return "\n".join(lines)
+
+
+def _answer(tenant_config, message: str) -> Tuple[Optional[FastPathAnswer], bool]:
+    """
+    Returns:
+        (answer or None, whether a catalog/price intent was seen but not answered)
+    """
+    text = _normalize(message)
+    if not text or len(text.split()) > MAX_QUESTION_WORDS:
+        return None, False
+
+    language = "he" if _HEBREW_RE.search(text) else "en"
+    templates = _templates(tenant_config, language)
+
+    for pattern in _CATALOG_PATTERNS:
+        if re.fullmatch(pattern, text):
+            if len(tenant_config.PRODUCTS) > MAX_CATALOG_ITEMS:
+                return None, True
+            return FastPathAnswer("catalog", _render_catalog(tenant_config, templates), 1.0), False
+
+    for pattern in _PRICE_PATTERNS:
+        match = re.fullmatch(pattern, text)
+        if not match:
+            continue
+        product, confidence = _match_product(match.group("product"), tenant_config.PRODUCTS)
+        if product is None or confidence < MIN_PRICE_CONFIDENCE:
+            return None, True
+        reply = templates["price"].format(**_product_fields(tenant_config, product))
+        return FastPathAnswer("price", reply, confidence), False
+
+    return None, False
+
+
+def try_fast_path(tenant_config, user_messages: List[str]) -> Optional[FastPathAnswer]:
+    """
+    Answer a turn deterministically if it is a plain catalog or price lookup.
+
+    Only single-message turns are considered (a burst usually says more).
+    Returns None to fall back to the LLM.
+    """
+    if not is_enabled(tenant_config) or not tenant_config.PRODUCTS:
+        return None
+    if len(user_messages) != 1:
+        _stats.record(None)
+        return None
+
+    try:
+        answer, low_confidence = _answer(tenant_config, user_messages[0])
+    except (KeyError, IndexError, ValueError) as e:
+        # Broken tenant template - never fail the turn over it
+        print(f"[Live][FastPath] template error: {e}")
+        answer, low_confidence = None, True
+
+    _stats.record(answer.intent if answer else None, low_confidence)
+    return answer
@@ -0,0 +1,160 @@
+"""
+Hedged LLM calls - bound the tail latency of live turns.
+
+Each live turn gets a deadline. Every LLM call of the turn starts on the
+turn's model; if it hasn't finished (or, when streaming, hasn't produced any
+text) after the hedge delay, a second request goes to the fallback model and
+whichever finishes first is used - the loser is cancelled. When the deadline
+passes with no answer, LLMDeadlineError is raised and the turn gets the
+canned degraded reply. Once a mutating tool (create_order, ...) has committed,
+the orchestrator drops the deadline for the turn's remaining calls, so the
+customer isn't told to retry an order that already exists.
+
+Settings (env defaults, per tenant in agent_settings):
+    hedge_delay_seconds      - 0 disables hedging
+    turn_deadline_seconds    - 0 disables the deadline
+    models.fallback          - fallback model/max_tokens (see model_router)
+"""
+import os
+import asyncio
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+from agent.llm_gateway import LLMUnavailableError
+from agent.model_router import ModelTier
+
+HEDGE_DELAY_SECONDS = float(os.getenv("AGENT_HEDGE_DELAY_SECONDS", "10"))
+TURN_DEADLINE_SECONDS = float(os.getenv("AGENT_TURN_DEADLINE_SECONDS", "45"))
+
+
+class LLMDeadlineError(LLMUnavailableError):
+    """No LLM answer before the turn's deadline."""
+
+
+class HedgeStats:
+    """Thread-safe hedge counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+
+    def record(self, hedged: bool = False, hedge_won: bool = False, deadline_exceeded: bool = False) -> None:
+        with self._lock:
+            self.calls += 1
+            self.hedged += int(hedged)
+            self.hedge_wins += int(hedge_won)
+            self.deadline_exceeded += int(deadline_exceeded)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "deadline_exceeded": self.deadline_exceeded,
+                "hedge_rate": round(self.hedged / self.calls, 3) if self.calls else 0.0,
+                "hedge_win_rate": round(self.hedge_wins / self.hedged, 3) if self.hedged else 0.0,
+            }
+
+
+hedge_stats = HedgeStats()
+
+
+def get_hedge_stats() -> dict:
+    return hedge_stats.snapshot()
+
+
+def get_hedge_delay(tenant_config) -> float:
+    value = tenant_config.SETTINGS.get("hedge_delay_seconds") if tenant_config else None
+    return float(value) if value is not None else HEDGE_DELAY_SECONDS
+
+
+def get_turn_deadline(tenant_config, start: float) -> Optional[float]:
+    """Monotonic deadline for a turn starting at `start`, or None if disabled."""
+    value = tenant_config.SETTINGS.get("turn_deadline_seconds") if tenant_config else None
+    seconds = float(value) if value is not None else TURN_DEADLINE_SECONDS
+    return start + seconds if seconds > 0 else None
+
+
+async def _cancel(tasks) -> None:
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def hedged_call(
+    call: Callable[[ModelTier, Optional[Callable[[str], Awaitable[None]]]], Awaitable],
+    primary: ModelTier,
+    fallback: Optional[ModelTier],
+    on_text: Optional[Callable[[str], Awaitable[None]]] = None,
+    hedge_delay: float = 0.0,
+    deadline: Optional[float] = None,
+):
+    """
+    Run call(primary, on_text), hedging with call(fallback, None) after hedge_delay.
+
+    Streamed text of the primary goes to on_text as it arrives; if the hedge
+    wins, on_text receives the hedge's complete text (a later call restarts the text).
+
+    Returns:
+        (response, tier that produced it)
+
+    Raises:
+        LLMDeadlineError: Nothing finished before the deadline
+        Exception: The primary's error if every attempt failed
+    """
+    state = {"hedge_won": False, "streamed": False}
+
+    async def primary_on_text(text: str) -> None:
+        state["streamed"] = True
+        if not state["hedge_won"]:
+            await on_text(text)
+
+    def remaining() -> Optional[float]:
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+    primary_task = asyncio.create_task(call(primary, primary_on_text if on_text else None))
+    tiers = {primary_task: primary}
+    hedge_task = None
+
+    try:
+        if fallback is not None and hedge_delay > 0:
+            left = remaining()
+            wait = hedge_delay if left is None else min(hedge_delay, left)
+            done, _ = await asyncio.wait({primary_task}, timeout=wait)
+            # Hedge only calls that haven't produced anything yet
+            if not done and not state["streamed"] and (left is None or left > hedge_delay):
+                hedge_task = asyncio.create_task(call(fallback, None))
+                tiers[hedge_task] = fallback
+                print(f"[Live][Hedge] {primary.model} slower than {hedge_delay:.1f}s, hedging with {fallback.model}")
+
+        pending = set(tiers)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                hedge_stats.record(hedged=hedge_task is not None, deadline_exceeded=True)
+                raise LLMDeadlineError("No LLM answer before the turn deadline")
+            for task in done:
+                if task.exception() is None:
+                    await _cancel(pending)
+                    hedge_won = task is hedge_task
+                    hedge_stats.record(hedged=hedge_task is not None, hedge_won=hedge_won)
+                    response = task.result()
+                    if hedge_won:
+                        state["hedge_won"] = True
+                        print(f"[Live][Hedge] {tiers[task].model} won")
+                        text = "".join(block.text for block in response.content if block.type == "text")
+                        if on_text and text:
+                            await on_text(text)
+                    return response, tiers[task]
+                if task is primary_task or error is None:
+                    error = task.exception()
+        hedge_stats.record(hedged=hedge_task is not None)
+        raise error
+    finally:
+        await _cancel([task for task in tiers if not task.done()])
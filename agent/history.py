@@ -0,0 +1,103 @@
+"""
+History assembler - picks which stored messages go into the LLM prompt.
+
+Instead of a fixed number of messages, history is filled newest to oldest
+until a token budget is spent, so a few pasted price lists can't blow up the
+prompt and short chats keep more context. Older messages are covered by the
+conversation summary.
+
+Token counts are local estimates (no API call), cached per message in
+messages.token_count.
+"""
+import os
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "6000"))
+HISTORY_MAX_MESSAGES = int(os.getenv("HISTORY_MAX_MESSAGES", "100"))  # Hard cap, whatever the budget
+
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and turn framing per message
+ASCII_CHARS_PER_TOKEN = 4.0
+NON_ASCII_CHARS_PER_TOKEN = 1.5  # Hebrew, Russian etc. tokenize much denser than English
+
+
+@dataclass
+class HistoryWindow:
+    """Messages selected for one turn and what they cost."""
+    messages: List[dict]              # Claude-formatted, alternating roles, starting with "user"
+    tokens: int                       # Estimated tokens of the selected messages
+    new_token_counts: Dict[int, int] = field(default_factory=dict)  # Estimates computed now (to cache)
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token estimate for a message - errs on the high side for non-Latin scripts."""
+    if not text:
+        return MESSAGE_OVERHEAD_TOKENS
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return MESSAGE_OVERHEAD_TOKENS + math.ceil(
+        ascii_chars / ASCII_CHARS_PER_TOKEN + non_ascii / NON_ASCII_CHARS_PER_TOKEN
+    )
+
+
+def get_history_budget(tenant_config) -> int:
+    """Per-tenant history budget (agent_settings.history_token_budget), or the default."""
+    budget = tenant_config.SETTINGS.get("history_token_budget") if tenant_config else None
+    return int(budget) if budget else HISTORY_TOKEN_BUDGET
+
+
+def assemble_history(messages: Sequence, token_budget: int) -> HistoryWindow:
+    """
+    Select the newest messages that fit in token_budget.
+
+    The newest message is always included, even if it alone exceeds the budget.
+    The result starts with a user message and alternates roles - consecutive
+    messages with the same role (e.g., a burst of user messages) are merged.
+
+    Args:
+        messages: Conversation messages, oldest first - anything with .id, .role,
+            .content and .token_count (Message rows from get_recent_history)
+        token_budget: Max estimated tokens for the selected history
+
+    Returns:
+        HistoryWindow with the selected messages, their token estimate, and any
+        token counts that were computed now and should be cached
+    """
+    new_token_counts: Dict[int, int] = {}
+    selected: List[tuple] = []
+    used = 0
+
+    for message in reversed(messages):
+        if len(selected) >= HISTORY_MAX_MESSAGES:
+            break
+        tokens = message.token_count
+        if tokens is None:
+            tokens = estimate_tokens(message.content)
+            if message.id is not None:
+                new_token_counts[message.id] = tokens
+        if selected and used + tokens > token_budget:
+            break
+        selected.append((message.role, message.content, tokens))
+        used += tokens
+
+    selected.reverse()
+
+    # Claude requires the first message to come from the user
+    while selected and selected[0][0] != "user":
+        selected.pop(0)
+
+    history: List[dict] = []
+    total = 0
+    for role, content, tokens in selected:
+        total += tokens
+        if history and history[-1]["role"] == role:
+            history[-1]["content"] += "\n\n" + content
+        else:
+            history.append({"role": role, "content": content})
+
+    return HistoryWindow(
+        messages=history,
+        tokens=total,
+        new_token_counts=new_token_counts,
+    )
@@ -0,0 +1,111 @@
+"""
+Background job definitions - what the live path enqueues and how each job runs.
+
+The live path only inserts a row into background_jobs (see AsyncJobRepository);
+agent/worker.py claims and executes the rows. Handlers take the stored JSON
+payload and must be safe to retry: they re-read state from the database
+instead of trusting what the live path saw at enqueue time.
+"""
+from typing import Awaitable, Callable, Dict
+from sqlalchemy.ext.asyncio import AsyncSession
+from agent.summarizer import summarize_and_save
+from agent.profile_extractor import extract_and_save as extract_and_save_profile
+from agent.memory_updater import update_memory
+from storage.repositories import AsyncJobRepository
+
+# Job types
+SUMMARIZE_CONVERSATION = "summarize_conversation"
+EXTRACT_PROFILE = "extract_profile"
+UPDATE_MEMORY = "update_memory"  # Summary + profile in one LLM call, when both are due
+
+# Lower runs first. Summaries feed the next prompt, so they go before profile updates.
+SUMMARY_PRIORITY = 10
+PROFILE_PRIORITY = 20
+
+
+def conversation_key(conversation_id: int) -> str:
+    """
+    Dedup key shared by the summary and memory-update jobs of a conversation.
+
+    Both write the summary, so at most one of them is queued or running per
+    conversation - they can't overwrite each other's writes.
+    """
+    return f"conversation:{conversation_id}"
+
+
+async def enqueue_summary(db: AsyncSession, conversation_id: int, customer_id: int, total_msgs: int) -> None:
+    """Queue a conversation summary update (skipped while one is already queued or running)."""
+    await AsyncJobRepository(db).enqueue(
+        SUMMARIZE_CONVERSATION,
+        {"conversation_id": conversation_id, "customer_id": customer_id, "total_msgs": total_msgs},
+        priority=SUMMARY_PRIORITY,
+        dedup_key=conversation_key(conversation_id),
+    )
+
+
+async def enqueue_profile_extraction(db: AsyncSession, tenant_id: str, chat_id: str) -> None:
+    """Queue a customer profile extraction (history is loaded when the job runs)."""
+    await AsyncJobRepository(db).enqueue(
+        EXTRACT_PROFILE,
+        {"tenant_id": tenant_id, "chat_id": chat_id},
+        priority=PROFILE_PRIORITY,
+    )
+
+
+async def enqueue_memory_update(
+    db: AsyncSession,
+    tenant_id: str,
+    chat_id: str,
+    conversation_id: int,
+    customer_id: int,
+    total_msgs: int
+) -> None:
+    """
+    Queue a combined summary + profile update.
+
+    While a summary job of the conversation is queued or running, only the
+    profile extraction is queued (that job covers the summary).
+    """
+    job_id = await AsyncJobRepository(db).enqueue(
+        UPDATE_MEMORY,
+        {
+            "tenant_id": tenant_id,
+            "chat_id": chat_id,
+            "conversation_id": conversation_id,
+            "customer_id": customer_id,
+            "total_msgs": total_msgs,
+        },
+        priority=SUMMARY_PRIORITY,
+        dedup_key=conversation_key(conversation_id),
+    )
+    if job_id is None:
+        await enqueue_profile_extraction(db, tenant_id, chat_id)
+
+
+async def _run_summary(payload: dict) -> None:
+    await summarize_and_save(
+        payload["conversation_id"],
+        payload["customer_id"],
+        payload["total_msgs"],
+    )
+
+
+async def _run_profile_extraction(payload: dict) -> None:
+    await extract_and_save_profile(payload["tenant_id"], payload["chat_id"])
+
+
+async def _run_memory_update(payload: dict) -> None:
+    await update_memory(
+        payload["tenant_id"],
+        payload["chat_id"],
+        payload["conversation_id"],
+        payload["customer_id"],
+        payload["total_msgs"],
+    )
+
+
+JOB_HANDLERS: Dict[str, Callable[[dict], Awaitable[None]]] = {
+    SUMMARIZE_CONVERSATION: _run_summary,
+    EXTRACT_PROFILE: _run_profile_extraction,
+    UPDATE_MEMORY: _run_memory_update,
+}
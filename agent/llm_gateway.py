@@ -0,0 +1,320 @@
+"""
+LLM gateway - the one Anthropic client shared by live and background traffic.
+
+Owns a single AsyncAnthropic client over a pooled httpx connection pool with
+explicit connect/read timeouts. The SDK's own retries are disabled; calls
+retry here on 429/529/5xx, timeouts and connection errors with jittered
+exponential backoff (honoring retry-after). A circuit breaker counts provider
+failures (5xx/529, timeouts, connection errors - a 429 only means "slow down"
+and is just backed off) and, once open, fails calls immediately with
+LLMUnavailableError so the live path can answer with DEGRADED_REPLY instead
+of piling up on a degraded provider.
+
+Usage:
+    response = await create_message(model=..., max_tokens=..., messages=...)
+    async with stream_message(model=..., ...) as stream: ...
+"""
+import os
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+import httpx
+from anthropic import (
+    AsyncAnthropic,
+    APIConnectionError,
+    APIStatusError,
+    RateLimitError,
+)
+from agent.llm_scheduler import scheduler, LIVE
+
+ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL") or None  # e.g., a local fake for load tests
+
+# Connection pool and timeouts
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "60"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "50"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "20"))
+
+# Retries (429 rate limited, 529 overloaded, 5xx, timeouts, connection errors)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+
+# Circuit breaker
+LLM_BREAKER_FAILURE_THRESHOLD = int(os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# Sent to customers while the provider is unavailable (per tenant: agent_settings.degraded_reply)
+DEGRADED_REPLY = "Sorry, we're getting a lot of messages right now. Please try again in a few minutes."
+
+
+class LLMUnavailableError(Exception):
+    """The provider is degraded: the breaker is open or retries were exhausted."""
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, APIConnectionError):  # Includes APITimeoutError
+        return True
+    if isinstance(error, RateLimitError):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500  # 529 overloaded, 5xx
+
+
+def _is_breaker_failure(error: Exception) -> bool:
+    """Retryable errors that say the provider is unhealthy (rate limiting doesn't)."""
+    return _is_retryable(error) and not isinstance(error, RateLimitError)
+
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """Full-jitter exponential backoff; a server retry-after (capped) takes precedence."""
+    response = getattr(error, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), LLM_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    return random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed: calls pass; LLM_BREAKER_FAILURE_THRESHOLD consecutive failures open it.
+    open: calls fail fast until LLM_BREAKER_RESET_SECONDS have passed.
+    half-open: one probe call is let through; success closes, failure re-opens.
+    A probe that ends without a verdict (cancelled) frees the slot for the next call.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, name: str = "LLM"):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self.times_opened = 0
+        self.short_circuited = 0
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def admit(self) -> Optional[str]:
+        """Admit a call: "closed" (normal call), "probe" (the half-open trial call) or None (refused)."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return "closed"
+            if state == "half-open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return "probe"
+            self.short_circuited += 1
+            return None
+
+    def allow(self) -> bool:
+        """Whether a call may go out now."""
+        return self.admit() is not None
+
+    def release_probe(self) -> None:
+        """The probe ended without a verdict (e.g., cancelled) - let the next call probe instead."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            probe_failed = self._probe_in_flight
+            self._probe_in_flight = False
+            if probe_failed or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self.times_opened += 1
+                self._opened_at = time.monotonic()
+                print(f"[{self.name}] Circuit breaker OPEN after {self._failures} failures")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened,
+                "short_circuited": self.short_circuited,
+            }
+
+
+breaker = CircuitBreaker(LLM_BREAKER_FAILURE_THRESHOLD, LLM_BREAKER_RESET_SECONDS)
+
+_http_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+    limits=httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE,
+    ),
+)
+
+# Single shared client - retries are handled by this module, not the SDK
+client = AsyncAnthropic(
+    api_key=ANTHROPIC_API_KEY,
+    base_url=ANTHROPIC_BASE_URL,
+    max_retries=0,
+    http_client=_http_client,
+)
+
+# Counters
+_stats = {"calls": 0, "retries": 0, "failures": 0}
+
+
+def _before_call() -> bool:
+    """Admit a call through the breaker. Returns True if the call is the half-open probe."""
+    admitted = breaker.admit()
+    if admitted is None:
+        raise LLMUnavailableError("LLM circuit breaker is open")
+    _stats["calls"] += 1
+    return admitted == "probe"
+
+
+async def _backoff_or_raise(attempt: int, error: Exception) -> None:
+    """After a retryable failure: sleep before the next attempt, or give up."""
+    if _is_breaker_failure(error):
+        breaker.record_failure()
+    if attempt >= LLM_MAX_RETRIES or breaker.state == "open":
+        _stats["failures"] += 1
+        raise LLMUnavailableError(f"LLM unavailable: {type(error).__name__}: {error}") from error
+    delay = _retry_delay(attempt, error)
+    _stats["retries"] += 1
+    print(f"[LLM] {type(error).__name__} - retry {attempt + 1}/{LLM_MAX_RETRIES} in {delay:.2f}s")
+    await asyncio.sleep(delay)
+
+
+async def create_message(lane: str = LIVE, tenant_id: Optional[str] = None, **kwargs):
+    """
+    messages.create through the shared client, with retries and the breaker.
+
+    Every attempt first waits for rate-limit capacity in the scheduler lane
+    (live, tool_followup or background) on behalf of tenant_id.
+
+    Raises:
+        LLMUnavailableError: Breaker open, or retryable failures exhausted
+        anthropic.APIError: Non-retryable errors (e.g., 400 bad request)
+    """
+    probe = _before_call()
+    cost = scheduler.estimate_cost(kwargs)
+    attempt = 0
+    granted = False  # A scheduler grant not yet settled with real usage
+    try:
+        while True:
+            await scheduler.acquire(cost, lane, tenant_id)
+            granted = True
+            try:
+                response = await client.messages.create(**kwargs)
+            except Exception as e:
+                granted = False
+                scheduler.refund(cost)
+                if not _is_retryable(e):
+                    # The provider answered - a bad request says nothing about its health
+                    probe = False
+                    breaker.record_success()
+                    raise
+                if _is_breaker_failure(e):
+                    probe = False  # Verdict recorded in _backoff_or_raise (a 429 keeps probing)
+                await _backoff_or_raise(attempt, e)
+                attempt += 1
+                continue
+            probe = False
+            breaker.record_success()
+            granted = False
+            scheduler.settle(cost, getattr(response, "usage", None))
+            return response
+    finally:
+        # Cancelled (deadline, lost hedge) before the probe got a verdict / the call reported usage
+        if probe:
+            breaker.release_probe()
+        if granted:
+            scheduler.refund(cost)
+
+
+@asynccontextmanager
+async def stream_message(lane: str = LIVE, tenant_id: Optional[str] = None, **kwargs):
+    """
+    messages.stream through the shared client (scheduled like create_message).
+
+    Opening the stream is retried like create_message; once events have been
+    received, a failure propagates (partial output may have been shown).
+    """
+    probe = _before_call()
+    cost = scheduler.estimate_cost(kwargs)
+    attempt = 0
+    granted = False  # A scheduler grant not yet settled with real usage
+    try:
+        while True:
+            await scheduler.acquire(cost, lane, tenant_id)
+            granted = True
+            manager = client.messages.stream(**kwargs)
+            try:
+                stream = await manager.__aenter__()
+            except Exception as e:
+                granted = False
+                scheduler.refund(cost)
+                if not _is_retryable(e):
+                    probe = False
+                    breaker.record_success()
+                    raise
+                if _is_breaker_failure(e):
+                    probe = False  # Verdict recorded in _backoff_or_raise (a 429 keeps probing)
+                await _backoff_or_raise(attempt, e)
+                attempt += 1
+                continue
+            break
+
+        try:
+            yield stream
+        except BaseException as e:
+            await manager.__aexit__(type(e), e, e.__traceback__)
+            if isinstance(e, Exception) and _is_breaker_failure(e):
+                probe = False
+                breaker.record_failure()
+                _stats["failures"] += 1
+            raise
+        else:
+            await manager.__aexit__(None, None, None)
+            probe = False
+            breaker.record_success()
+            granted = False
+            snapshot = getattr(stream, "current_message_snapshot", None)
+            scheduler.settle(cost, getattr(snapshot, "usage", None))
+    finally:
+        # Cancelled (deadline, lost hedge) or failed in the caller before the probe got a verdict /
+        # the stream reported usage
+        if probe:
+            breaker.release_probe()
+        if granted:
+            scheduler.refund(cost)
+
+
+def degraded_reply(tenant_config=None) -> str:
+    """Canned reply while the LLM is unavailable (tenant override if set)."""
+    if tenant_config is not None:
+        custom = tenant_config.SETTINGS.get("degraded_reply")
+        if custom:
+            return custom
+    return DEGRADED_REPLY
+
+
+def get_llm_gateway_stats() -> dict:
+    """Call/retry counters and breaker state."""
+    return {**_stats, "breaker": breaker.snapshot()}
@@ -0,0 +1,264 @@
+"""
+LLM scheduler - priority token buckets in front of every LLM call.
+
+Live turns, tool follow-ups and background jobs share one Anthropic rate
+limit. Every call first acquires capacity from three token buckets (requests,
+input tokens, output tokens per minute) through a scheduler with lanes:
+
+    tool_followup  - next call of a turn already in progress (served first)
+    live           - first call of a customer turn
+    background     - summaries and profile extraction (served last, and only
+                     while the buckets are above BACKGROUND_RESERVE)
+
+Within a lane, tenants are served round-robin so one busy tenant can't starve
+the others. Costs are estimates (prompt size, expected output); the real usage
+reported by the API is settled afterwards, and calls that report none (failed,
+cancelled) get their token estimate refunded.
+
+Limits are per process and default to 0 (unlimited) - set them to your
+organization's rate limits divided by the number of API/worker processes.
+"""
+import os
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Optional
+from agent.history import estimate_tokens
+
+TOOL_FOLLOWUP = "tool_followup"
+LIVE = "live"
+BACKGROUND = "background"
+LANES = (TOOL_FOLLOWUP, LIVE, BACKGROUND)  # Priority order
+
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_INPUT_TOKENS_PER_MINUTE = float(os.getenv("LLM_INPUT_TOKENS_PER_MINUTE", "0"))
+LLM_OUTPUT_TOKENS_PER_MINUTE = float(os.getenv("LLM_OUTPUT_TOKENS_PER_MINUTE", "0"))
+# Background calls wait while any bucket is below this share of its capacity (headroom for live traffic)
+BACKGROUND_RESERVE = float(os.getenv("LLM_BACKGROUND_RESERVE", "0.3"))
+# Expected output tokens when reserving (capped by max_tokens); settled with real usage afterwards
+OUTPUT_TOKENS_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKENS_ESTIMATE", "300"))
+
+
+class TokenBucket:
+    """Refills continuously at rate_per_minute up to capacity (default: one minute's worth). 0 = unlimited."""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.capacity = rate_per_minute if capacity is None or rate_per_minute <= 0 else capacity
+        self.rate = rate_per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.capacity <= 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, cost: float, reserve: float = 0.0) -> float:
+        """Seconds until `cost` can be taken while keeping `reserve` (share of capacity) untouched."""
+        if self.unlimited:
+            return 0.0
+        self._refill()
+        # A single call larger than the bucket waits for a full bucket, then goes into debt.
+        # The reserve shrinks for large calls - needing more than a full bucket would never be met.
+        needed = min(min(cost, self.capacity) + reserve * self.capacity, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+    def take(self, cost: float) -> None:
+        if not self.unlimited:
+            self._refill()
+            self.level -= cost
+
+    def settle(self, estimated: float, actual: float) -> None:
+        """Correct an earlier take() with the real cost."""
+        if not self.unlimited:
+            self._refill()
+            self.level = min(self.capacity, self.level + estimated - actual)
+
+
+@dataclass
+class CallCost:
+    """Estimated cost of one LLM call."""
+    input_tokens: int
+    output_tokens: int
+
+
+@dataclass
+class _Waiter:
+    cost: CallCost
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class LaneStats:
+    def __init__(self):
+        self.granted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class LLMScheduler:
+    """Grants LLM calls by lane priority and per-tenant round-robin, within the token buckets."""
+
+    def __init__(self, requests_per_minute: float, input_tpm: float, output_tpm: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.input_tokens = TokenBucket(input_tpm)
+        self.output_tokens = TokenBucket(output_tpm)
+        # lane -> tenant -> waiters (OrderedDict order is the round-robin order)
+        self._lanes: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {lane: OrderedDict() for lane in LANES}
+        self._stats: Dict[str, LaneStats] = {lane: LaneStats() for lane in LANES}
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lock = threading.Lock()  # Stats snapshot may be read from another thread
+
+    @property
+    def unlimited(self) -> bool:
+        return self.requests.unlimited and self.input_tokens.unlimited and self.output_tokens.unlimited
+
+    def estimate_cost(self, request: dict) -> CallCost:
+        """Estimate tokens of a messages.create request (prompt size + expected output)."""
+        prompt = json.dumps(
+            [request.get("system"), request.get("messages"), request.get("tools")],
+            ensure_ascii=False,
+            default=str,
+        )
+        max_tokens = int(request.get("max_tokens") or OUTPUT_TOKENS_ESTIMATE)
+        return CallCost(
+            input_tokens=estimate_tokens(prompt),
+            output_tokens=min(max_tokens, OUTPUT_TOKENS_ESTIMATE),
+        )
+
+    async def acquire(self, cost: CallCost, lane: str = LIVE, tenant_id: Optional[str] = None) -> None:
+        """Wait until this call may go out."""
+        lane = lane if lane in self._lanes else LIVE
+        if self.unlimited:
+            self._record_grant(lane, 0.0)
+            return
+
+        waiter = _Waiter(cost=cost, future=asyncio.get_running_loop().create_future())
+        self._lanes[lane].setdefault(tenant_id or "_", deque()).append(waiter)
+        self._pump()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if not waiter.future.done() or waiter.future.cancelled():
+                self._remove(lane, tenant_id or "_", waiter)
+            else:
+                # Granted, then cancelled before the call went out
+                self.refund(cost, request=True)
+            raise
+
+    def settle(self, cost: CallCost, usage) -> None:
+        """Replace the estimate with the usage the API reported."""
+        if usage is None or self.unlimited:
+            return
+        self.input_tokens.settle(cost.input_tokens, getattr(usage, "input_tokens", 0) or 0)
+        self.output_tokens.settle(cost.output_tokens, getattr(usage, "output_tokens", 0) or 0)
+
+    def refund(self, cost: CallCost, request: bool = False) -> None:
+        """Give back the token estimate of a granted call that reported no usage (and its request slot if it never went out)."""
+        if self.unlimited:
+            return
+        if request:
+            self.requests.settle(1, 0)
+        self.input_tokens.settle(cost.input_tokens, 0)
+        self.output_tokens.settle(cost.output_tokens, 0)
+        self._pump()
+
+    def _remove(self, lane: str, tenant: str, waiter: _Waiter) -> None:
+        queue = self._lanes[lane].get(tenant)
+        if queue and waiter in queue:
+            queue.remove(waiter)
+            if not queue:
+                del self._lanes[lane][tenant]
+        self._pump()
+
+    def _wait_time(self, cost: CallCost, reserve: float) -> float:
+        return max(
+            self.requests.wait_time(1, reserve),
+            self.input_tokens.wait_time(cost.input_tokens, reserve),
+            self.output_tokens.wait_time(cost.output_tokens, reserve),
+        )
+
+    def _pump(self) -> None:
+        """Grant waiting calls in priority order until the buckets run dry."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        while True:
+            lane, tenant = self._next_waiter()
+            if lane is None:
+                return
+            tenants = self._lanes[lane]
+            waiter = tenants[tenant][0]
+            reserve = BACKGROUND_RESERVE if lane == BACKGROUND else 0.0
+            wait = self._wait_time(waiter.cost, reserve)
+            if wait > 0:
+                # Head of the highest lane must wait - lower lanes wait behind it
+                self._timer = asyncio.get_running_loop().call_later(wait, self._pump)
+                return
+
+            tenants[tenant].popleft()
+            # Round-robin: the served tenant goes to the back of its lane
+            if tenants[tenant]:
+                tenants.move_to_end(tenant)
+            else:
+                del tenants[tenant]
+
+            if waiter.future.done():
+                continue  # Cancelled while waiting
+            self.requests.take(1)
+            self.input_tokens.take(waiter.cost.input_tokens)
+            self.output_tokens.take(waiter.cost.output_tokens)
+            self._record_grant(lane, time.monotonic() - waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+    def _next_waiter(self):
+        for lane in LANES:
+            tenants = self._lanes[lane]
+            if tenants:
+                return lane, next(iter(tenants))
+        return None, None
+
+    def _record_grant(self, lane: str, waited: float) -> None:
+        with self._lock:
+            stats = self._stats[lane]
+            stats.granted += 1
+            stats.total_wait += waited
+            stats.max_wait = max(stats.max_wait, waited)
+
+    def stats(self) -> dict:
+        """Lane queue depths, grants and wait times, bucket levels."""
+        with self._lock:
+            lanes = {}
+            for lane in LANES:
+                stats = self._stats[lane]
+                lanes[lane] = {
+                    "depth": sum(len(q) for q in list(self._lanes[lane].values())),
+                    "tenants_waiting": len(self._lanes[lane]),
+                    "granted": stats.granted,
+                    "avg_wait_seconds": round(stats.total_wait / stats.granted, 3) if stats.granted else 0.0,
+                    "max_wait_seconds": round(stats.max_wait, 3),
+                }
+        buckets = {}
+        for name, bucket in (("requests", self.requests), ("input_tokens", self.input_tokens), ("output_tokens", self.output_tokens)):
+            buckets[name] = None if bucket.unlimited else {
+                "per_minute": bucket.capacity,
+                "available": round(bucket.level, 1),
+            }
+        return {"lanes": lanes, "buckets": buckets}
+
+
+scheduler = LLMScheduler(LLM_REQUESTS_PER_MINUTE, LLM_INPUT_TOKENS_PER_MINUTE, LLM_OUTPUT_TOKENS_PER_MINUTE)
+
+
+def get_llm_scheduler_stats() -> dict:
+    return scheduler.stats()
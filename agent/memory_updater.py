@@ -0,0 +1,160 @@
+"""
+Memory updater - conversation summary and profile extraction in one LLM call.
+
+Summaries run every MESSAGE_BATCH_SIZE messages and profile extraction every
+EXTRACT_EVERY messages, so on some turns both are due over mostly the same
+messages. Instead of two Haiku calls (and two history reads), this builds one
+prompt and parses one JSON result holding both the updated summary and the
+extracted profile fields. Results are saved through the same repository
+methods as the standalone pipelines.
+"""
+import json
+from typing import List, Optional, Tuple
+from agent.llm_gateway import create_message
+from agent.llm_scheduler import BACKGROUND
+from agent.summarizer import generate_conversation_summary, get_messages_to_summarize, should_summarize, MEMORY_SIZE
+from agent.profile_extractor import (
+    ExtractedProfile,
+    PROFILE_FIELD_RULES,
+    extract_and_save as extract_and_save_profile,
+    get_existing_profile,
+    format_existing_profile,
+    format_messages_for_prompt,
+    parse_json_response,
+    profile_from_dict,
+    save_profile,
+)
+from storage.database import AsyncSessionLocal
+from storage.repositories import AsyncConversationRepository, AsyncCustomerRepository
+
+
+def _build_memory_prompt(
+    messages: List[dict],
+    existing_summary: Optional[str],
+    existing_profile: dict
+) -> str:
+    """Build the combined summary + profile prompt."""
+    conversation_text = format_messages_for_prompt(messages)
+    existing_info = format_existing_profile(existing_profile)
+    previous_summary = f"PREVIOUS SUMMARY:\n{existing_summary}\n\n" if existing_summary else ""
+
+    return f"""You maintain the memory of a sales conversation: a running summary and the customer's profile.
+The messages are labeled [CUSTOMER] and [AGENT].
+
+{previous_summary}{existing_info}NEW MESSAGES:
+{conversation_text}
+
+1. "summary": {"An updated summary that incorporates the new messages into the previous summary" if existing_summary else "A summary of the conversation"}. It should:
+- Capture key customer information (name, preferences, requests)
+- Note any orders discussed or placed
+- Record important decisions or commitments made
+- Track any pending questions or open items
+Keep it concise (3-5 sentences max). Focus on facts useful for continuing the conversation.
+
+2. "profile": Customer profile information. Only extract information about the CUSTOMER (not the agent/business), mostly from the latest messages.
+{PROFILE_FIELD_RULES}
+
+Respond with valid JSON only, in this shape:
+{{"summary": "...", "profile": {{"name": null, "phone": null, "email": null, "address": null, "language": "Hebrew", "notes": null}}}}
+
+JSON:"""
+
+
+async def generate_memory_update(
+    messages: List[dict],
+    existing_summary: Optional[str],
+    existing_profile: dict,
+    tenant_id: Optional[str] = None
+) -> Tuple[Optional[str], Optional[ExtractedProfile]]:
+    """
+    Run the combined LLM call (background lane, scheduled for tenant_id).
+
+    Returns:
+        (new summary or None, extracted profile or None) - (None, None) if the
+        reply isn't valid JSON (deterministic for this input, not worth a retry)
+    """
+    prompt = _build_memory_prompt(messages, existing_summary, existing_profile)
+
+    response = await create_message(
+        lane=BACKGROUND,
+        tenant_id=tenant_id,
+        model="claude-3-haiku-20240307",
+        max_tokens=600,
+        messages=[{"role": "user", "content": prompt}]
+    )
+
+    try:
+        data = parse_json_response(response.content[0].text)
+        if not isinstance(data, dict):
+            raise KeyError("summary")
+    except (json.JSONDecodeError, KeyError, IndexError) as e:
+        print(f"[Background][Memory] JSON parse error: {e}")
+        return None, None
+
+    summary = data.get("summary")
+    summary = summary.strip() if isinstance(summary, str) and summary.strip() else None
+    return summary, profile_from_dict(data.get("profile"))
+
+
+async def update_memory(
+    tenant_id: str,
+    chat_id: str,
+    conversation_id: int,
+    customer_id: int,
+    total_msgs: int
+) -> None:
+    """
+    Main entry point: update summary and profile together and save both.
+    Runs as a background job - gets its own async DB session.
+    LLM and DB errors propagate so the job can be retried.
+
+    Args:
+        tenant_id: Tenant identifier
+        chat_id: Customer's chat ID
+        conversation_id: Conversation to summarize
+        customer_id: Customer owning the conversation
+        total_msgs: Message count that triggered the update (stored as last_summary_at)
+    """
+    db = AsyncSessionLocal()
+    try:
+        conv_repo = AsyncConversationRepository(db)
+        customer_repo = AsyncCustomerRepository(db)
+
+        customer = await customer_repo.get_by_id(customer_id)
+        if not customer:
+            return
+
+        # One history read serves both: the summary batch covers the profile window
+        history = await conv_repo.get_conversation_history(customer_id, limit=MEMORY_SIZE)
+
+        # Read the current summary (not the one seen at enqueue time) - the job may run later,
+        # and decide exactly like the summary-only job does
+        existing_summary, last_summary_at, _ = await conv_repo.get_conversation_state(conversation_id)
+        summary_due = should_summarize(total_msgs, last_summary_at)
+        messages = get_messages_to_summarize(history) if summary_due else []
+        if not messages:
+            # Summary already written - only the profile is left to do
+            await extract_and_save_profile(tenant_id, chat_id, history)
+            return
+
+        existing_profile = get_existing_profile(customer)
+        new_summary, extracted = await generate_memory_update(messages, existing_summary, existing_profile, tenant_id)
+
+        if not new_summary:
+            # No usable summary in the combined reply - summarize on its own, so this batch
+            # is recorded (last_summary_at advances) and isn't queued again on every turn
+            new_summary = await generate_conversation_summary(messages, existing_summary, tenant_id)
+
+        # Record the batch even if it produced no text (keeps the previous summary)
+        await conv_repo.update_summary(conversation_id, new_summary or existing_summary, total_msgs)
+        if new_summary:
+            before_str = f'"{existing_summary[:80]}..."' if existing_summary else 'null'
+            print(f"[Background][Memory] conv={conversation_id} | at_msg={total_msgs} | input={len(messages)} msgs | summary before: {before_str} | after: \"{new_summary[:100]}...\"")
+
+        if extracted:
+            changes = await save_profile(customer_repo, customer, existing_profile, extracted)
+            print(f"[Background][Memory] chat={chat_id} | profile changes: {', '.join(changes)} | saved")
+        else:
+            print(f"[Background][Memory] chat={chat_id} | profile: no new info")
+    finally:
+        await db.close()
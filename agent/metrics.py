@@ -0,0 +1,137 @@
+"""
+Turn metrics - per-stage latency histograms in Prometheus text format.
+
+Every stage of a turn is timed with span() and recorded in one histogram,
+labeled by stage, tenant and channel:
+
+    webhook_parse, tenant_load, queue_wait, customer_conversation, history_load,
+    prompt_build, llm_call, tool.<name>, db_write, outbox_handoff, turn,
+    outbound_send, outbox_delay (commit to delivery, see api/outbox.py)
+
+    with span("history_load", tenant_id, channel):
+        ...
+
+GET /metrics renders these histograms plus the existing /stats counters as
+gauges (see render_prometheus).
+"""
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence, Tuple
+
+# Seconds - from fast DB round trips up to slow LLM turns
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+class Histogram:
+    """Thread-safe cumulative histogram with labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], buckets: Sequence[float] = STAGE_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        key = tuple(str(v) if v is not None else "" for v in labelvalues)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key))
+            prefix = f"{labels}," if labels else ""
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {values[len(self.buckets)]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {values[-1]:.6f}")
+            lines.append(f"{self.name}_count{{{labels}}} {values[len(self.buckets)]}")
+        return lines
+
+
+stage_seconds = Histogram(
+    "agent_stage_seconds",
+    "Latency of each stage of an agent turn",
+    ("stage", "tenant", "channel"),
+)
+
+
+def observe_stage(stage: str, seconds: float, tenant_id: Optional[str] = None, channel: Optional[str] = None) -> None:
+    stage_seconds.observe(seconds, stage, tenant_id, channel)
+
+
+@contextmanager
+def span(stage: str, tenant_id: Optional[str] = None, channel: Optional[str] = None):
+    """Time the enclosed block as one stage (recorded even if it raises)."""
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.monotonic() - start, tenant_id, channel)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _metric_name(*parts: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", "_".join(parts))
+
+
+# Stats dicts keyed by an open-ended value (e.g., model name) - their keys go into
+# a label instead of the metric name, so names stay bounded and aggregate
+LABELED_KEYS = {"models": "model"}
+
+
+def _gauges(prefix: str, value, gauges: dict, labels: str = "") -> None:
+    """Flatten numeric leaves of a stats dict into gauge series (name -> [(labels, value)])."""
+    if isinstance(value, dict):
+        for key, child in value.items():
+            name = _metric_name(prefix, str(key))
+            label = LABELED_KEYS.get(key)
+            if label and isinstance(child, dict):
+                for label_value, series in child.items():
+                    joined = f'{labels},' if labels else ""
+                    _gauges(name, series, gauges, f'{joined}{label}="{_escape(str(label_value))}"')
+            else:
+                _gauges(name, child, gauges, labels)
+    elif isinstance(value, bool):
+        gauges.setdefault(prefix, []).append((labels, int(value)))
+    elif isinstance(value, (int, float)):
+        gauges.setdefault(prefix, []).append((labels, value))
+
+
+def render_prometheus(stats: Optional[dict] = None) -> str:
+    """
+    Prometheus text exposition of the stage histograms.
+
+    Args:
+        stats: Runtime stats sections (as served by /stats), exported as
+            agent_<section>_<key>... gauges (see LABELED_KEYS for keys exported as labels)
+
+    Returns:
+        Text in the Prometheus exposition format (version 0.0.4)
+    """
+    lines = stage_seconds.render()
+    for section, values in (stats or {}).items():
+        gauges: Dict[str, list] = {}
+        _gauges(_metric_name("agent", section), values, gauges)
+        for name, series in gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in series:
+                lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,210 @@
+"""
+Model router - picks the model tier for each agent turn.
+
+Small talk ("thanks!", "hi") doesn't need the strong model. A policy looks at
+cheap local signals of the turn and picks a tier; turns that are likely to
+need tools (order intent, open orders, tools used on the chat's last turn)
+go to the strong model. If the fast model asks for a tool anyway, the
+orchestrator escalates and re-runs the call on the strong tier.
+
+Tiers per tenant (agent_settings, all keys optional):
+    "model_policy": "signals" | "strong_only" | "fast_only"
+    "models": {"fast": {"model": "...", "max_tokens": 512},
+               "strong": {"model": "...", "max_tokens": 1024},
+               "fallback": {"model": "...", "max_tokens": 1024}}
+
+Custom policies can be added with register_policy().
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List
+
+FAST = "fast"
+STRONG = "strong"
+FALLBACK = "fallback"  # Hedge target for slow calls (see agent/hedging.py) - not used for its own model
+
+DEFAULT_MODELS = {
+    FAST: {
+        "model": os.getenv("AGENT_FAST_MODEL", "claude-3-5-haiku-20241022"),
+        "max_tokens": int(os.getenv("AGENT_FAST_MAX_TOKENS", "512")),
+    },
+    STRONG: {
+        "model": os.getenv("AGENT_STRONG_MODEL", "claude-sonnet-4-20250514"),
+        "max_tokens": int(os.getenv("AGENT_STRONG_MAX_TOKENS", "1024")),
+    },
+    FALLBACK: {
+        "model": os.getenv("AGENT_FALLBACK_MODEL", "claude-3-5-haiku-20241022"),
+        "max_tokens": int(os.getenv("AGENT_FALLBACK_MAX_TOKENS", "1024")),
+    },
+}
+DEFAULT_POLICY = os.getenv("AGENT_MODEL_POLICY", "signals")
+
+# Signal thresholds
+LONG_MESSAGE_CHARS = 120        # Longer messages usually carry details worth the strong model
+RECENT_TOOL_TURN_SECONDS = 600  # A chat that used tools recently is mid-transaction
+RECENT_TOOL_CHATS_MAX = 10000   # Bound on remembered chats
+
+_ORDER_INTENT_RE = re.compile(
+    r"\b(?:order|buy|purchase|deliver|delivery|pick ?up|cancel|change|update|add|remove|confirm|want|need|kg|kilo)\b"
+    r"|\d"
+    r"|הזמנ|להזמין|אזמין|רוצה|רוצים|צריך|צריכה|תוסיף|תוסיפו|להוסיף|תוריד|לבטל|בטל|לשנות|תשנה|משלוח|איסוף|קילו|ק\"ג|לאשר|מאשר|מאשרת",
+    re.IGNORECASE,
+)
+
+
+@dataclass(frozen=True)
+class ModelTier:
+    """A model and its output limit."""
+    name: str
+    model: str
+    max_tokens: int
+
+
+@dataclass
+class TurnSignals:
+    """Cheap, local facts about a turn used to pick a tier."""
+    text: str                 # The turn's user text (bursts joined)
+    message_count: int        # User messages in this turn
+    order_intent: bool        # Ordering vocabulary, quantities, or numbers
+    open_orders: bool         # Customer has pending/confirmed orders
+    recent_tool_use: bool     # Tools were called on this chat's recent turns
+
+
+Policy = Callable[[TurnSignals], str]
+
+
+def signals_policy(signals: TurnSignals) -> str:
+    """Strong model when tools are likely, fast model for short, plain messages."""
+    if signals.order_intent or signals.recent_tool_use:
+        return STRONG
+    if signals.open_orders and len(signals.text) > 20:
+        # Customers with open orders often refer back to them
+        return STRONG
+    if len(signals.text) > LONG_MESSAGE_CHARS or signals.message_count > 1:
+        return STRONG
+    return FAST
+
+
+POLICIES: Dict[str, Policy] = {
+    "signals": signals_policy,
+    "strong_only": lambda signals: STRONG,
+    "fast_only": lambda signals: FAST,
+}
+
+
+def register_policy(name: str, policy: Policy) -> None:
+    """Add a model-selection policy (selectable per tenant via agent_settings.model_policy)."""
+    POLICIES[name] = policy
+
+
+def get_tier(tenant_config, name: str) -> ModelTier:
+    """Tier with the tenant's model overrides applied."""
+    settings = dict(DEFAULT_MODELS[name])
+    overrides = (tenant_config.SETTINGS.get("models") or {}).get(name) if tenant_config else None
+    settings.update(overrides or {})
+    return ModelTier(name=name, model=settings["model"], max_tokens=int(settings["max_tokens"]))
+
+
+# === Recent tool use (per chat, in-process) ===
+
+_recent_tool_chats: "OrderedDict[str, float]" = OrderedDict()
+_recent_lock = threading.Lock()
+
+
+def _chat_key(tenant_id: str, chat_id: str) -> str:
+    return f"{tenant_id}:{chat_id}"
+
+
+def record_tool_use(tenant_id: str, chat_id: str) -> None:
+    """Remember that this chat's turn used tools (its next turns go to the strong tier)."""
+    key = _chat_key(tenant_id, chat_id)
+    with _recent_lock:
+        _recent_tool_chats[key] = time.monotonic()
+        _recent_tool_chats.move_to_end(key)
+        while len(_recent_tool_chats) > RECENT_TOOL_CHATS_MAX:
+            _recent_tool_chats.popitem(last=False)
+
+
+def used_tools_recently(tenant_id: str, chat_id: str) -> bool:
+    with _recent_lock:
+        last = _recent_tool_chats.get(_chat_key(tenant_id, chat_id))
+    return last is not None and time.monotonic() - last < RECENT_TOOL_TURN_SECONDS
+
+
+def build_signals(tenant_id: str, chat_id: str, user_messages: List[str], customer_orders: list) -> TurnSignals:
+    """Collect turn signals - no I/O, only data the orchestrator already loaded."""
+    text = "\n".join(user_messages).strip()
+    return TurnSignals(
+        text=text,
+        message_count=len(user_messages),
+        order_intent=bool(_ORDER_INTENT_RE.search(text)),
+        open_orders=any(order.status in ("pending", "confirmed") for order in customer_orders),
+        recent_tool_use=used_tools_recently(tenant_id, chat_id),
+    )
+
+
+def select_tier(tenant_config, signals: TurnSignals) -> ModelTier:
+    """Run the tenant's policy (unknown names fall back to the default policy)."""
+    policy_name = tenant_config.SETTINGS.get("model_policy", DEFAULT_POLICY) if tenant_config else DEFAULT_POLICY
+    policy = POLICIES.get(policy_name) or POLICIES.get(DEFAULT_POLICY) or signals_policy
+    tier_name = policy(signals)
+    return get_tier(tenant_config, tier_name if tier_name in (FAST, STRONG) else STRONG)
+
+
+# === Per-tier stats ===
+
+class TierStats:
+    """Thread-safe per-tier call counters: latency and token usage."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tiers: Dict[str, dict] = {}
+        self.escalations = 0
+
+    def record_call(self, tier: ModelTier, seconds: float, usage) -> None:
+        with self._lock:
+            stats = self._tiers.setdefault(tier.name, {
+                "calls": 0,
+                "total_seconds": 0.0,
+                "max_seconds": 0.0,
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cache_read_input_tokens": 0,
+                "models": {},
+            })
+            stats["calls"] += 1
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            if usage is not None:
+                stats["input_tokens"] += getattr(usage, "input_tokens", 0) or 0
+                stats["output_tokens"] += getattr(usage, "output_tokens", 0) or 0
+                stats["cache_read_input_tokens"] += getattr(usage, "cache_read_input_tokens", 0) or 0
+            stats["models"][tier.model] = stats["models"].get(tier.model, 0) + 1
+
+    def record_escalation(self) -> None:
+        with self._lock:
+            self.escalations += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            tiers = {}
+            for name, stats in self._tiers.items():
+                tiers[name] = {
+                    **{k: v for k, v in stats.items() if k not in ("total_seconds", "models")},
+                    "models": dict(stats["models"]),
+                    "avg_seconds": round(stats["total_seconds"] / stats["calls"], 3) if stats["calls"] else 0.0,
+                    "max_seconds": round(stats["max_seconds"], 3),
+                }
+            return {"tiers": tiers, "escalations": self.escalations}
+
+
+tier_stats = TierStats()
+
+
+def get_model_router_stats() -> dict:
+    """Per-tier latency/usage counters since process start."""
+    return tier_stats.snapshot()
@@ -1,26 +1,30 @@
 """
 Agent orchestrator - main agent loop that coordinates message processing.
 """
-import os
 import re
+import time
 import asyncio
 from dataclasses import dataclass, field
-from typing import List
-from anthropic import AsyncAnthropic
-from sqlalchemy.orm import Session
+from types import SimpleNamespace
+from typing import List, Optional, Callable, Awaitable, Union
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from agent.prompt_builder import build_system_prompt
-from agent.summarizer import (
-    generate_conversation_summary,
-    should_summarize,
-    get_messages_to_summarize,
-    MEMORY_SIZE
-)
-from agent.profile_extractor import should_extract as should_extract_profile, extract_and_save as extract_and_save_profile
+from agent.summarizer import should_summarize
+from agent.fast_path import try_fast_path
+from agent.llm_gateway import create_message, stream_message, degraded_reply, LLMUnavailableError
+from agent.llm_scheduler import LIVE, TOOL_FOLLOWUP
+from agent.metrics import span
+from agent.hedging import hedged_call, get_hedge_delay, get_turn_deadline
+from agent.model_router import ModelTier, STRONG, FALLBACK, build_signals, get_tier, record_tool_use, select_tier, tier_stats
+from agent.history import assemble_history, estimate_tokens, get_history_budget, HISTORY_MAX_MESSAGES
+from agent.profile_extractor import should_extract as should_extract_profile
+from agent.jobs import enqueue_summary, enqueue_profile_extraction, enqueue_memory_update
 from agent.profile_context import build_customer_context
-from tenants.loader import load_tenant_config
-from storage.database import get_db
-from storage.repositories import ConversationRepository, OrderRepository, CustomerRepository
-from tools import TOOL_DEFINITIONS, execute_tool
+from tenants.loader import TenantConfig, load_tenant_config_async
+from storage.database import AsyncSessionLocal
+from storage.repositories import AsyncConversationRepository, AsyncOrderRepository, AsyncCustomerRepository, AsyncOutboxRepository
+from tools import TOOL_DEFINITIONS, READ_ONLY_TOOLS, execute_tool, serialize_tool_result
 
 
 @dataclass
@@ -28,9 +32,30 @@ class AgentResult:
     """Structured result from agent processing."""
     response_text: str
     tool_calls: List[dict] = field(default_factory=list)
+    history_tokens: int = 0  # Estimated tokens of conversation history sent this turn
+    fast_path: Optional[str] = None  # Fast-path intent if answered without the LLM
+    model_tier: Optional[str] = None  # Model tier that produced the final answer
+    outbox_id: Optional[int] = None  # Outbox row queued with the saved reply (see api/outbox.py)
+    duplicate: bool = False  # Every message was a redelivery of one already stored - nothing to answer
+
+
+@dataclass
+class TurnContext:
+    """Per-turn state shared by the LLM calls and tool executions of one agent turn."""
+    tenant_id: str
+    chat_id: str
+    db: AsyncSession
+    tenant_config: object
+    system_prompt: List[dict]
+    channel: Optional[str] = None
+    on_text: Optional[Callable[[str], Awaitable[None]]] = None
+    tier: Optional[ModelTier] = None  # Model tier for this turn's LLM calls (may escalate)
+    hedge_delay: float = 0.0  # Seconds before a slow call is hedged on the fallback tier (0 = off)
+    deadline: Optional[float] = None  # Monotonic time by which the turn's LLM calls must finish
+    mutations: List[dict] = field(default_factory=list)  # Successful results of mutating tools run this turn
 
 # Constants
-MAX_TOOL_CALLS = 5
+MAX_TOOL_CALLS = 5  # Tool-loop stops once this many calls were made (a response's calls all run)
 
 # Action patterns for detecting hallucinated actions (tool not called but response claims it happened)
 ACTION_PATTERNS = {
@@ -39,9 +64,97 @@ ACTION_PATTERNS = {
     "update_order": [r"הזמנה.*עודכנה", r"עודכנה בהצלחה", r"order.*updated"],
 }
 
-# Initialize Anthropic client
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-anthropic_client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+async def _call_llm(turn: "TurnContext", history: List[dict], lane: str = LIVE):
+    """
+    Make one LLM call of a turn on the turn's tier.
+
+    A call still running after turn.hedge_delay is hedged on the fallback tier
+    (first answer wins; not when the fallback is the turn's own model) and no call runs past turn.deadline - see agent/hedging.py.
+
+    Once a mutating tool has committed (turn.mutations), a failed call doesn't
+    lose the turn: the reply is built from the tool results instead.
+
+    Returns:
+        The complete Message
+    """
+    async def call(tier: ModelTier, on_text):
+        return await _call_model(turn.system_prompt, history, tier, on_text, lane, turn.tenant_id)
+
+    fallback = get_tier(turn.tenant_config, FALLBACK) if turn.hedge_delay > 0 else None
+    if fallback is not None and fallback.model == turn.tier.model:
+        # Hedging with the same model only doubles cost and rate-limit use
+        fallback = None
+    try:
+        with span("llm_call", turn.tenant_id, turn.channel):
+            response, _ = await hedged_call(call, turn.tier, fallback, turn.on_text, turn.hedge_delay, turn.deadline)
+    except LLMUnavailableError as e:
+        if not turn.mutations:
+            raise
+        print(f"[Live][LLM] chat={turn.chat_id} | unavailable after a committed tool call, answering from its result: {e}")
+        return _tool_result_response(turn.mutations)
+    return response
+
+
+def _tool_result_response(mutations: List[dict]):
+    """Final Message-shaped response stating the committed tool results (e.g. "Order 12 created successfully")."""
+    text = "\n".join(result["message"] for result in mutations)
+    return SimpleNamespace(stop_reason="end_turn", content=[SimpleNamespace(type="text", text=text)])
+
+
+async def _call_model(
+    system_prompt: List[dict],
+    history: List[dict],
+    tier: Optional[ModelTier] = None,
+    on_text: Optional[Callable[[str], Awaitable[None]]] = None,
+    lane: str = LIVE,
+    tenant_id: Optional[str] = None
+):
+    """
+    Make one LLM call with the tier's model and the agent's tools.
+
+    The call is scheduled in `lane` (live for a turn's first call, tool_followup
+    for later calls of the same turn) on behalf of tenant_id.
+
+    Without on_text, waits for the complete response. With on_text, consumes the
+    response stream and calls on_text with the accumulated text as it grows, so the
+    channel can show partial text before generation finishes.
+
+    Latency and token usage are recorded per tier.
+
+    Returns:
+        The complete Message (same shape in both modes, including tool_use blocks)
+    """
+    tier = tier or get_tier(None, STRONG)
+    start = time.monotonic()
+
+    if on_text is None:
+        response = await create_message(
+            lane=lane,
+            tenant_id=tenant_id,
+            model=tier.model,
+            max_tokens=tier.max_tokens,
+            system=system_prompt,
+            messages=history,
+            tools=TOOL_DEFINITIONS
+        )
+    else:
+        async with stream_message(
+            lane=lane,
+            tenant_id=tenant_id,
+            model=tier.model,
+            max_tokens=tier.max_tokens,
+            system=system_prompt,
+            messages=history,
+            tools=TOOL_DEFINITIONS
+        ) as stream:
+            text = ""
+            async for delta in stream.text_stream:
+                text += delta
+                await on_text(text)
+            response = await stream.get_final_message()
+
+    tier_stats.record_call(tier, time.monotonic() - start, getattr(response, "usage", None))
+    return response
 
 
 def _detect_action_violation(response_text: str, tool_calls: List[dict]) -> bool:
@@ -57,125 +170,159 @@ def _detect_action_violation(response_text: str, tool_calls: List[dict]) -> bool
 
 
 async def process_message(
-    user_message: str,
+    user_message: Union[str, List[str]],
     chat_id: str,
     tenant_id: str = "valdman",
-    channel: str = "telegram"
+    channel: str = "telegram",
+    on_text: Optional[Callable[[str], Awaitable[None]]] = None,
+    outbox_hold: Optional[float] = None,
+    external_ids: Optional[List[Optional[str]]] = None,
+    tenant_config: Optional[TenantConfig] = None
 ) -> AgentResult:
     """
     Main agent loop: receive → load context → LLM call → tool execution → respond.
 
     Args:
-        user_message: User's text message
+        user_message: User's text message, or several messages of a coalesced burst
+            (each is stored individually, all are answered by one LLM call)
         chat_id: Telegram/WhatsApp chat ID
         tenant_id: Tenant identifier (e.g., "valdman")
         channel: Message channel source (telegram, whatsapp, etc.)
+        on_text: Optional async callback for streaming - receives the accumulated
+            text of each LLM call as it is generated (a later call restarts the text)
+        outbox_hold: Queue the reply for delivery in the outbox, in the same commit as
+            the assistant message, held this many seconds for the caller to release
+            (None = no outbox row, the caller delivers the reply itself)
+        external_ids: Provider delivery key of each user message (ChannelMessage.dedup_key);
+            messages already stored are skipped, and a turn with only such messages is
+            not answered (AgentResult.duplicate)
+        tenant_config: The tenant's config if the caller already resolved it (else loaded here)
 
     Returns:
         AgentResult with response_text and tool_calls trace
     """
-    # Get database session
-    db_gen = get_db()
-    db = next(db_gen)
+    turn_start = time.monotonic()
+
+    # Get async database session (keeps the event loop free during DB round trips)
+    db = AsyncSessionLocal()
 
     try:
-        # Load tenant configuration
-        tenant_config = load_tenant_config(tenant_id, db)
+        # Load tenant configuration (webhook turns pass down the config they resolved)
+        if tenant_config is None:
+            with span("tenant_load", tenant_id, channel):
+                tenant_config = await load_tenant_config_async(tenant_id, db)
 
         # Get or create conversation and customer
-        customer_repo = CustomerRepository(db)
-        customer = customer_repo.get_or_create_by_chat_id(tenant_id, str(chat_id))
-
-        conv_repo = ConversationRepository(db)
-        conversation = conv_repo.get_or_create_active_conversation(tenant_id, customer.id)
-
-        # Add user message to database
-        conv_repo.add_message(conversation.id, "user", user_message, channel=channel)
-
-        # Get conversation state for summarization
-        existing_summary, last_summary_at, total_msgs = conv_repo.get_conversation_state(conversation.id)
-
-        # Get conversation history for LLM context
-        history = conv_repo.get_conversation_history(customer.id)
-
-        # Keep only recent messages for context (older ones are in summary)
-        history = history[-MEMORY_SIZE:]
-
-        # Build customer context (profile + order history)
-        order_repo = OrderRepository(db)
-        customer_orders = order_repo.get_by_customer(customer.id)
-        customer_context = build_customer_context(customer, customer_orders)
-
-        # Build system prompt with customer context and summary for extended memory
-        system_prompt = build_system_prompt(tenant_config, existing_summary, customer_context, TOOL_DEFINITIONS)
-
-        print(f"[Live][Request] tenant={tenant_id} chat={chat_id} | msg: {user_message[:80]} | total_msgs={total_msgs} | history={len(history)} msgs | summary={'yes' if existing_summary else 'no'}")
+        with span("customer_conversation", tenant_id, channel):
+            customer_repo = AsyncCustomerRepository(db)
+            customer = await customer_repo.get_or_create_by_chat_id(tenant_id, str(chat_id))
+
+            conv_repo = AsyncConversationRepository(db)
+            conversation = await conv_repo.get_or_create_active_conversation(tenant_id, customer.id)
+
+        # Add user message(s) to database
+        user_messages = [user_message] if isinstance(user_message, str) else list(user_message)
+        external_ids = list(external_ids or [None] * len(user_messages))
+        with span("db_write", tenant_id, channel):
+            conflict = False
+            while True:
+                # Skip provider redeliveries the unique external_message_id already holds
+                stored = await conv_repo.find_external_ids([key for key in external_ids if key])
+                if conflict and not stored:
+                    raise RuntimeError("Storing user messages failed an integrity check")
+                if stored:
+                    pairs = [(text, key) for text, key in zip(user_messages, external_ids) if key not in stored]
+                    user_messages = [text for text, _ in pairs]
+                    external_ids = [key for _, key in pairs]
+                    if not user_messages:
+                        print(f"[Live][Dedup] tenant={tenant_id} chat={chat_id} | redelivered message already stored, skipping turn")
+                        return AgentResult(response_text="", duplicate=True)
+
+                try:
+                    # The whole burst in one transaction, so a conflict leaves nothing half-stored
+                    await conv_repo.add_messages(
+                        conversation.id, "user", user_messages, channel=channel,
+                        token_counts=[estimate_tokens(text) for text in user_messages],
+                        external_message_ids=external_ids
+                    )
+                    break
+                except IntegrityError:
+                    # Some delivery was stored concurrently by another process (which answers it) -
+                    # drop those and store/answer the rest
+                    await db.rollback()
+                    await db.refresh(customer)
+                    await db.refresh(conversation)
+                    conflict = True
+                    print(f"[Live][Dedup] tenant={tenant_id} chat={chat_id} | redelivered message stored concurrently, retrying without it")
+
+            # Get conversation state for summarization
+            existing_summary, last_summary_at, total_msgs = await conv_repo.get_conversation_state(conversation.id)
+
+        # Plain catalog/price lookups are answered from the cached catalog (opt-in per tenant)
+        fast_answer = try_fast_path(tenant_config, user_messages)
+        if fast_answer:
+            print(f"[Live][FastPath] tenant={tenant_id} chat={chat_id} | intent={fast_answer.intent} confidence={fast_answer.confidence:.2f} | msg: {user_messages[0][:80]}")
+            outbound = _build_outbound(tenant_id, channel, chat_id, fast_answer.text, outbox_hold)
+            with span("db_write", tenant_id, channel):
+                await conv_repo.add_message(
+                    conversation.id, "assistant", fast_answer.text, channel=channel,
+                    token_count=estimate_tokens(fast_answer.text), outbound=outbound
+                )
+                await _enqueue_background_jobs(db, tenant_id, str(chat_id), conversation.id, customer.id, total_msgs, last_summary_at, len(user_messages))
+            return AgentResult(
+                response_text=fast_answer.text,
+                fast_path=fast_answer.intent,
+                outbox_id=outbound.id if outbound else None,
+            )
 
-        # Call LLM with system prompt, history, and available tools
-        response = await anthropic_client.messages.create(
-            model="claude-sonnet-4-20250514",
-            max_tokens=1024,
-            system=system_prompt,
-            messages=history,
-            tools=TOOL_DEFINITIONS
+        # Fill the tenant's history token budget newest-first (older messages are in summary)
+        with span("history_load", tenant_id, channel):
+            history_budget = get_history_budget(tenant_config)
+            recent_messages = await conv_repo.get_recent_history(conversation.id, HISTORY_MAX_MESSAGES, history_budget)
+            history_window = assemble_history(recent_messages, history_budget)
+            await conv_repo.cache_token_counts(history_window.new_token_counts)
+            history = history_window.messages
+
+        with span("prompt_build", tenant_id, channel):
+            # Build customer context (profile + order history)
+            order_repo = AsyncOrderRepository(db)
+            customer_orders = await order_repo.get_by_customer(customer.id)
+            customer_context = build_customer_context(customer, customer_orders)
+
+            # Build system prompt blocks: cacheable tenant prefix + customer context and summary
+            system_prompt = build_system_prompt(tenant_config, existing_summary, customer_context, TOOL_DEFINITIONS)
+
+        burst_str = f" | burst={len(user_messages)} msgs" if len(user_messages) > 1 else ""
+        print(f"[Live][Request] tenant={tenant_id} chat={chat_id} | msg: {' / '.join(user_messages)[:80]}{burst_str} | total_msgs={total_msgs} | history={len(history)} msgs, ~{history_window.tokens} tok | summary={'yes' if existing_summary else 'no'}")
+
+        turn = TurnContext(
+            tenant_id=tenant_id,
+            chat_id=str(chat_id),
+            db=db,
+            tenant_config=tenant_config,
+            system_prompt=system_prompt,
+            channel=channel,
+            on_text=on_text,
+            hedge_delay=get_hedge_delay(tenant_config),
+            deadline=get_turn_deadline(tenant_config, turn_start),
         )
 
-        # Tool-call loop: handle multiple sequential tool calls
-        tool_calls = []
-        while response.stop_reason == "tool_use" and len(tool_calls) < MAX_TOOL_CALLS:
-            tool_use = next(block for block in response.content if block.type == "tool_use")
-            tool_name = tool_use.name
-            tool_input = tool_use.input if hasattr(tool_use, 'input') else {}
-
-            # Execute the tool
-            tool_result = execute_tool(
-                tool_name,
-                tool_input,
-                tenant_id,
-                str(chat_id),
-                db,
-                tenant_config
-            )
-
-            # Collect tool call for trace
-            tool_calls.append({
-                "name": tool_name,
-                "input": tool_input,
-                "result": tool_result
-            })
+        # Pick the model tier from cheap local signals (tools likely -> strong model)
+        turn.tier = select_tier(tenant_config, build_signals(tenant_id, str(chat_id), user_messages, customer_orders))
 
-            # Log tool execution
-            if isinstance(tool_result, list):
-                tool_result_summary = f"{len(tool_result)} items"
-            elif isinstance(tool_result, dict):
-                tool_result_summary = tool_result.get('message', tool_result.get('order_id', str(tool_result)[:50]))
-            else:
-                tool_result_summary = str(tool_result)[:80]
-            if tool_name != "create_order":
-                print(f"[Live][Tool] {tool_name} → {tool_result_summary}")
-
-            # Add tool use and result to history
-            history.append({"role": "assistant", "content": response.content})
-            history.append({
-                "role": "user",
-                "content": [{
-                    "type": "tool_result",
-                    "tool_use_id": tool_use.id,
-                    "content": str(tool_result)
-                }]
-            })
+        # Call LLM with system prompt, history, and available tools
+        response = await _call_llm(turn, history, LIVE)
 
-            # Next LLM call
-            response = await anthropic_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1024,
-                system=system_prompt,
-                messages=history,
-                tools=TOOL_DEFINITIONS
-            )
+        # The fast tier doesn't drive tools - escalate and redo the call on the strong tier
+        if response.stop_reason == "tool_use" and turn.tier.name != STRONG:
+            print(f"[Live][Model] chat={chat_id} | {turn.tier.name} tier asked for tools, escalating")
+            tier_stats.record_escalation()
+            turn.tier = get_tier(tenant_config, STRONG)
+            response = await _call_llm(turn, history, LIVE)
 
-        if len(tool_calls) >= MAX_TOOL_CALLS and response.stop_reason == "tool_use":
-            print(f"[Live][Warning] Max tool calls ({MAX_TOOL_CALLS}) reached, stopping loop")
+        # Tool-call loop: handle tool calls until the model produces a final answer
+        tool_calls = []
+        response = await _run_tool_loop(turn, response, history, tool_calls)
 
         # Extract final response
         assistant_message = response.content[0].text
@@ -183,64 +330,43 @@ async def process_message(
         # Action validator: retry if response claims action without tool call
         if _detect_action_violation(assistant_message, tool_calls):
             print(f"[Live][Retry] Action claim detected without tool call, retrying")
+            turn.tier = get_tier(tenant_config, STRONG)
             history.append({"role": "assistant", "content": response.content})
             history.append({
                 "role": "user",
                 "content": [{"type": "text", "text": "SYSTEM: Your previous response claimed an order action was performed, but you did not call the required tool. You MUST call the tool to perform the action. Try again."}]
             })
-            response = await anthropic_client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=1024,
-                system=system_prompt,
-                messages=history,
-                tools=TOOL_DEFINITIONS
-            )
+            response = await _call_llm(turn, history, TOOL_FOLLOWUP)
             # Run tool loop on retry if needed
-            while response.stop_reason == "tool_use" and len(tool_calls) < MAX_TOOL_CALLS:
-                tool_use = next(block for block in response.content if block.type == "tool_use")
-                tool_name = tool_use.name
-                tool_input = tool_use.input if hasattr(tool_use, 'input') else {}
-                tool_result = execute_tool(tool_name, tool_input, tenant_id, str(chat_id), db, tenant_config)
-                tool_calls.append({"name": tool_name, "input": tool_input, "result": tool_result})
-                if isinstance(tool_result, list):
-                    tool_result_summary = f"{len(tool_result)} items"
-                elif isinstance(tool_result, dict):
-                    tool_result_summary = tool_result.get('message', tool_result.get('order_id', str(tool_result)[:50]))
-                else:
-                    tool_result_summary = str(tool_result)[:80]
-                if tool_name != "create_order":
-                    print(f"[Live][Tool] {tool_name} → {tool_result_summary}")
-                history.append({"role": "assistant", "content": response.content})
-                history.append({"role": "user", "content": [{"type": "tool_result", "tool_use_id": tool_use.id, "content": str(tool_result)}]})
-                response = await anthropic_client.messages.create(
-                    model="claude-sonnet-4-20250514", max_tokens=1024, system=system_prompt, messages=history, tools=TOOL_DEFINITIONS
-                )
+            response = await _run_tool_loop(turn, response, history, tool_calls)
             assistant_message = response.content[0].text
 
-        print(f"[Live][Response] chat={chat_id} | response: {assistant_message[:100]}")
+        if tool_calls:
+            record_tool_use(tenant_id, str(chat_id))
 
-        # Save assistant message to database
-        conv_repo.add_message(conversation.id, "assistant", assistant_message, channel=channel)
+        print(f"[Live][Response] chat={chat_id} | model={turn.tier.name} | response: {assistant_message[:100]}")
 
-        # Fire-and-forget background tasks (non-blocking)
-        if should_extract_profile(total_msgs):
-            asyncio.create_task(extract_and_save_profile(
-                tenant_id,
-                str(chat_id),
-                history
-            ))
+        # Save assistant message to database (with its outbox row, if the caller uses the outbox)
+        outbound = _build_outbound(tenant_id, channel, chat_id, assistant_message, outbox_hold)
+        with span("db_write", tenant_id, channel):
+            await conv_repo.add_message(
+                conversation.id, "assistant", assistant_message, channel=channel,
+                token_count=estimate_tokens(assistant_message), outbound=outbound
+            )
 
-        # Summarization (if needed)
-        if should_summarize(total_msgs, last_summary_at):
-            asyncio.create_task(_summarize_conversation(
-                conversation.id,
-                customer.id,
-                existing_summary,
-                total_msgs
-            ))
+            await _enqueue_background_jobs(db, tenant_id, str(chat_id), conversation.id, customer.id, total_msgs, last_summary_at, len(user_messages))
 
-        return AgentResult(response_text=assistant_message, tool_calls=tool_calls)
+        return AgentResult(
+            response_text=assistant_message,
+            tool_calls=tool_calls,
+            history_tokens=history_window.tokens,
+            model_tier=turn.tier.name,
+            outbox_id=outbound.id if outbound else None,
+        )
 
+    except LLMUnavailableError as e:
+        print(f"[Live][LLM] tenant={tenant_id} chat={chat_id} | unavailable, sending canned reply: {e}")
+        return AgentResult(response_text=degraded_reply(tenant_config))
     except Exception as e:
         import traceback
         print(f"Agent Error: {e}")
@@ -248,44 +374,168 @@ async def process_message(
         return AgentResult(response_text="Sorry, I encountered an error. Please try again.")
     finally:
         # Close database session
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+        await db.close()
+
+
+def _build_outbound(tenant_id: str, channel: str, chat_id: str, text: str, outbox_hold: Optional[float]):
+    """Outbox row for a reply, or None when the caller delivers the reply itself."""
+    if outbox_hold is None:
+        return None
+    return AsyncOutboxRepository.build(tenant_id, channel, str(chat_id), text, hold_seconds=outbox_hold)
 
 
-async def _summarize_conversation(
+async def _enqueue_background_jobs(
+    db: AsyncSession,
+    tenant_id: str,
+    chat_id: str,
     conversation_id: int,
     customer_id: int,
-    existing_summary: str,
-    total_msgs: int
+    total_msgs: int,
+    last_summary_at: Optional[int],
+    new_msgs: int
 ) -> None:
     """
-    Generate conversation summary in the background.
-    Runs as a background task, doesn't block the response.
+    Queue profile extraction / summarization as job rows - the worker runs them off the live path.
+
+    Runs after the reply (and its outbox row) committed: a failure here is logged
+    and skipped, so it can't turn a delivered reply into an error reply.
     """
-    db_gen = get_db()
-    db = next(db_gen)
+    extract_due = should_extract_profile(total_msgs, new_msgs)
+    summary_due = should_summarize(total_msgs, last_summary_at)
     try:
-        conv_repo = ConversationRepository(db)
+        if extract_due and summary_due:
+            # Both due on the same turn - one combined LLM call
+            await enqueue_memory_update(db, tenant_id, chat_id, conversation_id, customer_id, total_msgs)
+        elif extract_due:
+            await enqueue_profile_extraction(db, tenant_id, chat_id)
+        elif summary_due:
+            await enqueue_summary(db, conversation_id, customer_id, total_msgs)
+    except Exception as e:
+        await db.rollback()
+        print(f"[Live][Jobs] conv={conversation_id} | enqueueing background jobs failed, skipped: {e}")
 
-        history = conv_repo.get_conversation_history(customer_id)
-        history = history[-MEMORY_SIZE:]
-        messages_to_summarize = get_messages_to_summarize(history)
 
-        if messages_to_summarize:
-            new_summary = await generate_conversation_summary(
-                messages_to_summarize,
-                existing_summary
-            )
-            conv_repo.update_summary(conversation_id, new_summary, total_msgs)
-            before_str = f'"{existing_summary[:80]}..."' if existing_summary else 'null'
-            print(f"[Background][Summary] conv={conversation_id} | at_msg={total_msgs} | input={len(messages_to_summarize)} msgs | before: {before_str} | after: \"{new_summary[:100]}...\"")
+async def _run_tool_loop(turn: "TurnContext", response, history: List[dict], tool_calls: List[dict]):
+    """
+    Execute the model's tool calls and call the LLM again until it stops asking for tools.
 
-    except Exception as e:
-        print(f"[Background][Summary] conv={conversation_id} | ERROR: {e}")
-    finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+    Every tool_use block of a response is executed and all tool_result blocks are
+    returned in a single user turn, so several lookups cost one LLM round trip.
+
+    Args:
+        turn: Per-turn context
+        response: LLM response to start from
+        history: Message history (tool turns are appended in place)
+        tool_calls: Tool call trace (appended in place)
+
+    Returns:
+        The last LLM response
+    """
+    while response.stop_reason == "tool_use" and len(tool_calls) < MAX_TOOL_CALLS:
+        tool_uses = [block for block in response.content if block.type == "tool_use"]
+        tool_results = await _execute_tool_uses(turn, tool_uses)
+
+        tool_result_blocks = []
+        for tool_use, tool_result in zip(tool_uses, tool_results):
+            tool_input = tool_use.input if hasattr(tool_use, 'input') else {}
+
+            # Collect tool call for trace
+            tool_calls.append({
+                "name": tool_use.name,
+                "input": tool_input,
+                "result": tool_result
+            })
+            _log_tool_result(tool_use.name, tool_result)
+
+            if tool_use.name not in READ_ONLY_TOOLS and isinstance(tool_result, dict) and tool_result.get("success"):
+                # The change is committed - a retry would repeat it, so the turn's
+                # remaining calls run without the deadline
+                turn.mutations.append(tool_result)
+                turn.deadline = None
+
+            tool_result_blocks.append({
+                "type": "tool_result",
+                "tool_use_id": tool_use.id,
+                "content": serialize_tool_result(tool_result)
+            })
+
+        # Add tool uses and all their results to history
+        history.append({"role": "assistant", "content": response.content})
+        history.append({"role": "user", "content": tool_result_blocks})
+
+        # Next LLM call
+        response = await _call_llm(turn, history, TOOL_FOLLOWUP)
+
+    if len(tool_calls) >= MAX_TOOL_CALLS and response.stop_reason == "tool_use":
+        print(f"[Live][Warning] Max tool calls ({MAX_TOOL_CALLS}) reached, stopping loop")
+
+    return response
+
+
+async def _execute_tool_uses(turn: "TurnContext", tool_uses: list) -> list:
+    """
+    Execute all tool_use blocks of one LLM response.
+
+    Consecutive read-only tools run concurrently, each on its own session (an
+    AsyncSession can't be shared by concurrent tasks). Mutating tools run one at a
+    time on the turn's session and act as barriers, so they keep the order the
+    model issued them in relative to everything else.
+
+    Returns:
+        Tool results, in the same order as tool_uses
+    """
+    results = []
+    i = 0
+    while i < len(tool_uses):
+        if tool_uses[i].name not in READ_ONLY_TOOLS:
+            results.append(await _execute_tool_use(turn, tool_uses[i], turn.db))
+            i += 1
+            continue
+
+        j = i
+        while j < len(tool_uses) and tool_uses[j].name in READ_ONLY_TOOLS:
+            j += 1
+        batch = tool_uses[i:j]
+        if len(batch) == 1:
+            results.append(await _execute_tool_use(turn, batch[0], turn.db))
+        else:
+            results.extend(await asyncio.gather(*[
+                _execute_tool_use_isolated(turn, tool_use) for tool_use in batch
+            ]))
+        i = j
+    return results
+
+
+async def _execute_tool_use(turn: "TurnContext", tool_use, db: AsyncSession):
+    """Execute a single tool_use block on the given session."""
+    tool_input = tool_use.input if hasattr(tool_use, 'input') else {}
+    with span(f"tool.{tool_use.name}", turn.tenant_id, turn.channel):
+        return await execute_tool(
+            tool_use.name,
+            tool_input,
+            turn.tenant_id,
+            turn.chat_id,
+            db,
+            turn.tenant_config
+        )
+
+
+async def _execute_tool_use_isolated(turn: "TurnContext", tool_use):
+    """Execute a read-only tool_use block on its own session (for concurrent execution)."""
+    async with AsyncSessionLocal() as db:
+        return await _execute_tool_use(turn, tool_use, db)
+
+
+def _log_tool_result(tool_name: str, tool_result) -> None:
+    """Log a one-line summary of a tool result (create_order logs its own details)."""
+    if isinstance(tool_result, dict) and "orders" in tool_result:
+        more = ", more available" if tool_result.get("has_more") else ""
+        tool_result_summary = f"{len(tool_result['orders'])} orders{more}"
+    elif isinstance(tool_result, list):
+        tool_result_summary = f"{len(tool_result)} items"
+    elif isinstance(tool_result, dict):
+        tool_result_summary = tool_result.get('message', tool_result.get('order_id', str(tool_result)[:50]))
+    else:
+        tool_result_summary = str(tool_result)[:80]
+    if tool_name != "create_order":
+        print(f"[Live][Tool] {tool_name} → {tool_result_summary}")
@@ -13,16 +13,13 @@ Design:
 - All fields update to latest value (null = keep existing)
 - Notes are consolidated (merged with existing, deduplicated, kept concise)
 """
-import os
 import json
 from typing import Optional, List
 from dataclasses import dataclass
-from anthropic import AsyncAnthropic
-from storage.database import get_db
-from storage.repositories import CustomerRepository
-
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-anthropic_client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+from agent.llm_gateway import create_message
+from agent.llm_scheduler import BACKGROUND
+from storage.database import AsyncSessionLocal
+from storage.repositories import AsyncCustomerRepository, AsyncConversationRepository
 
 # Configuration
 EXTRACT_EVERY = 5       # Run extraction every N messages
@@ -58,16 +55,21 @@ class ExtractedProfile:
         }.items() if v is not None}
 
 
-def should_extract(total_msgs: int) -> bool:
+def should_extract(total_msgs: int, new_msgs: int = 1) -> bool:
     """
     Determine if profile extraction should run.
     Runs every EXTRACT_EVERY messages.
+
+    Args:
+        total_msgs: Total messages in conversation after this turn's user messages
+        new_msgs: User messages added this turn (several when a burst is coalesced),
+            so a multiple of EXTRACT_EVERY isn't skipped over
     """
-    return total_msgs > 0 and total_msgs % EXTRACT_EVERY == 0
+    return total_msgs > 0 and total_msgs // EXTRACT_EVERY > (total_msgs - new_msgs) // EXTRACT_EVERY
 
 
-def _format_messages_for_prompt(messages: List[dict]) -> str:
-    """Format conversation messages for the extraction prompt."""
+def format_messages_for_prompt(messages: List[dict]) -> str:
+    """Format conversation messages as [CUSTOMER]/[AGENT] lines for a background prompt."""
     lines = []
     for msg in messages:
         role = msg.get("role", "unknown")
@@ -80,10 +82,25 @@ def _format_messages_for_prompt(messages: List[dict]) -> str:
     return "\n".join(lines)
 
 
-def _build_extraction_prompt(messages: List[dict], existing_profile: dict) -> str:
-    """Build the LLM prompt for profile extraction."""
-    conversation_text = _format_messages_for_prompt(messages)
+# Per-field extraction rules (shared with the combined memory update prompt)
+PROFILE_FIELD_RULES = """For each field, follow these rules:
+- name: Extract if the customer states or corrects their name. Use null if no name is mentioned.
+- phone: Extract the latest phone number the customer mentions. Use null if none mentioned.
+- email: Extract the latest email the customer mentions. Use null if none mentioned.
+- address: Extract the latest address or delivery location the customer mentions. Use null if none mentioned.
+- language: Detect the language the customer is writing in (Hebrew, English, Russian, etc.). Use null if unclear.
+- notes: Extract any preferences, dietary restrictions, allergies, or special requests. If there are existing notes, consolidate them with any new information into a concise summary (remove duplicates, keep all important facts). Use null if nothing relevant found."""
+
+PROFILE_FIELDS = ['name', 'phone', 'email', 'address', 'language', 'notes']
+
 
+def get_existing_profile(customer) -> dict:
+    """Current profile fields of a customer, as given to the extraction prompt."""
+    return {field: getattr(customer, field) for field in PROFILE_FIELDS}
+
+
+def format_existing_profile(existing_profile: dict) -> str:
+    """Render the CURRENT PROFILE block (empty string if nothing is known)."""
     existing_info = ""
     existing_parts = []
     if existing_profile.get('name'):
@@ -100,6 +117,13 @@ def _build_extraction_prompt(messages: List[dict], existing_profile: dict) -> st
         existing_parts.append(f"Notes: {existing_profile['notes']}")
     if existing_parts:
         existing_info = "CURRENT PROFILE:\n" + "\n".join(existing_parts) + "\n\n"
+    return existing_info
+
+
+def _build_extraction_prompt(messages: List[dict], existing_profile: dict) -> str:
+    """Build the LLM prompt for profile extraction."""
+    conversation_text = format_messages_for_prompt(messages)
+    existing_info = format_existing_profile(existing_profile)
 
     return f"""Extract customer profile information from this conversation.
 The messages are labeled [CUSTOMER] and [AGENT]. Only extract information about the CUSTOMER (not the agent/business).
@@ -107,13 +131,7 @@ The messages are labeled [CUSTOMER] and [AGENT]. Only extract information about
 {existing_info}CONVERSATION:
 {conversation_text}
 
-For each field, follow these rules:
-- name: Extract if the customer states or corrects their name. Use null if no name is mentioned.
-- phone: Extract the latest phone number the customer mentions. Use null if none mentioned.
-- email: Extract the latest email the customer mentions. Use null if none mentioned.
-- address: Extract the latest address or delivery location the customer mentions. Use null if none mentioned.
-- language: Detect the language the customer is writing in (Hebrew, English, Russian, etc.). Use null if unclear.
-- notes: Extract any preferences, dietary restrictions, allergies, or special requests. If there are existing notes, consolidate them with any new information into a concise summary (remove duplicates, keep all important facts). Use null if nothing relevant found.
+{PROFILE_FIELD_RULES}
 
 Respond with valid JSON only. Use null for fields where no information is found in this conversation.
 Example: {{"name": "David", "phone": null, "email": null, "address": "123 Main St", "language": "Hebrew", "notes": "allergic to nuts, prefers delivery after 6pm"}}
@@ -121,13 +139,42 @@ Example: {{"name": "David", "phone": null, "email": null, "address": "123 Main S
 JSON:"""
 
 
-async def _extract_from_messages(messages: List[dict], existing_profile: dict) -> Optional[ExtractedProfile]:
+def parse_json_response(result_text: str) -> dict:
+    """Parse a JSON reply, tolerating a surrounding markdown code block."""
+    result_text = result_text.strip()
+
+    # Handle potential markdown code blocks
+    if result_text.startswith("```"):
+        lines = result_text.split("\n")
+        result_text = "\n".join(lines[1:-1])
+
+    return json.loads(result_text)
+
+
+def profile_from_dict(data: dict) -> Optional[ExtractedProfile]:
+    """Build an ExtractedProfile from parsed JSON, or None if it holds no data."""
+    if not isinstance(data, dict):
+        return None
+
+    profile = ExtractedProfile(**{field: data.get(field) for field in PROFILE_FIELDS})
+
+    if profile.has_any_data():
+        return profile
+    return None
+
+
+async def _extract_from_messages(
+    messages: List[dict],
+    existing_profile: dict,
+    tenant_id: Optional[str] = None
+) -> Optional[ExtractedProfile]:
     """
     Run LLM extraction on a list of messages.
 
     Args:
         messages: Conversation messages (last CONTEXT_WINDOW messages)
         existing_profile: Current profile data for context
+        tenant_id: Tenant the call is scheduled for (background lane)
 
     Returns:
         ExtractedProfile with discovered information, or None if nothing found
@@ -135,107 +182,97 @@ async def _extract_from_messages(messages: List[dict], existing_profile: dict) -
     prompt = _build_extraction_prompt(messages, existing_profile)
 
     try:
-        response = await anthropic_client.messages.create(
+        response = await create_message(
+            lane=BACKGROUND,
+            tenant_id=tenant_id,
             model="claude-3-haiku-20240307",
             max_tokens=300,
             messages=[{"role": "user", "content": prompt}]
         )
 
-        result_text = response.content[0].text.strip()
-
-        # Handle potential markdown code blocks
-        if result_text.startswith("```"):
-            lines = result_text.split("\n")
-            result_text = "\n".join(lines[1:-1])
-
-        data = json.loads(result_text)
-
-        profile = ExtractedProfile(
-            name=data.get('name'),
-            phone=data.get('phone'),
-            email=data.get('email'),
-            address=data.get('address'),
-            language=data.get('language'),
-            notes=data.get('notes'),
-        )
-
-        if profile.has_any_data():
-            return profile
-        return None
+        data = parse_json_response(response.content[0].text)
+        return profile_from_dict(data)
 
     except (json.JSONDecodeError, KeyError) as e:
+        # Deterministic for this input - not worth a retry
         print(f"[Background][Profile] JSON parse error: {e}")
         return None
-    except Exception as e:
-        print(f"[Background][Profile] LLM call error: {e}")
-        return None
+
+
+async def save_profile(
+    customer_repo: AsyncCustomerRepository,
+    customer,
+    existing_profile: dict,
+    extracted: ExtractedProfile
+) -> List[str]:
+    """
+    Save extracted fields to the customer (null fields keep the existing value).
+
+    Returns:
+        Human-readable list of changes (before → after) for logging
+    """
+    # Build changes diff (before → after)
+    changes = []
+    for field in PROFILE_FIELDS:
+        new_val = getattr(extracted, field)
+        if new_val is not None:
+            old_val = existing_profile.get(field)
+            old_str = f'"{old_val}"' if old_val else 'null'
+            changes.append(f'{field}({old_str} → "{new_val}")')
+
+    # Update profile - null fields are skipped (keep existing)
+    await customer_repo.update_profile(
+        customer,
+        name=extracted.name,
+        phone=extracted.phone,
+        email=extracted.email,
+        address=extracted.address,
+        language=extracted.language,
+        notes=extracted.notes,
+    )
+    return changes
 
 
 async def extract_and_save(
     tenant_id: str,
     chat_id: str,
-    conversation_history: List[dict]
+    conversation_history: Optional[List[dict]] = None
 ) -> None:
     """
     Main entry point: extract profile from recent messages and save to database.
-    Runs as a background task - gets its own DB session.
+    Runs as a background job - gets its own async DB session.
+    LLM and DB errors propagate so the job can be retried.
 
     Args:
         tenant_id: Tenant identifier
         chat_id: Customer's chat ID
-        conversation_history: Full conversation history (will be sliced to CONTEXT_WINDOW)
+        conversation_history: Conversation history (will be sliced to CONTEXT_WINDOW).
+            Loaded from the database if not given.
     """
-    db_gen = get_db()
-    db = next(db_gen)
+    db = AsyncSessionLocal()
     try:
-        customer_repo = CustomerRepository(db)
-        customer = customer_repo.get_by_chat_id(tenant_id, chat_id)
+        customer_repo = AsyncCustomerRepository(db)
+        customer = await customer_repo.get_by_chat_id(tenant_id, chat_id)
         if not customer:
             return
 
         # Get existing profile for context
-        existing_profile = {
-            'name': customer.name,
-            'phone': customer.phone,
-            'email': customer.email,
-            'address': customer.address,
-            'language': customer.language,
-            'notes': customer.notes,
-        }
+        existing_profile = get_existing_profile(customer)
+
+        if conversation_history is None:
+            conv_repo = AsyncConversationRepository(db)
+            conversation_history = await conv_repo.get_conversation_history(customer.id, limit=CONTEXT_WINDOW)
 
         # Slice to context window
         messages = conversation_history[-CONTEXT_WINDOW:]
 
-        extracted = await _extract_from_messages(messages, existing_profile)
+        extracted = await _extract_from_messages(messages, existing_profile, tenant_id)
 
         if extracted:
-            # Build changes diff (before → after)
-            changes = []
-            for field in ['name', 'phone', 'email', 'address', 'language', 'notes']:
-                new_val = getattr(extracted, field)
-                if new_val is not None:
-                    old_val = existing_profile.get(field)
-                    old_str = f'"{old_val}"' if old_val else 'null'
-                    changes.append(f'{field}({old_str} → "{new_val}")')
-
-            # Update profile - null fields are skipped (keep existing)
-            customer_repo.update_profile(
-                customer,
-                name=extracted.name,
-                phone=extracted.phone,
-                email=extracted.email,
-                address=extracted.address,
-                language=extracted.language,
-                notes=extracted.notes,
-            )
+            changes = await save_profile(customer_repo, customer, existing_profile, extracted)
             print(f"[Background][Profile] chat={chat_id} | window={len(messages)} msgs | changes: {', '.join(changes)} | saved")
         else:
             print(f"[Background][Profile] chat={chat_id} | window={len(messages)} msgs | no new info")
 
-    except Exception as e:
-        print(f"[Background][Profile] chat={chat_id} | ERROR: {e}")
     finally:
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
+        await db.close()
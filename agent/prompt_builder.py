@@ -1,7 +1,24 @@
 """
 System prompt builder - constructs dynamic prompts from tenant configuration.
+
+The system prompt is split into two parts so Anthropic prompt caching can reuse
+the expensive part across turns and tool-loop iterations:
+- Static prefix: tenant-level content (role, business, catalog, workflow, tools, rules).
+  Byte-stable for a given tenant config and marked with cache_control.
+- Dynamic suffix: per-customer content (profile/order context, conversation summary).
 """
-from typing import Optional, List
+import threading
+import weakref
+from typing import Dict, Optional, List
+
+# Anthropic prompt caching marker (cache lives ~5 minutes, refreshed on every hit)
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Rendered static prefixes per tenant config object and tool set. Weakly keyed: an entry
+# lives as long as its config stays in the tenant cache, so warm turns do no catalog
+# string building and a reloaded config gets a fresh render.
+_static_prompts: "weakref.WeakKeyDictionary[object, Dict[tuple, str]]" = weakref.WeakKeyDictionary()
+_static_prompts_lock = threading.Lock()
 
 
 def build_system_prompt(
@@ -9,17 +26,71 @@ def build_system_prompt(
     conversation_summary: Optional[str] = None,
     customer_context: Optional[str] = None,
     tool_definitions: Optional[List[dict]] = None
-):
+) -> List[dict]:
     """
-    Build a system prompt from tenant configuration.
+    Build the system prompt as structured blocks for the Messages API.
 
     Args:
         tenant_config: Tenant configuration with COMPANY_NAME, PRODUCTS, AGENT_ROLE, etc.
         conversation_summary: Optional summary of earlier conversation for extended memory.
         customer_context: Optional customer profile and order history context.
+        tool_definitions: Tool definitions, listed in the static prefix.
+
+    Returns:
+        list: System blocks - cacheable tenant prefix first, then volatile customer blocks
+    """
+    # Reuse the prefix rendered for this (cached) tenant config and tool set, if any
+    tools_key = tuple((tool_def["name"], tool_def["description"]) for tool_def in tool_definitions or [])
+    static_prompt = _get_static_prompt(tenant_config, tools_key)
+    if static_prompt is None:
+        static_prompt = build_static_prompt(tenant_config, tool_definitions)
+        _put_static_prompt(tenant_config, tools_key, static_prompt)
+
+    blocks = [{
+        "type": "text",
+        "text": static_prompt,
+        "cache_control": CACHE_CONTROL,
+    }]
+
+    dynamic_prompt = build_dynamic_prompt(conversation_summary, customer_context)
+    if dynamic_prompt:
+        blocks.append({"type": "text", "text": dynamic_prompt})
+
+    return blocks
+
+
+def _get_static_prompt(tenant_config, tools_key: tuple) -> Optional[str]:
+    with _static_prompts_lock:
+        try:
+            return _static_prompts.get(tenant_config, {}).get(tools_key)
+        except TypeError:  # Not weak-referenceable (e.g., a config module) - no caching
+            return None
+
+
+def _put_static_prompt(tenant_config, tools_key: tuple, static_prompt: str) -> None:
+    with _static_prompts_lock:
+        try:
+            _static_prompts.setdefault(tenant_config, {})[tools_key] = static_prompt
+        except TypeError:
+            pass
+
+
+def build_static_prompt(
+    tenant_config,
+    tool_definitions: Optional[List[dict]] = None
+) -> str:
+    """
+    Build the tenant-static part of the system prompt.
+
+    Must stay byte-stable for the same tenant config - any per-turn content here
+    breaks the prompt cache. Products are sorted so DB row order doesn't matter.
+
+    Args:
+        tenant_config: Tenant configuration with COMPANY_NAME, PRODUCTS, AGENT_ROLE, etc.
+        tool_definitions: Tool definitions to list under "Available Tools".
 
     Returns:
-        str: Formatted system prompt for the LLM
+        str: Static system prompt prefix
     """
     prompt = f"""You are a {tenant_config.AGENT_ROLE} for {tenant_config.COMPANY_NAME}, a quality {tenant_config.COMPANY_TYPE}.
 
@@ -31,7 +102,7 @@ About {tenant_config.COMPANY_NAME}:
     # Add product catalog if available
     if tenant_config.PRODUCTS:
         prompt += "\n\nOur Products:\n"
-        for product in tenant_config.PRODUCTS:
+        for product in sorted(tenant_config.PRODUCTS, key=lambda p: (p['category'], p['name'])):
             prompt += f"\n- {product['name']} ({product['category']})"
             prompt += f"\n  Price: {product['price']}"
             prompt += f"\n  {product['description']}"
@@ -75,22 +146,37 @@ CRITICAL RULES:
 2. NEVER invent, guess, or assume order details (IDs, totals, items, status). If you need to reference a customer's orders, call get_customer_orders first. Only state facts that come from tool results or the current conversation.
 3. Be friendly and helpful!"""
 
+    return prompt
+
+
+def build_dynamic_prompt(
+    conversation_summary: Optional[str] = None,
+    customer_context: Optional[str] = None
+) -> str:
+    """
+    Build the per-customer part of the system prompt (changes between turns).
+
+    Args:
+        conversation_summary: Optional summary of earlier conversation for extended memory.
+        customer_context: Optional customer profile and order history context.
+
+    Returns:
+        str: Dynamic system prompt suffix, or empty string if there is nothing to add
+    """
+    sections = []
+
     # Add customer profile context if available
     if customer_context:
-        prompt += f"""
-
-Known Customer Information:
+        sections.append(f"""Known Customer Information:
 {customer_context}
 
-Use this information to personalize the conversation. Address the customer by name if known. This order history is a snapshot — for current order status or details, always use get_customer_orders. Never fabricate order details or comparisons not explicitly shown here."""
+Use this information to personalize the conversation. Address the customer by name if known. This order history is a snapshot — for current order status or details, always use get_customer_orders. Never fabricate order details or comparisons not explicitly shown here.""")
 
     # Add conversation summary if available (for extended memory)
     if conversation_summary:
-        prompt += f"""
-
-Conversation Context (summary of earlier messages):
+        sections.append(f"""Conversation Context (summary of earlier messages):
 {conversation_summary}
 
-Use this context to maintain continuity. The customer may reference things discussed earlier."""
+Use this context to maintain continuity. The customer may reference things discussed earlier.""")
 
-    return prompt
+    return "\n\n".join(sections)
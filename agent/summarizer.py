@@ -1,13 +1,11 @@
 """
 Conversation summarizer - creates summaries of older messages to extend agent memory.
 """
-import os
 from typing import List, Optional
-from anthropic import AsyncAnthropic
-
-# Use the same client setup as orchestrator
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-anthropic_client = AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+from agent.llm_gateway import create_message
+from agent.llm_scheduler import BACKGROUND
+from storage.database import AsyncSessionLocal
+from storage.repositories import AsyncConversationRepository
 
 # Configuration
 MESSAGE_BATCH_SIZE = 15  # Summarize every N messages
@@ -16,7 +14,8 @@ MEMORY_SIZE = 30         # Keep last N messages in context (2 batches)
 
 async def generate_conversation_summary(
     messages: List[dict],
-    existing_summary: Optional[str] = None
+    existing_summary: Optional[str] = None,
+    tenant_id: Optional[str] = None
 ) -> str:
     """
     Generate a summary of conversation messages.
@@ -24,6 +23,7 @@ async def generate_conversation_summary(
     Args:
         messages: List of messages to summarize [{"role": "user", "content": "..."}]
         existing_summary: Previous summary to build upon (if any)
+        tenant_id: Tenant the call is scheduled for (background lane)
 
     Returns:
         A concise summary of the conversation
@@ -68,7 +68,9 @@ Create a summary that:
 
 Keep the summary concise (3-5 sentences max). Focus on facts useful for continuing the conversation."""
 
-    response = await anthropic_client.messages.create(
+    response = await create_message(
+        lane=BACKGROUND,
+        tenant_id=tenant_id,
         model="claude-3-haiku-20240307",
         max_tokens=300,
         messages=[{"role": "user", "content": prompt}]
@@ -117,3 +119,47 @@ def get_messages_to_summarize(messages: List[dict]) -> List[dict]:
 
     # Take the latest batch (last 15 messages)
     return messages[-MESSAGE_BATCH_SIZE:]
+
+
+async def summarize_and_save(
+    conversation_id: int,
+    customer_id: int,
+    total_msgs: int
+) -> None:
+    """
+    Main entry point: summarize the latest batch of messages and save it.
+    Runs as a background job - gets its own async DB session.
+    Errors propagate so the job can be retried.
+
+    Args:
+        conversation_id: Conversation to summarize
+        customer_id: Customer owning the conversation
+        total_msgs: Message count that triggered the summary (stored as last_summary_at)
+    """
+    db = AsyncSessionLocal()
+    try:
+        conv_repo = AsyncConversationRepository(db)
+
+        # Read the current summary (not the one seen at enqueue time) - the job may run later,
+        # after another job already summarized these messages
+        conversation = await conv_repo.get_conversation_by_id(conversation_id)
+        if not conversation:
+            return
+        existing_summary, last_summary_at = conversation.summary, conversation.last_summary_at
+        if not should_summarize(total_msgs, last_summary_at):
+            return
+
+        history = await conv_repo.get_conversation_history(customer_id, limit=MEMORY_SIZE)
+        messages_to_summarize = get_messages_to_summarize(history)
+
+        if messages_to_summarize:
+            new_summary = await generate_conversation_summary(
+                messages_to_summarize,
+                existing_summary,
+                conversation.tenant_id
+            )
+            await conv_repo.update_summary(conversation_id, new_summary, total_msgs)
+            before_str = f'"{existing_summary[:80]}..."' if existing_summary else 'null'
+            print(f"[Background][Summary] conv={conversation_id} | at_msg={total_msgs} | input={len(messages_to_summarize)} msgs | before: {before_str} | after: \"{new_summary[:100]}...\"")
+    finally:
+        await db.close()
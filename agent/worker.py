@@ -0,0 +1,185 @@
+"""
+Background job worker - executes rows from the background_jobs table.
+
+Runs either as its own process (scripts/background_worker.py) or inside the
+API process (BACKGROUND_WORKER_IN_PROCESS), where it yields to live traffic:
+no new jobs are claimed while the webhook queue has work waiting.
+
+Several workers (processes) can run side by side - jobs are claimed with
+SELECT ... FOR UPDATE SKIP LOCKED, so each job runs once.
+"""
+import os
+import asyncio
+import random
+import time
+import traceback
+from typing import Callable, Optional, Set
+from agent.jobs import JOB_HANDLERS
+from storage.database import AsyncSessionLocal
+from storage.models.job import BackgroundJob
+from storage.repositories import AsyncJobRepository
+
+WORKER_CONCURRENCY = int(os.getenv("BACKGROUND_WORKER_CONCURRENCY", "2"))
+POLL_INTERVAL = float(os.getenv("BACKGROUND_WORKER_POLL_INTERVAL", "1.0"))
+# Jobs whose claim wasn't renewed for this long are assumed orphaned by a crashed worker
+STALE_JOB_SECONDS = float(os.getenv("BACKGROUND_JOB_STALE_SECONDS", "300"))
+# A running job renews its claim (locked_at) this often, however long it takes
+HEARTBEAT_SECONDS = STALE_JOB_SECONDS / 5
+RETRY_BASE_DELAY = 5.0
+RETRY_MAX_DELAY = 600.0
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** (attempts - 1))))
+
+
+class BackgroundWorker:
+    """
+    Polls background_jobs and runs up to `concurrency` jobs at a time.
+
+    Args:
+        concurrency: Max jobs running at once (bounds background LLM usage)
+        poll_interval: Seconds between polls when the queue is empty
+        should_yield: Optional callable - while it returns True, no new jobs are claimed
+    """
+
+    def __init__(
+        self,
+        concurrency: int = WORKER_CONCURRENCY,
+        poll_interval: float = POLL_INTERVAL,
+        should_yield: Optional[Callable[[], bool]] = None,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.should_yield = should_yield
+        self._running: Set[asyncio.Task] = set()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._last_stale_check = 0.0
+
+        # Stats
+        self.completed = 0
+        self.retried = 0
+        self.failed = 0
+        self.yielded = 0
+
+    async def start(self) -> None:
+        """Start polling in the background."""
+        if self._loop_task:
+            return
+        self._stopping = False
+        self._loop_task = asyncio.create_task(self.run())
+        print(f"[Worker] Started ({self.concurrency} concurrent jobs)")
+
+    async def stop(self, timeout: float = 20.0) -> None:
+        """Stop claiming jobs and wait for running ones to finish (up to timeout)."""
+        self._stopping = True
+        if self._loop_task:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        if self._running:
+            # Unfinished jobs stay 'running' and are requeued by requeue_stale
+            await asyncio.wait(self._running, timeout=timeout)
+        print("[Worker] Stopped")
+
+    async def run(self) -> None:
+        """Poll loop - runs until cancelled."""
+        while not self._stopping:
+            try:
+                claimed = await self._poll_once()
+            except Exception as e:
+                print(f"[Worker] Poll error: {e}")
+                claimed = 0
+            if not claimed:
+                await asyncio.sleep(self.poll_interval)
+            else:
+                # Let finished jobs free their slots before polling again
+                await asyncio.sleep(0)
+
+    async def run_until_empty(self) -> None:
+        """Run due jobs until none are left (CLI / one-off use)."""
+        while True:
+            claimed = await self._poll_once(ignore_yield=True)
+            if not claimed and not self._running:
+                return
+            if self._running:
+                await asyncio.wait(self._running, return_when=asyncio.FIRST_COMPLETED)
+
+    async def _poll_once(self, ignore_yield: bool = False) -> int:
+        """Claim jobs into free slots. Returns the number of jobs claimed."""
+        free = self.concurrency - len(self._running)
+        if free <= 0:
+            return 0
+        if not ignore_yield and self.should_yield and self.should_yield():
+            self.yielded += 1
+            return 0
+
+        async with AsyncSessionLocal() as db:
+            repo = AsyncJobRepository(db)
+            now = time.monotonic()
+            if now - self._last_stale_check >= STALE_JOB_SECONDS / 2:
+                self._last_stale_check = now
+                requeued = await repo.requeue_stale(STALE_JOB_SECONDS)
+                if requeued:
+                    print(f"[Worker] Requeued {requeued} stale jobs")
+            jobs = await repo.claim(free)
+
+        for job in jobs:
+            task = asyncio.create_task(self._execute(job))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+        return len(jobs)
+
+    async def _execute(self, job: BackgroundJob) -> None:
+        """Run one job and record the outcome."""
+        handler = JOB_HANDLERS.get(job.job_type)
+        start = time.monotonic()
+        heartbeat = asyncio.create_task(self._heartbeat(job.id))
+        try:
+            try:
+                if handler is None:
+                    raise ValueError(f"Unknown job type: {job.job_type}")
+                await handler(job.payload or {})
+            finally:
+                heartbeat.cancel()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            delay = retry_delay(job.attempts)
+            async with AsyncSessionLocal() as db:
+                will_retry = await AsyncJobRepository(db).fail(job, error, delay)
+            if will_retry:
+                self.retried += 1
+                print(f"[Worker] job={job.id} {job.job_type} | attempt {job.attempts}/{job.max_attempts} failed: {error} | retry in {delay:.0f}s")
+            else:
+                self.failed += 1
+                print(f"[Worker] job={job.id} {job.job_type} | FAILED after {job.attempts} attempts: {error}")
+                print(traceback.format_exc())
+            return
+
+        async with AsyncSessionLocal() as db:
+            await AsyncJobRepository(db).complete(job.id)
+        self.completed += 1
+        print(f"[Worker] job={job.id} {job.job_type} | done in {time.monotonic() - start:.2f}s")
+
+    async def _heartbeat(self, job_id: int) -> None:
+        """Renew a running job's claim, so requeue_stale doesn't hand a slow job to another worker."""
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await AsyncJobRepository(db).heartbeat(job_id)
+            except Exception as e:
+                print(f"[Worker] job={job_id} | heartbeat failed: {e}")
+
+    def stats(self) -> dict:
+        """Runtime counters for /stats."""
+        return {
+            "concurrency": self.concurrency,
+            "running": len(self._running),
+            "completed": self.completed,
+            "retried": self.retried,
+            "failed": self.failed,
+            "yielded_to_live": self.yielded,
+        }
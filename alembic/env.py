@@ -20,7 +20,7 @@ load_dotenv()
 
 # Import Base and all models
 from storage.database import Base
-from storage.models import Tenant, Product, Customer, Order, Conversation, Message
+from storage.models import Tenant, Product, Customer, Order, Conversation, Message, BackgroundJob, OutboundMessage
 
 # This is the Alembic Config object
 config = context.config
@@ -0,0 +1,30 @@
+"""add_tenant_agent_settings
+
+Revision ID: 3f9c1d7e52ab
+Revises: a4b0c2a94826
+Create Date: 2026-10-16 09:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c1d7e52ab'
+down_revision: Union[str, None] = 'a4b0c2a94826'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-tenant agent tuning knobs (JSON, all keys optional)
+    op.add_column(
+        'tenants',
+        sa.Column('agent_settings', sa.JSON(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('tenants', 'agent_settings')
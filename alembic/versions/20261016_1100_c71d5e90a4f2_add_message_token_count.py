@@ -0,0 +1,30 @@
+"""add_message_token_count
+
+Revision ID: c71d5e90a4f2
+Revises: 8b2e4a61c0d3
+Create Date: 2026-10-16 11:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71d5e90a4f2'
+down_revision: Union[str, None] = '8b2e4a61c0d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Cached token estimate per message (NULL = not computed yet, filled lazily)
+    op.add_column(
+        'messages',
+        sa.Column('token_count', sa.Integer(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('messages', 'token_count')
@@ -0,0 +1,32 @@
+"""add_messages_conversation_created_index
+
+Revision ID: 5a0e8f3b9d61
+Revises: c71d5e90a4f2
+Create Date: 2026-10-16 12:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a0e8f3b9d61'
+down_revision: Union[str, None] = 'c71d5e90a4f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves newest-first history reads: WHERE conversation_id = ? ORDER BY created_at DESC LIMIT n.
+    # A plain (not covering) index - it finds the n rows, whose columns are then read from the table
+    # (content is unbounded TEXT, too large to INCLUDE in a btree entry)
+    op.create_index(
+        'ix_messages_conversation_created',
+        'messages',
+        ['conversation_id', 'created_at']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_created', table_name='messages')
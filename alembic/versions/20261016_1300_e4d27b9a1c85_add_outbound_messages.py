@@ -0,0 +1,52 @@
+"""add_outbound_messages
+
+Revision ID: e4d27b9a1c85
+Revises: 5a0e8f3b9d61
+Create Date: 2026-10-16 13:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4d27b9a1c85'
+down_revision: Union[str, None] = '5a0e8f3b9d61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Transactional outbox for channel replies (drained by the outbox dispatcher)
+    op.create_table(
+        'outbound_messages',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('tenant_id', sa.String(), nullable=False),
+        sa.Column('message_id', sa.Integer(), nullable=True),
+        sa.Column('channel', sa.String(), nullable=False),
+        sa.Column('recipient_id', sa.String(), nullable=False),
+        sa.Column('text', sa.Text(), nullable=False),
+        sa.Column('edit_message_id', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+        sa.ForeignKeyConstraint(['message_id'], ['messages.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_outbound_messages_claim', 'outbound_messages', ['status', 'next_attempt_at'])
+    op.create_index('ix_outbound_messages_chat', 'outbound_messages', ['tenant_id', 'channel', 'recipient_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbound_messages_chat', table_name='outbound_messages')
+    op.drop_index('ix_outbound_messages_claim', table_name='outbound_messages')
+    op.drop_table('outbound_messages')
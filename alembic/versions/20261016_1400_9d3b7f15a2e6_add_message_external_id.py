@@ -0,0 +1,35 @@
+"""add_message_external_id
+
+Revision ID: 9d3b7f15a2e6
+Revises: e4d27b9a1c85
+Create Date: 2026-10-16 14:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3b7f15a2e6'
+down_revision: Union[str, None] = 'e4d27b9a1c85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Provider delivery key of inbound messages (Telegram update_id / Twilio MessageSid)
+    op.add_column('messages', sa.Column('external_message_id', sa.String(), nullable=True))
+    # Unique: a redelivered webhook can't be stored (and answered) twice. NULLs don't conflict.
+    op.create_index(
+        'ux_messages_external_message_id',
+        'messages',
+        ['external_message_id'],
+        unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_messages_external_message_id', table_name='messages')
+    op.drop_column('messages', 'external_message_id')
@@ -0,0 +1,36 @@
+"""add_background_job_dedup_key
+
+Revision ID: b6f0c3a8e471
+Revises: 9d3b7f15a2e6
+Create Date: 2026-10-16 15:00:00.000000+00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f0c3a8e471'
+down_revision: Union[str, None] = '9d3b7f15a2e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Per-conversation jobs carry a key so a lagging worker doesn't collect duplicates
+    op.add_column('background_jobs', sa.Column('dedup_key', sa.String(), nullable=True))
+    # At most one pending/running job per key, whatever its type. NULL keys never conflict.
+    op.create_index(
+        'ux_background_jobs_active',
+        'background_jobs',
+        ['dedup_key'],
+        unique=True,
+        postgresql_where=sa.text("status IN ('pending', 'running')")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_background_jobs_active', table_name='background_jobs')
+    op.drop_column('background_jobs', 'dedup_key')
@@ -0,0 +1,91 @@
+"""
+Inbound deduplication - drops webhook redeliveries before they reach the agent.
+
+Telegram and Twilio redeliver a webhook they consider failed (timeout, 5xx,
+503 from a full queue). Every message carries the provider's delivery ID
+(ChannelMessage.dedup_key); the webhook checks it against a short-lived
+in-process cache - an O(1) lookup, no DB or LLM work for a duplicate.
+
+The cache is only a fast path: it is per process and forgets after
+INBOUND_DEDUP_TTL_SECONDS. The unique messages.external_message_id column
+backs it - the orchestrator skips deliveries that are already stored, so a
+redelivery that reaches another process (or arrives after a restart) is
+still answered only once.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Seconds a delivery ID is remembered in-process
+INBOUND_DEDUP_TTL_SECONDS = float(os.getenv("INBOUND_DEDUP_TTL_SECONDS", "600"))
+# Bound on remembered delivery IDs (oldest are evicted first)
+INBOUND_DEDUP_MAX_KEYS = int(os.getenv("INBOUND_DEDUP_MAX_KEYS", "100000"))
+
+
+class RecentKeys:
+    """Thread-safe set of keys that expire after `ttl` seconds (insertion-ordered, bounded)."""
+
+    def __init__(self, ttl: float = INBOUND_DEDUP_TTL_SECONDS, max_keys: int = INBOUND_DEDUP_MAX_KEYS):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._keys: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Stats
+        self.accepted = 0
+        self.duplicates = 0
+
+    def add(self, key: Optional[str]) -> bool:
+        """
+        Remember a key.
+
+        Returns:
+            False if the key was already seen within the TTL (a duplicate), True otherwise.
+            Messages without a key are always accepted.
+        """
+        if not key:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if key in self._keys:
+                self.duplicates += 1
+                return False
+            self._keys[key] = now
+            while len(self._keys) > self.max_keys:
+                self._keys.popitem(last=False)
+            self.accepted += 1
+            return True
+
+    def discard(self, key: Optional[str]) -> None:
+        """Forget a key (its message was not accepted - let the redelivery through)."""
+        if key:
+            with self._lock:
+                self._keys.pop(key, None)
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.ttl
+        while self._keys:
+            _, added = next(iter(self._keys.items()))
+            if added > cutoff:
+                break
+            self._keys.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "keys": len(self._keys),
+                "accepted": self.accepted,
+                "duplicates_dropped": self.duplicates,
+            }
+
+
+# Process-wide cache used by the webhook routes
+inbound_dedup = RecentKeys()
+
+
+def get_dedup_stats() -> dict:
+    """Delivery IDs remembered and duplicates dropped since process start."""
+    return inbound_dedup.stats()
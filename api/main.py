@@ -2,18 +2,59 @@
 FastAPI application initialization and configuration.
 """
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+from api.message_queue import message_queue
+from api.outbox import outbox_dispatcher
+from api.dedup import get_dedup_stats
+from agent.chat_lock import get_chat_lock_stats
+from agent.fast_path import get_fast_path_stats
+from agent.model_router import get_model_router_stats
+from agent.llm_gateway import get_llm_gateway_stats
+from agent.llm_scheduler import get_llm_scheduler_stats
+from agent.hedging import get_hedge_stats
+from agent.metrics import render_prometheus
+from agent.worker import BackgroundWorker
+from channels.telegram import close_client as close_telegram_client
+from channels.whatsapp import close_clients as close_twilio_clients
+
+# Run background jobs (summaries, profile extraction) inside the API process.
+# Disable when running scripts/background_worker.py separately.
+BACKGROUND_WORKER_IN_PROCESS = os.getenv("BACKGROUND_WORKER_IN_PROCESS", "true").lower() == "true"
+
+# In-process worker yields to live turns: it claims nothing while webhook jobs are waiting
+background_worker = BackgroundWorker(should_yield=message_queue.has_backlog) if BACKGROUND_WORKER_IN_PROCESS else None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background consumers on startup, drain them on shutdown."""
+    await outbox_dispatcher.start()
+    await message_queue.start()
+    if background_worker:
+        await background_worker.start()
+    yield
+    if background_worker:
+        await background_worker.stop()
+    await message_queue.stop()
+    await outbox_dispatcher.stop()
+    await close_telegram_client()
+    await close_twilio_clients()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Sales Agents Platform",
     description="Multi-tenant AI-powered sales agent platform",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # CORS middleware for Admin Dashboard
@@ -30,6 +71,32 @@ app.add_middleware(
 async def health_check():
     return {"status": "healthy"}
 
+# Runtime stats (queue depth, throughput, per-chat serialization)
+@app.get("/stats")
+async def runtime_stats():
+    return _runtime_stats()
+
+
+# Prometheus scrape endpoint: per-stage turn latency histograms + the /stats counters as gauges
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_prometheus(_runtime_stats()), media_type="text/plain; version=0.0.4")
+
+
+def _runtime_stats() -> dict:
+    return {
+        "queue": message_queue.stats(),
+        "outbox": outbox_dispatcher.stats(),
+        "dedup": get_dedup_stats(),
+        "chat_locks": get_chat_lock_stats(),
+        "background_worker": background_worker.stats() if background_worker else None,
+        "fast_path": get_fast_path_stats(),
+        "models": get_model_router_stats(),
+        "llm": get_llm_gateway_stats(),
+        "llm_scheduler": get_llm_scheduler_stats(),
+        "hedging": get_hedge_stats(),
+    }
+
 # Import routes
 from api.routes import webhooks, admin
 
@@ -0,0 +1,288 @@
+"""
+Inbound message queue - decouples webhook acknowledgement from agent processing.
+
+Webhooks validate and parse the request, submit the ChannelMessage here and return
+200 right away (Telegram and Twilio retry slow webhooks). A fixed pool of async
+consumers runs the agent and hands the reply to the outbox dispatcher
+(api/outbox.py), which delivers it with retries.
+
+Backpressure: the queue is bounded. When it is full, submit() returns False and
+the webhook answers 503 so the provider retries later instead of the worker
+piling up unbounded work.
+
+Burst coalescing (optional, per tenant): chat users often split one thought over
+several messages. With a coalesce window, messages from the same chat arriving
+within the window are buffered and answered by a single turn. The window restarts
+on every new message, capped by a max wait so a chatty user still gets answers.
+"""
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from agent.orchestrator import process_message
+from agent.chat_lock import chat_turn_lock
+from agent.metrics import observe_stage, span
+from api.outbox import outbox_dispatcher, OUTBOX_HANDOFF_SECONDS
+from channels import get_adapter, ChannelMessage
+from tenants.loader import TenantConfig
+
+# Number of concurrent consumers (turns in flight per process)
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "8"))
+# Maximum queued messages before webhooks are rejected with 503
+WEBHOOK_QUEUE_MAX_SIZE = int(os.getenv("WEBHOOK_QUEUE_MAX_SIZE", "1000"))
+# Seconds to keep draining the queue on shutdown before cancelling consumers
+WEBHOOK_QUEUE_DRAIN_TIMEOUT = float(os.getenv("WEBHOOK_QUEUE_DRAIN_TIMEOUT", "20"))
+# Default cap on a coalesced burst, as a multiple of the tenant's coalesce window
+COALESCE_MAX_WAIT_FACTOR = 4
+
+
+@dataclass
+class InboundJob:
+    """Parsed inbound message(s) from one chat waiting for agent processing."""
+    messages: List[ChannelMessage]
+    channel_config: dict
+    tenant_config: Optional[TenantConfig] = None  # Resolved by the webhook (not re-loaded)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _Burst:
+    """Messages from one chat being buffered within the coalesce window."""
+    messages: List[ChannelMessage]
+    channel_config: dict
+    window: float
+    deadline: float
+    tenant_config: Optional[TenantConfig] = None
+    timer: Optional[asyncio.Task] = None
+
+
+async def handle_inbound_message(
+    messages: List[ChannelMessage],
+    channel_config: dict,
+    tenant_config: Optional[TenantConfig] = None
+) -> None:
+    """
+    Run the agent for inbound message(s) of one chat and hand the reply to the outbox.
+
+    Turns for the same chat are serialized, and the outbox delivers a chat's
+    replies in commit order, so consecutive turns are answered in order.
+
+    Args:
+        messages: Parsed inbound messages from one chat (several for a coalesced burst)
+        channel_config: Channel-specific configuration of the message's tenant
+        tenant_config: The tenant's config, if already resolved (see tenants.loader.resolve_tenant)
+    """
+    message = messages[-1]
+    channel = message.channel.value
+    turn_start = time.monotonic()
+
+    # Take the chat lock before any other await, so turns queue up in dequeue order
+    async with chat_turn_lock(message.tenant_id, message.sender_id):
+        adapter = get_adapter(message.channel)
+
+        # Stream partial text where the channel supports it (e.g., Telegram message edits)
+        stream = adapter.start_stream(message.sender_id, channel_config)
+
+        # Process message through agent orchestrator
+        result = await process_message(
+            [m.text for m in messages] if len(messages) > 1 else message.text,
+            message.sender_id,
+            tenant_id=message.tenant_id,
+            channel=message.channel.value,
+            tenant_config=tenant_config,
+            on_text=stream.update if stream else None,
+            outbox_hold=OUTBOX_HANDOFF_SECONDS,
+            external_ids=[m.dedup_key for m in messages]
+        )
+        if result.duplicate:
+            # Redelivery of a message already answered (e.g., by another process)
+            return
+
+        # Hand the reply to the outbox dispatcher; a streamed partial reply is
+        # edited into the final text instead of sending a second message
+        with span("outbox_handoff", message.tenant_id, channel):
+            placeholder_id = await stream.settle() if stream else None
+            final_text = result.response_text.strip()
+            if result.outbox_id is None:
+                # Reply wasn't saved with an outbox row (e.g., canned error reply)
+                await outbox_dispatcher.enqueue(
+                    message.tenant_id, channel, message.sender_id, result.response_text, placeholder_id
+                )
+            else:
+                await outbox_dispatcher.handoff(
+                    result.outbox_id,
+                    edit_message_id=placeholder_id,
+                    delivered=bool(placeholder_id) and stream.shown_text == final_text,
+                )
+
+    observe_stage("turn", time.monotonic() - turn_start, message.tenant_id, channel)
+
+
+class MessageQueue:
+    """Bounded in-process queue with a pool of async consumers."""
+
+    def __init__(self, workers: int = WEBHOOK_WORKERS, max_size: int = WEBHOOK_QUEUE_MAX_SIZE):
+        self.workers = workers
+        self.max_size = max_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._bursts: Dict[Tuple[str, str], _Burst] = {}
+
+        # Metrics
+        self.busy = 0
+        self.enqueued = 0
+        self.rejected = 0
+        self.processed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.last_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def start(self) -> None:
+        """Start the consumer pool (call from the app's startup)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._tasks = [
+            asyncio.create_task(self._consume(i), name=f"message-queue-{i}")
+            for i in range(self.workers)
+        ]
+        print(f"[Queue] Started {self.workers} consumers (max_size={self.max_size})")
+
+    async def stop(self, timeout: float = WEBHOOK_QUEUE_DRAIN_TIMEOUT) -> None:
+        """Flush buffered bursts, drain queued messages (up to timeout), then cancel the consumers."""
+        if not self._tasks:
+            return
+
+        async def drain() -> None:
+            for key in list(self._bursts):
+                burst = self._bursts.pop(key)
+                burst.timer.cancel()
+                # Messages were already acknowledged - wait for room rather than drop them
+                await self._queue.put(InboundJob(
+                    messages=burst.messages, channel_config=burst.channel_config, tenant_config=burst.tenant_config
+                ))
+                self.enqueued += 1
+            await self._queue.join()
+
+        try:
+            await asyncio.wait_for(drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"[Queue] Shutdown with {self._queue.qsize()} messages still queued")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(
+        self,
+        message: ChannelMessage,
+        channel_config: dict,
+        coalesce_window_ms: int = 0,
+        coalesce_max_wait_ms: Optional[int] = None,
+        tenant_config: Optional[TenantConfig] = None
+    ) -> bool:
+        """
+        Enqueue a message for processing without waiting.
+
+        Args:
+            message: Parsed inbound message
+            channel_config: Channel-specific configuration of the message's tenant
+            coalesce_window_ms: Buffer messages from the same chat arriving within this
+                window and answer them with one turn (0 = process each message)
+            coalesce_max_wait_ms: Cap on how long a burst is buffered
+                (default: COALESCE_MAX_WAIT_FACTOR x window)
+            tenant_config: The tenant's resolved config, passed down to the agent
+
+        Returns:
+            True if accepted, False if the queue is full (or not running)
+        """
+        if self._queue is None or self._queue.full():
+            self.rejected += 1
+            print(f"[Queue] Full ({self.max_size}), rejecting message from chat={message.sender_id}")
+            return False
+
+        if coalesce_window_ms <= 0:
+            self._enqueue(InboundJob(messages=[message], channel_config=channel_config, tenant_config=tenant_config))
+            return True
+
+        key = (message.tenant_id, message.sender_id)
+        burst = self._bursts.get(key)
+        if burst:
+            # Same chat within the window: add to the burst and restart the window
+            burst.messages.append(message)
+            burst.timer.cancel()
+            self.coalesced += 1
+        else:
+            window = coalesce_window_ms / 1000
+            max_wait = (coalesce_max_wait_ms or coalesce_window_ms * COALESCE_MAX_WAIT_FACTOR) / 1000
+            burst = self._bursts[key] = _Burst(
+                messages=[message],
+                channel_config=channel_config,
+                window=window,
+                deadline=time.monotonic() + max_wait,
+                tenant_config=tenant_config,
+            )
+        delay = min(burst.window, max(0.0, burst.deadline - time.monotonic()))
+        burst.timer = asyncio.create_task(self._flush_burst(key, delay))
+        return True
+
+    def _enqueue(self, job: InboundJob) -> None:
+        """Put a job on the queue (capacity was checked on submit)."""
+        self._queue.put_nowait(job)
+        self.enqueued += 1
+
+    async def _flush_burst(self, key: Tuple[str, str], delay: float) -> None:
+        """Hand a buffered burst to the consumers once its window closes."""
+        await asyncio.sleep(delay)
+        burst = self._bursts.pop(key)
+        job = InboundJob(messages=burst.messages, channel_config=burst.channel_config, tenant_config=burst.tenant_config)
+        # Messages were already acknowledged - wait for room rather than drop them
+        await self._queue.put(job)
+        self.enqueued += 1
+
+    def has_backlog(self) -> bool:
+        """True while inbound messages are waiting for a free consumer."""
+        return bool(self._queue and self._queue.qsize() > 0)
+
+    def stats(self) -> dict:
+        """Queue depth and throughput counters."""
+        return {
+            "depth": self._queue.qsize() if self._queue else 0,
+            "max_size": self.max_size,
+            "workers": self.workers,
+            "busy_workers": self.busy,
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "processed": self.processed,
+            "failed": self.failed,
+            "open_bursts": len(self._bursts),
+            "coalesced": self.coalesced,
+            "last_wait_seconds": round(self.last_wait_seconds, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+        }
+
+    async def _consume(self, worker_id: int) -> None:
+        """Consumer loop: take one job at a time and process it."""
+        while True:
+            job = await self._queue.get()
+            self.busy += 1
+            wait = time.monotonic() - job.enqueued_at
+            self.last_wait_seconds = wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            last = job.messages[-1]
+            observe_stage("queue_wait", wait, last.tenant_id, last.channel.value)
+            try:
+                await handle_inbound_message(job.messages, job.channel_config, job.tenant_config)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                print(f"[Queue] worker={worker_id} chat={job.messages[-1].sender_id} | ERROR: {e}")
+            finally:
+                self.busy -= 1
+                self._queue.task_done()
+
+
+# Process-wide queue used by the webhook routes
+message_queue = MessageQueue()
@@ -0,0 +1,305 @@
+"""
+Outbox dispatcher - delivers replies from the outbound_messages table.
+
+The orchestrator writes the assistant message and its outbox row in one
+transaction, so a reply is never lost between "saved" and "sent" (a crash,
+a channel outage or a 429 only delays it). The dispatcher claims due rows
+and sends them through the channel adapters:
+
+    - per chat, replies go out in order (a row waits for earlier rows of its chat)
+    - per channel, a token bucket keeps sends under the provider's global rate
+      limit, and Telegram chats get at most one message per OUTBOX_TELEGRAM_CHAT_INTERVAL
+    - per (tenant, channel), a circuit breaker stops hammering a failing
+      bot/account; its replies are deferred until the breaker half-opens
+    - failed sends are retried with backoff, up to the row's max_attempts
+
+A live turn holds its row back (OUTBOX_HANDOFF_SECONDS) while its streamed
+partial text settles, then hands it off: the dispatcher edits the streamed
+placeholder into the final text instead of sending a second message. If the
+process dies before the handoff, the hold expires and the reply is sent anyway.
+
+Delivery is at-least-once: a reply whose send succeeded but was not marked
+sent (crash in between) is requeued after OUTBOX_STALE_SECONDS and sent again.
+"""
+import os
+import asyncio
+import time
+from typing import Dict, Optional, Set, Tuple
+from agent.llm_gateway import CircuitBreaker
+from agent.llm_scheduler import TokenBucket
+from agent.metrics import observe_stage, span
+from agent.worker import retry_delay
+from channels import get_adapter, ChannelType, ChannelResponse
+from storage.database import AsyncSessionLocal
+from storage.models.outbox import OutboundMessage
+from storage.repositories import AsyncOutboxRepository
+from tenants.loader import resolve_tenant
+
+# Replies being sent at once (per process)
+OUTBOX_CONCURRENCY = int(os.getenv("OUTBOX_CONCURRENCY", "16"))
+# Seconds between polls when nothing was handed off
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1.0"))
+# Max seconds a live turn's reply is held back for its handoff (streamed placeholder settling)
+OUTBOX_HANDOFF_SECONDS = float(os.getenv("OUTBOX_HANDOFF_SECONDS", "30"))
+# Replies 'sending' longer than this are assumed orphaned by a crashed dispatcher
+OUTBOX_STALE_SECONDS = float(os.getenv("OUTBOX_STALE_SECONDS", "120"))
+# Global send rates per channel (messages per second, 0 = unlimited)
+CHANNEL_RATES = {
+    ChannelType.TELEGRAM.value: float(os.getenv("OUTBOX_TELEGRAM_PER_SECOND", "30")),
+    ChannelType.WHATSAPP.value: float(os.getenv("OUTBOX_WHATSAPP_PER_SECOND", "10")),
+}
+# Minimum seconds between two messages to the same Telegram chat
+TELEGRAM_CHAT_INTERVAL = float(os.getenv("OUTBOX_TELEGRAM_CHAT_INTERVAL", "1.0"))
+# Per (tenant, channel) circuit breaker
+OUTBOX_BREAKER_FAILURE_THRESHOLD = int(os.getenv("OUTBOX_BREAKER_FAILURE_THRESHOLD", "5"))
+OUTBOX_BREAKER_RESET_SECONDS = float(os.getenv("OUTBOX_BREAKER_RESET_SECONDS", "60"))
+# Bound on remembered per-chat send times
+CHAT_SEND_TIMES_MAX = 10000
+
+
+class OutboxDispatcher:
+    """
+    Polls outbound_messages and sends up to `concurrency` replies at a time.
+
+    Several dispatchers (API processes) can run side by side - rows are claimed
+    with SELECT ... FOR UPDATE SKIP LOCKED, and a chat's next reply is only
+    claimable once its previous one is done.
+
+    Args:
+        concurrency: Max replies being sent at once
+        poll_interval: Seconds between polls when idle (handoffs wake the dispatcher immediately)
+    """
+
+    def __init__(self, concurrency: int = OUTBOX_CONCURRENCY, poll_interval: float = OUTBOX_POLL_INTERVAL):
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self._running: Set[asyncio.Task] = set()
+        self._loop_task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._last_stale_check = 0.0
+        self._buckets: Dict[str, TokenBucket] = {
+            # Burst of one second's worth - providers enforce per-second limits
+            channel: TokenBucket(rate * 60, capacity=rate)
+            for channel, rate in CHANNEL_RATES.items()
+        }
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self._chat_sent_at: Dict[Tuple[str, str], float] = {}
+
+        # Stats
+        self.sent = 0
+        self.edited = 0
+        self.retried = 0
+        self.failed = 0
+        self.deferred = 0
+
+    async def start(self) -> None:
+        """Start polling in the background."""
+        if self._loop_task:
+            return
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._loop_task = asyncio.create_task(self.run())
+        print(f"[Outbox] Started ({self.concurrency} concurrent sends)")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Stop claiming replies and wait for sends in flight (up to timeout)."""
+        self._stopping = True
+        if self._loop_task:
+            self._loop_task.cancel()
+            await asyncio.gather(self._loop_task, return_exceptions=True)
+            self._loop_task = None
+        if self._running:
+            # Unfinished sends stay 'sending' and are requeued by requeue_stale
+            await asyncio.wait(self._running, timeout=timeout)
+        print("[Outbox] Stopped")
+
+    def wake(self) -> None:
+        """Poll now instead of waiting for the next poll interval."""
+        if self._wake:
+            self._wake.set()
+
+    async def run(self) -> None:
+        """Poll loop - runs until cancelled."""
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        while not self._stopping:
+            try:
+                claimed = await self._poll_once()
+            except Exception as e:
+                print(f"[Outbox] Poll error: {e}")
+                claimed = 0
+            if claimed:
+                # Let finished sends free their slots (and unblock their chats) before polling again
+                await asyncio.sleep(0)
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def handoff(self, outbox_id: int, edit_message_id: Optional[str] = None, delivered: bool = False) -> None:
+        """
+        Release a held reply for delivery.
+
+        Args:
+            outbox_id: The reply's outbox row
+            edit_message_id: Streamed placeholder message to replace with the reply
+            delivered: The placeholder already shows the full reply - just mark it sent
+        """
+        async with AsyncSessionLocal() as db:
+            repo = AsyncOutboxRepository(db)
+            if delivered:
+                await repo.complete(outbox_id)
+                return
+            await repo.release(outbox_id, edit_message_id)
+        self.wake()
+
+    async def enqueue(
+        self,
+        tenant_id: str,
+        channel: str,
+        recipient_id: str,
+        text: str,
+        edit_message_id: Optional[str] = None
+    ) -> None:
+        """Queue a reply that has no assistant message (e.g., an error reply) for delivery."""
+        async with AsyncSessionLocal() as db:
+            await AsyncOutboxRepository(db).enqueue(
+                tenant_id, channel, recipient_id, text, edit_message_id=edit_message_id
+            )
+        self.wake()
+
+    async def _poll_once(self) -> int:
+        """Claim due replies into free slots. Returns the number of replies claimed."""
+        free = self.concurrency - len(self._running)
+        if free <= 0:
+            return 0
+
+        async with AsyncSessionLocal() as db:
+            repo = AsyncOutboxRepository(db)
+            now = time.monotonic()
+            if now - self._last_stale_check >= OUTBOX_STALE_SECONDS / 2:
+                self._last_stale_check = now
+                requeued = await repo.requeue_stale(OUTBOX_STALE_SECONDS)
+                if requeued:
+                    print(f"[Outbox] Requeued {requeued} stale replies")
+            rows = await repo.claim(free)
+
+        for row in rows:
+            task = asyncio.create_task(self._deliver(row))
+            self._running.add(task)
+            task.add_done_callback(self._on_done)
+        return len(rows)
+
+    def _on_done(self, task: asyncio.Task) -> None:
+        """Free the slot and poll again - the chat's next reply may be claimable now."""
+        self._running.discard(task)
+        self.wake()
+
+    def _breaker(self, tenant_id: str, channel: str) -> CircuitBreaker:
+        key = (tenant_id, channel)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(
+                OUTBOX_BREAKER_FAILURE_THRESHOLD,
+                OUTBOX_BREAKER_RESET_SECONDS,
+                name=f"Outbox {tenant_id}/{channel}",
+            )
+        return breaker
+
+    async def _throttle(self, row: OutboundMessage) -> None:
+        """Wait for the channel's global rate limit and the chat's send interval."""
+        bucket = self._buckets.get(row.channel)
+        if bucket and not bucket.unlimited:
+            while True:
+                wait = bucket.wait_time(1)
+                if wait <= 0:
+                    bucket.take(1)
+                    break
+                await asyncio.sleep(wait)
+
+        if row.channel == ChannelType.TELEGRAM.value and TELEGRAM_CHAT_INTERVAL > 0:
+            key = (row.tenant_id, row.recipient_id)
+            last = self._chat_sent_at.get(key)
+            if last is not None:
+                wait = last + TELEGRAM_CHAT_INTERVAL - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+            self._chat_sent_at[key] = time.monotonic()
+            if len(self._chat_sent_at) > CHAT_SEND_TIMES_MAX:
+                cutoff = time.monotonic() - TELEGRAM_CHAT_INTERVAL
+                self._chat_sent_at = {k: t for k, t in self._chat_sent_at.items() if t > cutoff}
+
+    async def _send(self, row: OutboundMessage, channel_config: dict) -> bool:
+        """Edit the streamed placeholder (if any) into the reply, otherwise send a new message."""
+        adapter = get_adapter(ChannelType(row.channel))
+        response = ChannelResponse(text=row.text)
+        if row.edit_message_id:
+            if await adapter.edit_message(row.recipient_id, row.edit_message_id, response, channel_config):
+                self.edited += 1
+                return True
+        return await adapter.send_message(row.recipient_id, response, channel_config)
+
+    async def _deliver(self, row: OutboundMessage) -> None:
+        """Send one reply and record the outcome."""
+        breaker = self._breaker(row.tenant_id, row.channel)
+        if not breaker.allow():
+            async with AsyncSessionLocal() as db:
+                await AsyncOutboxRepository(db).defer(row, OUTBOX_BREAKER_RESET_SECONDS)
+            self.deferred += 1
+            return
+
+        error = None
+        try:
+            tenant = await resolve_tenant(row.tenant_id)
+            channel_config = tenant.channel_config(ChannelType(row.channel)) if tenant else None
+            if not channel_config:
+                error = f"Tenant '{row.tenant_id}' has no {row.channel} configuration"
+            else:
+                await self._throttle(row)
+                with span("outbound_send", row.tenant_id, row.channel):
+                    if not await self._send(row, channel_config):
+                        error = "Channel rejected the message"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+
+        if error is None:
+            breaker.record_success()
+            async with AsyncSessionLocal() as db:
+                await AsyncOutboxRepository(db).complete(row.id)
+            self.sent += 1
+            if row.created_at:
+                # Time from commit with the assistant message to delivery (incl. handoff hold and retries)
+                delay = time.time() - row.created_at.timestamp()
+                observe_stage("outbox_delay", max(0.0, delay), row.tenant_id, row.channel)
+            return
+
+        breaker.record_failure()
+        delay = retry_delay(row.attempts)
+        async with AsyncSessionLocal() as db:
+            will_retry = await AsyncOutboxRepository(db).fail(row, error, delay)
+        if will_retry:
+            self.retried += 1
+            print(f"[Outbox] reply={row.id} {row.channel} chat={row.recipient_id} | attempt {row.attempts}/{row.max_attempts} failed: {error} | retry in {delay:.0f}s")
+        else:
+            self.failed += 1
+            print(f"[Outbox] reply={row.id} {row.channel} chat={row.recipient_id} | FAILED after {row.attempts} attempts: {error}")
+
+    def stats(self) -> dict:
+        """Runtime counters for /stats."""
+        return {
+            "concurrency": self.concurrency,
+            "sending": len(self._running),
+            "sent": self.sent,
+            "edited": self.edited,
+            "retried": self.retried,
+            "failed": self.failed,
+            "deferred_breaker_open": self.deferred,
+            "open_breakers": sum(1 for b in self._breakers.values() if b.state == "open"),
+        }
+
+
+# Process-wide dispatcher used by the message queue consumers
+outbox_dispatcher = OutboxDispatcher()
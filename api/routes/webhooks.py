@@ -1,12 +1,13 @@
 """
 Webhook endpoints for receiving messages from communication channels.
 """
-from typing import Optional
+import time
 from fastapi import APIRouter, Request, HTTPException
-from agent.orchestrator import process_message
-from channels import get_adapter, ChannelType, ChannelResponse
-from storage.database import get_db
-from storage.repositories import TenantRepository
+from api.message_queue import message_queue
+from api.dedup import inbound_dedup
+from agent.metrics import observe_stage, span
+from channels import get_adapter, ChannelType
+from tenants.loader import resolve_tenant
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 
@@ -15,7 +16,7 @@ router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 async def telegram_webhook(request: Request, tenant_id: str):
     """
     Telegram webhook endpoint with multi-tenant support.
-    Receives messages from Telegram and processes them through the agent.
+    Receives messages from Telegram and queues them for the agent.
 
     Args:
         tenant_id: Unique identifier for the tenant (e.g., "valdman", "joannas_bakery")
@@ -31,7 +32,7 @@ async def telegram_webhook(request: Request, tenant_id: str):
 async def whatsapp_webhook(request: Request, tenant_id: str):
     """
     WhatsApp webhook endpoint via Twilio.
-    Receives messages from Twilio and processes them through the agent.
+    Receives messages from Twilio and queues them for the agent.
 
     Twilio sends webhooks as form data (application/x-www-form-urlencoded).
 
@@ -53,29 +54,31 @@ async def _handle_channel_webhook(
     """
     Unified webhook handler for all channels.
 
+    Validates and parses the webhook, then queues the message for background
+    processing - the reply is sent by the queue consumers, not in this request.
+
     Args:
         request: FastAPI request object
         tenant_id: Tenant identifier from URL
         channel: The channel type
 
     Returns:
-        {"ok": True} on success
+        {"ok": True} once the message is queued (or ignored)
     """
-    # Get database session
-    db_gen = get_db()
-    db = next(db_gen)
-
-    try:
-        # Load tenant
-        tenant_repo = TenantRepository(db)
-        tenant = tenant_repo.get_by_id(tenant_id)
+    # Resolve tenant (cached - no DB round trip on a warm cache; passed down to the agent)
+    load_start = time.monotonic()
+    tenant = await resolve_tenant(tenant_id)
 
-        if not tenant:
-            raise HTTPException(status_code=404, detail=f"Tenant '{tenant_id}' not found")
+    # The tenant label is only trusted once the tenant exists - a URL with a random
+    # tenant ID must not create a new metrics series
+    observe_stage("tenant_load", time.monotonic() - load_start, tenant_id if tenant else "unknown", channel.value)
+    if not tenant:
+        raise HTTPException(status_code=404, detail=f"Tenant '{tenant_id}' not found")
 
-        # Get channel adapter
-        adapter = get_adapter(channel)
+    # Get channel adapter
+    adapter = get_adapter(channel)
 
+    with span("webhook_parse", tenant_id, channel.value):
         # Parse payload based on channel content type
         content_type = request.headers.get("content-type", "")
 
@@ -90,65 +93,36 @@ async def _handle_channel_webhook(
         # Parse into unified message format
         message = adapter.parse_webhook(payload, tenant_id)
 
-        # Ignore non-message webhooks (e.g., edited messages, reactions)
-        if not message:
-            return {"ok": True}
-
-        # Get channel-specific config from tenant
-        channel_config = _get_channel_config(tenant, channel)
-        if not channel_config:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Tenant '{tenant_id}' has no {channel.value} configuration"
-            )
-
-        # Process message through agent orchestrator
-        result = await process_message(
-            message.text,
-            message.sender_id,
-            tenant_id=tenant_id,
-            channel=channel.value
-        )
-
-        # Send response back through the same channel
-        response = ChannelResponse(text=result.response_text)
-        await adapter.send_message(message.sender_id, response, channel_config)
-
+    # Ignore non-message webhooks (e.g., edited messages, reactions)
+    if not message:
         return {"ok": True}
 
-    finally:
-        # Close database session
-        try:
-            next(db_gen)
-        except StopIteration:
-            pass
-
-
-def _get_channel_config(tenant, channel: ChannelType) -> Optional[dict]:
-    """
-    Extract channel-specific configuration from tenant.
+    # Get channel-specific config from tenant
+    channel_config = tenant.channel_config(channel)
+    if not channel_config:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Tenant '{tenant_id}' has no {channel.value} configuration"
+        )
 
-    Prefers JSON config columns (telegram_config, whatsapp_config) but falls back
-    to legacy bot_token column for backward compatibility.
+    # Drop redeliveries of a message this process already accepted
+    if not inbound_dedup.add(message.dedup_key):
+        print(f"[Dedup] tenant={tenant_id} {channel.value} chat={message.sender_id} | dropped redelivery {message.external_id}")
+        return {"ok": True}
 
-    Args:
-        tenant: Tenant database model
-        channel: The channel type
+    # Hand off to the background consumers and acknowledge immediately.
+    # If the queue is full, 503 makes the provider retry later.
+    agent_settings = tenant.config.SETTINGS
+    accepted = message_queue.submit(
+        message,
+        channel_config,
+        coalesce_window_ms=agent_settings.get("coalesce_window_ms", 0),
+        coalesce_max_wait_ms=agent_settings.get("coalesce_max_wait_ms"),
+        tenant_config=tenant.config,
+    )
+    if not accepted:
+        # Not accepted - the provider's retry must get through
+        inbound_dedup.discard(message.dedup_key)
+        raise HTTPException(status_code=503, detail="Message queue is full, retry later")
 
-    Returns:
-        Channel configuration dict, or None if not configured
-    """
-    if channel == ChannelType.TELEGRAM:
-        # Prefer new telegram_config JSON, fall back to legacy bot_token
-        if tenant.telegram_config:
-            return tenant.telegram_config
-        elif tenant.bot_token:
-            return {"bot_token": tenant.bot_token}
-        return None
-
-    elif channel == ChannelType.WHATSAPP:
-        if tenant.whatsapp_config:
-            return tenant.whatsapp_config
-        return None
-
-    return None
+    return {"ok": True}
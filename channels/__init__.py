@@ -4,9 +4,9 @@ Channel abstraction layer.
 Provides a unified interface for handling messages across different
 communication channels (Telegram, WhatsApp, etc.).
 """
-from typing import Dict
+from typing import Dict, Optional
 from .models import ChannelType, ChannelMessage, ChannelResponse
-from .base import ChannelAdapter
+from .base import ChannelAdapter, StreamingReply
 from .telegram import TelegramAdapter
 from .whatsapp import WhatsAppAdapter
 
@@ -47,13 +47,45 @@ def register_adapter(channel: ChannelType, adapter: ChannelAdapter) -> None:
     _ADAPTERS[channel] = adapter
 
 
+def get_channel_config(tenant, channel: ChannelType) -> Optional[dict]:
+    """
+    Extract channel-specific configuration from tenant.
+
+    Prefers JSON config columns (telegram_config, whatsapp_config) but falls back
+    to legacy bot_token column for backward compatibility.
+
+    Args:
+        tenant: Tenant database model
+        channel: The channel type
+
+    Returns:
+        Channel configuration dict, or None if not configured
+    """
+    if channel == ChannelType.TELEGRAM:
+        # Prefer new telegram_config JSON, fall back to legacy bot_token
+        if tenant.telegram_config:
+            return tenant.telegram_config
+        elif tenant.bot_token:
+            return {"bot_token": tenant.bot_token}
+        return None
+
+    elif channel == ChannelType.WHATSAPP:
+        if tenant.whatsapp_config:
+            return tenant.whatsapp_config
+        return None
+
+    return None
+
+
 __all__ = [
     "ChannelType",
     "ChannelMessage",
     "ChannelResponse",
     "ChannelAdapter",
+    "StreamingReply",
     "TelegramAdapter",
     "WhatsAppAdapter",
     "get_adapter",
     "register_adapter",
+    "get_channel_config",
 ]
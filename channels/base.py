@@ -25,7 +25,8 @@ class ChannelAdapter(ABC):
 
         Returns:
             ChannelMessage if the payload contains a valid message, None otherwise
-            (e.g., for webhook verification requests or non-message events)
+            (e.g., for webhook verification requests or non-message events).
+            Set external_id to the provider's delivery ID so redeliveries are dropped.
         """
         pass
 
@@ -49,6 +50,46 @@ class ChannelAdapter(ABC):
         """
         pass
 
+    async def edit_message(
+        self,
+        sender_id: str,
+        message_id: str,
+        response: ChannelResponse,
+        channel_config: dict
+    ) -> bool:
+        """
+        Replace the text of a message sent earlier (e.g., a streamed partial reply).
+
+        Channels that can edit sent messages override this. The default returns
+        False, meaning the caller should send a new message instead.
+
+        Args:
+            sender_id: Recipient identifier (chat_id, phone number, etc.)
+            message_id: Channel message ID to edit
+            response: The new content
+            channel_config: Channel-specific configuration
+
+        Returns:
+            True if the message now shows the response, False otherwise
+        """
+        return False
+
+    def start_stream(self, sender_id: str, channel_config: dict) -> Optional["StreamingReply"]:
+        """
+        Start a progressive reply that is updated while the response is generated.
+
+        Channels that can edit sent messages override this. The default returns None,
+        meaning the caller should wait for the full response and use send_message().
+
+        Args:
+            sender_id: Recipient identifier (chat_id, phone number, etc.)
+            channel_config: Channel-specific configuration
+
+        Returns:
+            StreamingReply if streaming is supported and enabled, None otherwise
+        """
+        return None
+
     @abstractmethod
     def verify_webhook(self, payload: dict, headers: dict, channel_config: dict) -> bool:
         """
@@ -63,3 +104,48 @@ class ChannelAdapter(ABC):
             True if webhook is authentic, False otherwise
         """
         pass
+
+
+class StreamingReply(ABC):
+    """
+    A reply delivered progressively while the LLM is still generating.
+
+    update() is called with the accumulated text as it grows (implementations
+    throttle as needed); finish() delivers the definitive final text. When the
+    final text is delivered by the outbox instead, settle() returns the message
+    showing the partial text so the outbox can replace it.
+    """
+
+    shown_text: str = ""  # Text currently visible to the recipient
+
+    @abstractmethod
+    async def update(self, text: str) -> None:
+        """
+        Show partial response text.
+
+        Args:
+            text: Full text generated so far (not a delta)
+        """
+        pass
+
+    @abstractmethod
+    async def finish(self, text: str) -> bool:
+        """
+        Deliver the final response text, replacing any partial text shown.
+
+        Args:
+            text: Final response text
+
+        Returns:
+            True if the final text was delivered successfully, False otherwise
+        """
+        pass
+
+    async def settle(self) -> Optional[str]:
+        """
+        Wait for in-flight partial updates without sending the final text.
+
+        Returns:
+            ID of the message showing the partial text, or None if nothing was shown
+        """
+        return None
@@ -25,12 +25,23 @@ class ChannelMessage:
     text: str                # Message content
     tenant_id: str           # Resolved from webhook URL
 
+    # Provider's ID for this delivery (Telegram update_id, Twilio MessageSid) - the same
+    # for every redelivery of a webhook, used to drop duplicates
+    external_id: Optional[str] = None
+
     # Optional metadata
     sender_name: Optional[str] = None
     media_url: Optional[str] = None      # Future: images, documents
     media_type: Optional[str] = None     # Future: "image", "document", "audio"
     raw_payload: Optional[dict] = None   # Original webhook payload for debugging
 
+    @property
+    def dedup_key(self) -> Optional[str]:
+        """Globally unique key of this delivery (provider IDs are only unique per bot/account)."""
+        if not self.external_id:
+            return None
+        return f"{self.channel.value}:{self.tenant_id}:{self.external_id}"
+
 
 @dataclass
 class ChannelResponse:
@@ -1,11 +1,192 @@
 """
 Telegram Bot API adapter.
 """
+import asyncio
+import os
+import random
+import time
 from typing import Optional
-import requests
-from .base import ChannelAdapter
+import httpx
+from .base import ChannelAdapter, StreamingReply
 from .models import ChannelMessage, ChannelResponse, ChannelType
 
+# Minimum seconds between editMessageText calls while streaming
+# (Telegram throttles bots that edit the same chat too often)
+STREAM_EDIT_INTERVAL = float(os.getenv("TELEGRAM_STREAM_EDIT_INTERVAL", "1.0"))
+
+# Telegram rejects messages longer than this
+MAX_MESSAGE_LENGTH = 4096
+
+# Bot API server (point at scripts/fake_services.py for load tests)
+TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org").rstrip("/")
+
+# Shared connection pool and timeouts
+TELEGRAM_CONNECT_TIMEOUT = float(os.getenv("TELEGRAM_CONNECT_TIMEOUT", "5"))
+TELEGRAM_READ_TIMEOUT = float(os.getenv("TELEGRAM_READ_TIMEOUT", "10"))
+TELEGRAM_MAX_CONNECTIONS = int(os.getenv("TELEGRAM_MAX_CONNECTIONS", "100"))
+TELEGRAM_MAX_KEEPALIVE = int(os.getenv("TELEGRAM_MAX_KEEPALIVE", "20"))
+
+# Retries: 429 waits for the retry_after Telegram sends (capped), 5xx/network errors back off briefly
+TELEGRAM_MAX_RETRIES = int(os.getenv("TELEGRAM_MAX_RETRIES", "2"))
+TELEGRAM_MAX_RETRY_AFTER = float(os.getenv("TELEGRAM_MAX_RETRY_AFTER", "30"))
+
+# Methods that must not run twice: a timeout or 5xx may come after Telegram delivered
+# the message, so they are only retried when the request surely wasn't processed
+# (429, or the connection was never made) - other failures are left to the outbox's retries
+NON_IDEMPOTENT_METHODS = {"sendMessage"}
+# Errors raised before the request reached Telegram
+_NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401 - optional, enables HTTP/2 in httpx
+        return True
+    except ImportError:
+        return False
+
+
+# One client per process - keep-alive connections to the Bot API are reused across chats
+_client = httpx.AsyncClient(
+    http2=_http2_available(),
+    timeout=httpx.Timeout(TELEGRAM_READ_TIMEOUT, connect=TELEGRAM_CONNECT_TIMEOUT),
+    limits=httpx.Limits(
+        max_connections=TELEGRAM_MAX_CONNECTIONS,
+        max_keepalive_connections=TELEGRAM_MAX_KEEPALIVE,
+    ),
+)
+
+
+async def close_client() -> None:
+    """Close the shared Bot API client (call on shutdown)."""
+    await _client.aclose()
+
+
+def _retry_after(data: Optional[dict]) -> Optional[float]:
+    """retry_after seconds from a Bot API error response, if any."""
+    parameters = (data or {}).get("parameters") or {}
+    return parameters.get("retry_after")
+
+
+async def _post(bot_token: str, method: str, payload: dict, retry: bool = True) -> Optional[dict]:
+    """
+    Call a Bot API method.
+
+    With retry, a 429 waits for Telegram's retry_after (up to TELEGRAM_MAX_RETRY_AFTER)
+    and 5xx/network errors back off briefly, up to TELEGRAM_MAX_RETRIES times.
+    NON_IDEMPOTENT_METHODS are only retried on 429 and connect-phase errors.
+
+    Returns:
+        The parsed response (including {"ok": false, ...} errors), or None on network error
+    """
+    url = f"{TELEGRAM_API_BASE_URL}/bot{bot_token}/{method}"
+    attempt = 0
+    while True:
+        data = None
+        not_sent = False
+        try:
+            response = await _client.post(url, json=payload)
+            status = response.status_code
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"[Telegram] {method} error: {type(e).__name__}: {e}")
+            not_sent = isinstance(e, _NOT_SENT_ERRORS)
+            status = None
+
+        if status is not None and status != 429 and status < 500:
+            return data
+        if not retry or attempt >= TELEGRAM_MAX_RETRIES:
+            return data
+        if method in NON_IDEMPOTENT_METHODS and status != 429 and not not_sent:
+            # May already be delivered - a duplicate reply is worse than a later retry
+            return data
+
+        if status == 429:
+            delay = float(_retry_after(data) or 1)
+            if delay > TELEGRAM_MAX_RETRY_AFTER:
+                print(f"[Telegram] {method} rate limited for {delay:.0f}s, giving up")
+                return data
+            print(f"[Telegram] {method} rate limited, retrying in {delay:.0f}s")
+        else:
+            delay = random.uniform(0.2, 0.5 * (2 ** attempt))
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+class TelegramStreamingReply(StreamingReply):
+    """
+    Progressive Telegram reply: sendMessage on the first text, then editMessageText
+    at most once per STREAM_EDIT_INTERVAL.
+
+    Sends run as background tasks so the LLM stream is never blocked by Bot API
+    round trips; if a send is still in flight, intermediate updates are skipped.
+    """
+
+    def __init__(self, bot_token: str, chat_id: str):
+        self.bot_token = bot_token
+        self.chat_id = chat_id
+        self.message_id: Optional[int] = None
+        self.shown_text = ""
+        self._last_send_at = 0.0
+        self._inflight: Optional[asyncio.Task] = None
+        self._paused_until = 0.0  # Rate limited - skip partial updates until then
+
+    async def update(self, text: str) -> None:
+        text = text.strip()[:MAX_MESSAGE_LENGTH]
+        if not text or text == self.shown_text:
+            return
+        if self._inflight and not self._inflight.done():
+            return
+        if time.monotonic() < self._paused_until:
+            return
+        if self.message_id and time.monotonic() - self._last_send_at < STREAM_EDIT_INTERVAL:
+            return
+        self._last_send_at = time.monotonic()
+        self._inflight = asyncio.create_task(self._show(text, retry=False))
+
+    async def finish(self, text: str) -> bool:
+        await self.settle()
+        text = text.strip()
+        if self.message_id and text == self.shown_text:
+            return True
+        return await self._show(text)
+
+    async def settle(self) -> Optional[str]:
+        if self._inflight:
+            await asyncio.gather(self._inflight, return_exceptions=True)
+        return str(self.message_id) if self.message_id else None
+
+    async def _show(self, text: str, retry: bool = True) -> bool:
+        """
+        Send the first message, or edit it with newer text.
+
+        Partial updates don't retry (the next update carries newer text anyway);
+        a 429 pauses them for Telegram's retry_after instead.
+        """
+        if self.message_id is None:
+            data = await _post(self.bot_token, "sendMessage", {"chat_id": self.chat_id, "text": text}, retry)
+            if data and data.get("ok"):
+                self.message_id = data["result"]["message_id"]
+                self.shown_text = text
+                return True
+            self._pause(data)
+            return False
+
+        data = await _post(
+            self.bot_token, "editMessageText",
+            {"chat_id": self.chat_id, "message_id": self.message_id, "text": text}, retry
+        )
+        if data and data.get("ok"):
+            self.shown_text = text
+            return True
+        self._pause(data)
+        return False
+
+    def _pause(self, data: Optional[dict]) -> None:
+        retry_after = _retry_after(data)
+        if retry_after:
+            self._paused_until = time.monotonic() + float(retry_after)
+
 
 class TelegramAdapter(ChannelAdapter):
     """
@@ -13,6 +194,10 @@ class TelegramAdapter(ChannelAdapter):
 
     Handles parsing incoming Telegram webhooks and sending messages
     through the Telegram Bot API.
+
+    Config keys:
+        bot_token: Telegram bot token
+        streaming: Stream responses via message edits (default: true)
     """
 
     def parse_webhook(self, payload: dict, tenant_id: str) -> Optional[ChannelMessage]:
@@ -45,11 +230,14 @@ class TelegramAdapter(ChannelAdapter):
         if from_user.get("last_name"):
             sender_name = f"{sender_name} {from_user.get('last_name')}"
 
+        update_id = payload.get("update_id")
+
         return ChannelMessage(
             channel=ChannelType.TELEGRAM,
             sender_id=str(chat_id),
             text=text,
             tenant_id=tenant_id,
+            external_id=str(update_id) if update_id is not None else None,
             sender_name=sender_name,
             raw_payload=payload
         )
@@ -72,12 +260,43 @@ class TelegramAdapter(ChannelAdapter):
         if not bot_token:
             return False
 
-        telegram_api = f"https://api.telegram.org/bot{bot_token}"
-        result = requests.post(
-            f"{telegram_api}/sendMessage",
-            json={"chat_id": sender_id, "text": response.text}
+        data = await _post(bot_token, "sendMessage", {"chat_id": sender_id, "text": response.text})
+        return bool(data and data.get("ok"))
+
+    async def edit_message(
+        self,
+        sender_id: str,
+        message_id: str,
+        response: ChannelResponse,
+        channel_config: dict
+    ) -> bool:
+        """
+        Replace a sent message's text via editMessageText.
+
+        An edit to identical text counts as success (Telegram answers "message is not modified").
+        """
+        bot_token = channel_config.get("bot_token")
+        if not bot_token:
+            return False
+
+        data = await _post(
+            bot_token, "editMessageText",
+            {"chat_id": sender_id, "message_id": int(message_id), "text": response.text}
         )
-        return result.ok
+        if data and data.get("ok"):
+            return True
+        return bool(data and "message is not modified" in (data.get("description") or ""))
+
+    def start_stream(self, sender_id: str, channel_config: dict) -> Optional[StreamingReply]:
+        """
+        Start a progressive reply (sendMessage + throttled editMessageText).
+
+        Disabled when channel_config has 'streaming': false.
+        """
+        bot_token = channel_config.get("bot_token")
+        if not bot_token or not channel_config.get("streaming", True):
+            return None
+        return TelegramStreamingReply(bot_token, sender_id)
 
     def verify_webhook(self, payload: dict, headers: dict, channel_config: dict) -> bool:
         """
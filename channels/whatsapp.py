@@ -3,14 +3,85 @@ WhatsApp adapter via Twilio API.
 
 Supports both Twilio Sandbox (for testing) and production WhatsApp Business API.
 """
+import asyncio
 import hashlib
 import hmac
 import os
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
 from twilio.rest import Client
 from .base import ChannelAdapter
 from .models import ChannelMessage, ChannelResponse, ChannelType
 
+try:
+    from twilio.http.async_http_client import AsyncTwilioHttpClient
+except ImportError:  # aiohttp (in requirements.txt) missing - sends fall back to the thread pool
+    AsyncTwilioHttpClient = None
+
+# Twilio REST API server (point at scripts/fake_services.py for load tests)
+TWILIO_API_BASE_URL = os.getenv("TWILIO_API_BASE_URL")
+
+# Seconds before a Twilio API request is abandoned
+TWILIO_REQUEST_TIMEOUT = float(os.getenv("TWILIO_REQUEST_TIMEOUT", "10"))
+# Sends in flight per WhatsApp sender number (Twilio queues/rejects bursts from one number)
+TWILIO_MAX_CONCURRENT_PER_SENDER = int(os.getenv("TWILIO_MAX_CONCURRENT_PER_SENDER", "4"))
+# Threads for blocking sends when the async transport is unavailable
+TWILIO_SEND_THREADS = int(os.getenv("TWILIO_SEND_THREADS", "8"))
+
+# account_sid -> (auth_token, client); rebuilt if the tenant's token changes
+_clients: Dict[str, Tuple[str, Client]] = {}
+# from number -> concurrent send limit
+_sender_limits: Dict[str, asyncio.Semaphore] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_client(account_sid: str, auth_token: str) -> Client:
+    """Cached Twilio client per account (async transport when available)."""
+    cached = _clients.get(account_sid)
+    if cached and cached[0] == auth_token:
+        return cached[1]
+
+    http_client = AsyncTwilioHttpClient(timeout=TWILIO_REQUEST_TIMEOUT) if AsyncTwilioHttpClient else None
+    client = Client(account_sid, auth_token, http_client=http_client)
+    if TWILIO_API_BASE_URL:
+        client.api.base_url = TWILIO_API_BASE_URL.rstrip("/")
+    _clients[account_sid] = (auth_token, client)
+    if cached and _is_async(cached[1]):
+        # Token rotated - release the old client's connection pool
+        asyncio.get_running_loop().create_task(cached[1].http_client.close())
+    return client
+
+
+def _is_async(client: Client) -> bool:
+    return AsyncTwilioHttpClient is not None and isinstance(client.http_client, AsyncTwilioHttpClient)
+
+
+def _sender_limit(from_number: str) -> asyncio.Semaphore:
+    limit = _sender_limits.get(from_number)
+    if limit is None:
+        limit = _sender_limits[from_number] = asyncio.Semaphore(TWILIO_MAX_CONCURRENT_PER_SENDER)
+    return limit
+
+
+async def _create_message(client: Client, **kwargs):
+    """messages.create without blocking the event loop."""
+    if _is_async(client):
+        return await client.messages.create_async(**kwargs)
+
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=TWILIO_SEND_THREADS, thread_name_prefix="twilio-send")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, lambda: client.messages.create(**kwargs))
+
+
+async def close_clients() -> None:
+    """Close cached Twilio clients' connection pools (call on shutdown)."""
+    for _, client in list(_clients.values()):
+        if _is_async(client):
+            await client.http_client.close()
+    _clients.clear()
+
 
 class WhatsAppAdapter(ChannelAdapter):
     """
@@ -61,6 +132,7 @@ class WhatsAppAdapter(ChannelAdapter):
             sender_id=sender_id,
             text=body,
             tenant_id=tenant_id,
+            external_id=payload.get("MessageSid") or None,
             sender_name=sender_name,
             raw_payload=payload
         )
@@ -88,17 +160,19 @@ class WhatsAppAdapter(ChannelAdapter):
             return False
 
         try:
-            client = Client(account_sid, auth_token)
+            client = _get_client(account_sid, auth_token)
 
             # Ensure proper WhatsApp format
             to_number = f"whatsapp:{sender_id}" if not sender_id.startswith("whatsapp:") else sender_id
             from_whatsapp = f"whatsapp:{from_number}" if not from_number.startswith("whatsapp:") else from_number
 
-            message = client.messages.create(
-                body=response.text,
-                from_=from_whatsapp,
-                to=to_number
-            )
+            async with _sender_limit(from_whatsapp):
+                message = await _create_message(
+                    client,
+                    body=response.text,
+                    from_=from_whatsapp,
+                    to=to_number
+                )
 
             print(f"[WhatsApp] Message sent: sid={message.sid}, to={to_number}")
             return True
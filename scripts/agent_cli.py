@@ -25,6 +25,7 @@ from dotenv import load_dotenv
 load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
 
 from agent.orchestrator import process_message
+from agent.worker import BackgroundWorker
 
 
 def format_tool_calls(tool_calls: list) -> str:
@@ -52,13 +53,15 @@ def format_tool_calls(tool_calls: list) -> str:
             lines.append(f"│ OK: {result_str}")
         elif isinstance(result, dict) and result.get("error"):
             lines.append(f"│ ERROR: {result['error']}")
-        elif isinstance(result, list):
-            lines.append(f"│ OK: [{len(result)} items]")
-            for item in result[:3]:
+        elif isinstance(result, dict) and "orders" in result:
+            orders = result["orders"]
+            more = " (more available)" if result.get("has_more") else ""
+            lines.append(f"│ OK: [{len(orders)} orders]{more}")
+            for item in orders[:3]:
                 item_str = json.dumps(item, ensure_ascii=False)[:100]
                 lines.append(f"│   {item_str}")
-            if len(result) > 3:
-                lines.append(f"│   ... and {len(result) - 3} more")
+            if len(orders) > 3:
+                lines.append(f"│   ... and {len(orders) - 3} more")
         else:
             result_str = json.dumps(result, ensure_ascii=False) if not isinstance(result, str) else result
             lines.append(f"│ -> {result_str}")
@@ -75,10 +78,8 @@ async def send_message(tenant_id: str, chat_id: str, message: str):
     sys.stdout = io.StringIO()
     try:
         result = await process_message(message, chat_id, tenant_id=tenant_id)
-        # Wait for background tasks (profile extraction, summarization) to complete
-        pending = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
-        if pending:
-            await asyncio.gather(*pending, return_exceptions=True)
+        # Run queued background jobs (profile extraction, summarization) to completion
+        await BackgroundWorker().run_until_empty()
         server_logs = sys.stdout.getvalue()
     finally:
         sys.stdout = old_stdout
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Background Worker - runs queued summarization and profile extraction jobs.
+Requires: PostgreSQL running + .env file in project root (DATABASE_URL, ANTHROPIC_API_KEY).
+
+Usage:
+    python scripts/background_worker.py                  # Poll forever
+    python scripts/background_worker.py --concurrency 4  # More parallel jobs
+    python scripts/background_worker.py --once           # Drain due jobs and exit
+
+Set BACKGROUND_WORKER_IN_PROCESS=false on the API server when running this separately.
+"""
+import sys
+import os
+import asyncio
+import argparse
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Auto-load .env file (so users don't need `set -a && source .env`)
+from dotenv import load_dotenv
+load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
+
+from agent.worker import BackgroundWorker, WORKER_CONCURRENCY
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Run background jobs")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY, help="Max jobs running at once")
+    parser.add_argument("--once", action="store_true", help="Run due jobs until none are left, then exit")
+    args = parser.parse_args()
+
+    worker = BackgroundWorker(concurrency=args.concurrency)
+    if args.once:
+        await worker.run_until_empty()
+        return
+
+    print(f"[Worker] Polling for jobs ({worker.concurrency} concurrent, Ctrl+C to stop)")
+    try:
+        await worker.run()
+    finally:
+        await worker.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
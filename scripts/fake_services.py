@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Fake services - local stand-ins for the Anthropic Messages API, the Telegram
+Bot API and the Twilio Messages API, for load tests that don't burn real tokens
+or message real customers.
+
+Anthropic (POST /v1/messages):
+    Answers from a script of regex rules matched against the last user message:
+    a text reply or a tool_use block (only for tools the request offered).
+    A turn that ends with tool results gets the script's "after_tool" text.
+    Supports "stream": true (server-sent events, text streamed in chunks).
+    Latency: time to first token drawn from --latency, then --chunk-delay per chunk
+    (non-streaming responses wait for the whole generation time).
+
+Telegram (POST /bot<token>/<method>): sendMessage / editMessageText return ok.
+Twilio (POST /2010-04-01/Accounts/<sid>/Messages.json): returns a queued message.
+GET /stats: request counters and peak concurrency.
+
+Usage:
+    python scripts/fake_services.py --port 9100
+    python scripts/fake_services.py --latency lognormal:1.2,0.5 --chunk-delay 0.03 --error-rate 0.01
+    python scripts/fake_services.py --script my_script.json
+
+Point the agent at it with:
+    ANTHROPIC_BASE_URL=http://localhost:9100
+    TELEGRAM_API_BASE_URL=http://localhost:9100
+    TWILIO_API_BASE_URL=http://localhost:9100
+
+Script file format (JSON):
+    {
+        "rules": [
+            {"match": "order|הזמנ", "tool_use": {"name": "get_customer_orders", "input": {"status": "open"}}},
+            {"match": ".*", "text": "Happy to help!", "probability": 1.0}
+        ],
+        "after_tool": "Here is what I found."
+    }
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import time
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+DEFAULT_SCRIPT = {
+    "rules": [
+        {
+            "match": r"\b(?:my orders?|order status|where is my order)\b|ההזמנה שלי|ההזמנות שלי",
+            "tool_use": {"name": "get_customer_orders", "input": {"status": "open"}},
+        },
+        {
+            "match": r"\b(?:order|buy|want|kg)\b|להזמין|רוצה|קילו",
+            "text": "Great choice! Just to confirm before I place the order: is that everything, "
+                    "and would you like delivery or pickup?",
+        },
+        {
+            "match": ".*",
+            "text": "Thanks for reaching out! We have a fresh selection today. Let me know what you're "
+                    "looking for and how much you need, and I'll put the order together for you.",
+        },
+    ],
+    "after_tool": "I checked your orders: you have one open order waiting for confirmation. "
+                  "Would you like to confirm it or make any changes?",
+}
+
+CHUNK_WORDS = 3  # Words per streamed text delta
+
+
+@dataclass
+class Latency:
+    """
+    Latency distribution parsed from "<kind>:<params>".
+
+    fixed:S | uniform:LOW,HIGH | normal:MEAN,STD | lognormal:MEDIAN,SIGMA
+    """
+    kind: str
+    params: List[float]
+
+    @classmethod
+    def parse(cls, spec: str) -> "Latency":
+        kind, _, raw = spec.partition(":")
+        params = [float(p) for p in raw.split(",") if p]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if kind not in expected or len(params) != expected[kind]:
+            raise argparse.ArgumentTypeError(f"Bad latency spec: {spec}")
+        return cls(kind, params)
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            value = self.params[0]
+        elif self.kind == "uniform":
+            value = random.uniform(*self.params)
+        elif self.kind == "normal":
+            value = random.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            value = random.lognormvariate(0, sigma) * median
+        return max(0.0, value)
+
+
+class Stats:
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.counts = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def enter(self, name: str) -> None:
+        self.counts[name] = self.counts.get(name, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self) -> None:
+        self.in_flight -= 1
+
+    def snapshot(self) -> dict:
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "uptime_seconds": round(elapsed, 1),
+            "requests": dict(self.counts),
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+        }
+
+
+def _estimate_tokens(value) -> int:
+    return max(1, len(json.dumps(value, ensure_ascii=False, default=str)) // 4)
+
+
+def _last_user_content(messages: list):
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            return message.get("content")
+    return ""
+
+
+def _is_tool_result(content) -> bool:
+    return isinstance(content, list) and any(
+        isinstance(block, dict) and block.get("type") == "tool_result" for block in content
+    )
+
+
+def _text_of(content) -> str:
+    if isinstance(content, str):
+        return content
+    return " ".join(
+        block.get("text", "") for block in content or [] if isinstance(block, dict) and block.get("type") == "text"
+    )
+
+
+def pick_reply(script: dict, body: dict) -> List[dict]:
+    """Content blocks for a request, from the first matching rule."""
+    content = _last_user_content(body.get("messages") or [])
+    if _is_tool_result(content):
+        return [{"type": "text", "text": script.get("after_tool", "Done.")}]
+
+    text = _text_of(content)
+    tools = {tool.get("name") for tool in body.get("tools") or []}
+    for rule in script.get("rules", []):
+        if not re.search(rule.get("match", ".*"), text, re.IGNORECASE):
+            continue
+        if random.random() > rule.get("probability", 1.0):
+            continue
+        tool_use = rule.get("tool_use")
+        if tool_use:
+            if tool_use["name"] not in tools:
+                continue
+            return [
+                {"type": "text", "text": rule.get("text", "Let me check.")},
+                {
+                    "type": "tool_use",
+                    "id": f"toolu_{uuid.uuid4().hex[:24]}",
+                    "name": tool_use["name"],
+                    "input": tool_use.get("input", {}),
+                },
+            ]
+        return [{"type": "text", "text": rule.get("text", "")}]
+    return [{"type": "text", "text": "OK."}]
+
+
+def _chunks(text: str) -> List[str]:
+    words = text.split(" ")
+    return [
+        " ".join(words[i:i + CHUNK_WORDS]) + (" " if i + CHUNK_WORDS < len(words) else "")
+        for i in range(0, len(words), CHUNK_WORDS)
+    ]
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def create_app(script: dict, latency: Latency, chunk_delay: float, error_rate: float,
+               channel_latency: Latency, telegram_429_rate: float) -> FastAPI:
+    app = FastAPI(title="Fake services")
+    stats = Stats()
+    message_ids = itertools.count(1)
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats.snapshot()
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        stats.enter("anthropic.messages")
+        try:
+            if random.random() < error_rate:
+                await asyncio.sleep(latency.sample() / 4)
+                return JSONResponse(
+                    status_code=529,
+                    content={"type": "error", "error": {"type": "overloaded_error", "message": "Overloaded"}},
+                )
+
+            blocks = pick_reply(script, body)
+            stop_reason = "tool_use" if any(b["type"] == "tool_use" for b in blocks) else "end_turn"
+            text_chunks = [_chunks(b["text"]) if b["type"] == "text" else [] for b in blocks]
+            output_tokens = _estimate_tokens(blocks)
+            usage = {"input_tokens": _estimate_tokens([body.get("system"), body.get("messages"), body.get("tools")]),
+                     "output_tokens": output_tokens}
+            message = {
+                "id": f"msg_{uuid.uuid4().hex[:24]}",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model", "fake"),
+                "stop_sequence": None,
+            }
+
+            first_token = latency.sample()
+            generation = chunk_delay * sum(len(c) for c in text_chunks)
+
+            if not body.get("stream"):
+                await asyncio.sleep(first_token + generation)
+                return {**message, "content": blocks, "stop_reason": stop_reason, "usage": usage}
+        finally:
+            stats.leave()
+
+        async def events():
+            stats.enter("anthropic.stream")
+            try:
+                await asyncio.sleep(first_token)
+                yield _sse("message_start", {
+                    "type": "message_start",
+                    "message": {**message, "content": [], "stop_reason": None,
+                                "usage": {"input_tokens": usage["input_tokens"], "output_tokens": 1}},
+                })
+                for index, (block, chunks) in enumerate(zip(blocks, text_chunks)):
+                    if block["type"] == "text":
+                        yield _sse("content_block_start", {
+                            "type": "content_block_start", "index": index,
+                            "content_block": {"type": "text", "text": ""},
+                        })
+                        for chunk in chunks:
+                            await asyncio.sleep(chunk_delay)
+                            yield _sse("content_block_delta", {
+                                "type": "content_block_delta", "index": index,
+                                "delta": {"type": "text_delta", "text": chunk},
+                            })
+                    else:
+                        yield _sse("content_block_start", {
+                            "type": "content_block_start", "index": index,
+                            "content_block": {**block, "input": {}},
+                        })
+                        yield _sse("content_block_delta", {
+                            "type": "content_block_delta", "index": index,
+                            "delta": {"type": "input_json_delta", "partial_json": json.dumps(block["input"])},
+                        })
+                    yield _sse("content_block_stop", {"type": "content_block_stop", "index": index})
+                yield _sse("message_delta", {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                    "usage": {"output_tokens": output_tokens},
+                })
+                yield _sse("message_stop", {"type": "message_stop"})
+            finally:
+                stats.leave()
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/bot{token}/{method}")
+    async def telegram(token: str, method: str, request: Request):
+        payload = await request.json()
+        stats.enter(f"telegram.{method}")
+        try:
+            await asyncio.sleep(channel_latency.sample())
+            if random.random() < telegram_429_rate:
+                return JSONResponse(status_code=429, content={
+                    "ok": False, "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1},
+                })
+            message_id = payload.get("message_id") or next(message_ids)
+            return {"ok": True, "result": {
+                "message_id": message_id,
+                "chat": {"id": payload.get("chat_id")},
+                "date": int(time.time()),
+                "text": payload.get("text", ""),
+            }}
+        finally:
+            stats.leave()
+
+    @app.post("/2010-04-01/Accounts/{account_sid}/Messages.json")
+    async def twilio(account_sid: str, request: Request):
+        form = dict(await request.form())
+        stats.enter("twilio.messages")
+        try:
+            await asyncio.sleep(channel_latency.sample())
+            return JSONResponse(status_code=201, content={
+                "sid": f"SM{uuid.uuid4().hex}",
+                "account_sid": account_sid,
+                "from": form.get("From"),
+                "to": form.get("To"),
+                "body": form.get("Body"),
+                "status": "queued",
+                "direction": "outbound-api",
+                "num_segments": "1",
+            })
+        finally:
+            stats.leave()
+
+    return app
+
+
+def load_script(path: Optional[str]) -> dict:
+    if not path:
+        return DEFAULT_SCRIPT
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Anthropic/Telegram/Twilio endpoints for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--script", help="JSON response script (default: built-in)")
+    parser.add_argument("--latency", type=Latency.parse, default=Latency.parse("lognormal:0.8,0.4"),
+                        help="LLM time to first token (default: lognormal:0.8,0.4)")
+    parser.add_argument("--chunk-delay", type=float, default=0.02, help="Seconds per streamed text chunk")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of LLM calls answered 529 overloaded")
+    parser.add_argument("--channel-latency", type=Latency.parse, default=Latency.parse("fixed:0.05"),
+                        help="Telegram/Twilio send latency (default: fixed:0.05)")
+    parser.add_argument("--telegram-429-rate", type=float, default=0.0, help="Share of Telegram calls answered 429")
+    parser.add_argument("--seed", type=int, help="Random seed")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    app = create_app(
+        load_script(args.script), args.latency, args.chunk_delay, args.error_rate,
+        args.channel_latency, args.telegram_429_rate,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Load test - replays concurrent synthetic conversations through the agent.
+
+Each virtual customer sends a few messages, one turn at a time, through the
+same path as a webhook consumer (handle_inbound_message: chat lock, agent,
+reply delivered by the outbox dispatcher). Run it against scripts/fake_services.py
+so no real tokens are spent and no real customers are messaged.
+Requires: PostgreSQL with seeded tenants (use a scratch database - load test
+customers and conversations are written to it).
+
+Usage:
+    python scripts/fake_services.py --port 9100 &
+    python scripts/load_test.py --conversations 1000 --concurrency 200
+    python scripts/load_test.py --tenants valdman,joannas_bakery --channel mixed --turns 6 --report out.json
+
+--fake-url sets ANTHROPIC_BASE_URL, TELEGRAM_API_BASE_URL and TWILIO_API_BASE_URL
+(unless already set in the environment).
+"""
+import sys
+import os
+import asyncio
+import argparse
+import json
+import math
+import random
+import time
+import uuid
+
+# Add project root to path
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Auto-load .env file (so users don't need `set -a && source .env`)
+from dotenv import load_dotenv
+load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
+
+# Synthetic customer messages: fast-path questions, small talk, order intent, order lookups
+MESSAGES = [
+    "hi",
+    "what do you have?",
+    "how much is the ribeye?",
+    "thanks!",
+    "I want to order 2 kg of ground beef for Friday",
+    "can you add 1 kg chicken breast?",
+    "where is my order?",
+    "do you deliver to Tel Aviv?",
+    "היי מה יש לכם?",
+    "כמה עולה אנטריקוט?",
+    "אני רוצה להזמין 2 קילו בקר טחון",
+    "מה עם ההזמנה שלי?",
+    "תודה רבה!",
+]
+
+
+def percentile(values, p: float) -> float:
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(p / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def summarize(latencies) -> dict:
+    return {
+        "turns": len(latencies),
+        "p50": round(percentile(latencies, 50), 3),
+        "p95": round(percentile(latencies, 95), 3),
+        "p99": round(percentile(latencies, 99), 3),
+        "max": round(max(latencies), 3) if latencies else 0.0,
+        "mean": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+    }
+
+
+def channel_config_for(channel: str) -> dict:
+    if channel == "telegram":
+        return {"bot_token": "loadtest", "streaming": True}
+    return {"account_sid": "ACloadtest", "auth_token": "loadtest", "phone_number": "+10000000000"}
+
+
+async def run(args) -> dict:
+    # Imported after the base URLs are set - clients read them at import time
+    from api.message_queue import handle_inbound_message
+    from api.outbox import outbox_dispatcher
+    from channels import ChannelMessage, ChannelType
+    from agent.worker import BackgroundWorker
+
+    tenants = args.tenants.split(",")
+    run_id = uuid.uuid4().hex[:6]
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    per_tenant = {tenant: [] for tenant in tenants}
+    errors = {}
+
+    await outbox_dispatcher.start()
+    worker = BackgroundWorker() if args.with_worker else None
+    if worker:
+        await worker.start()
+
+    async def conversation(index: int) -> None:
+        tenant_id = tenants[index % len(tenants)]
+        channel = args.channel if args.channel != "mixed" else random.choice(["telegram", "whatsapp"])
+        channel_type = ChannelType.TELEGRAM if channel == "telegram" else ChannelType.WHATSAPP
+        channel_config = channel_config_for(channel)
+        sender_id = f"loadtest-{run_id}-{index}"
+
+        # Spread conversation starts over the ramp-up period
+        await asyncio.sleep(random.uniform(0, args.ramp_up))
+        async with semaphore:
+            for _ in range(args.turns):
+                message = ChannelMessage(
+                    channel=channel_type,
+                    sender_id=sender_id,
+                    text=random.choice(MESSAGES),
+                    tenant_id=tenant_id,
+                    sender_name="Load Test",
+                )
+                start = time.monotonic()
+                try:
+                    await handle_inbound_message([message], channel_config)
+                except Exception as e:
+                    key = f"{type(e).__name__}: {str(e)[:80]}"
+                    errors[key] = errors.get(key, 0) + 1
+                    continue
+                elapsed = time.monotonic() - start
+                latencies.append(elapsed)
+                per_tenant[tenant_id].append(elapsed)
+                if args.think_time:
+                    await asyncio.sleep(random.expovariate(1 / args.think_time))
+
+    started = time.monotonic()
+    await asyncio.gather(*[conversation(i) for i in range(args.conversations)])
+    duration = time.monotonic() - started
+
+    if worker:
+        await worker.stop()
+    await outbox_dispatcher.stop()
+
+    return {
+        "conversations": args.conversations,
+        "concurrency": args.concurrency,
+        "duration_seconds": round(duration, 2),
+        "throughput_turns_per_second": round(len(latencies) / duration, 2) if duration else 0.0,
+        "latency_seconds": summarize(latencies),
+        "per_tenant": {tenant: summarize(values) for tenant, values in per_tenant.items()},
+        "errors": errors,
+    }
+
+
+async def fetch_fake_stats(fake_url: str) -> dict:
+    import httpx
+    try:
+        async with httpx.AsyncClient(timeout=5) as client:
+            return (await client.get(f"{fake_url}/stats")).json()
+    except (httpx.HTTPError, ValueError):
+        return {}
+
+
+def print_report(report: dict) -> None:
+    latency = report["latency_seconds"]
+    print("──────────── Load Test ────────────")
+    print(f"Turns:       {latency['turns']} in {report['duration_seconds']}s "
+          f"({report['throughput_turns_per_second']} turns/s)")
+    print(f"Latency:     p50={latency['p50']}s  p95={latency['p95']}s  p99={latency['p99']}s  max={latency['max']}s")
+    for tenant, stats in report["per_tenant"].items():
+        print(f"  {tenant}: {stats['turns']} turns, p50={stats['p50']}s p95={stats['p95']}s p99={stats['p99']}s")
+    if report["errors"]:
+        print("Errors:")
+        for error, count in report["errors"].items():
+            print(f"  {count}x {error}")
+    if report.get("fake_services"):
+        print(f"Fake services: {json.dumps(report['fake_services'])}")
+    print("───────────────────────────────────")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay concurrent synthetic conversations through the agent")
+    parser.add_argument("--tenants", default="valdman", help="Comma-separated tenant IDs (default: valdman)")
+    parser.add_argument("--conversations", type=int, default=100, help="Synthetic conversations to run")
+    parser.add_argument("--turns", type=int, default=4, help="Customer messages per conversation")
+    parser.add_argument("--concurrency", type=int, default=50, help="Conversations in flight at once")
+    parser.add_argument("--channel", choices=["telegram", "whatsapp", "mixed"], default="telegram")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which conversations start")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean seconds between a customer's messages")
+    parser.add_argument("--fake-url", default="http://127.0.0.1:9100", help="scripts/fake_services.py address")
+    parser.add_argument("--with-worker", action="store_true", help="Run background jobs in-process during the test")
+    parser.add_argument("--report", help="Write the report as JSON to this file")
+    parser.add_argument("--seed", type=int, help="Random seed")
+    parser.add_argument("--quiet", action="store_true", help="Hide per-turn server logs")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    for name in ("ANTHROPIC_BASE_URL", "TELEGRAM_API_BASE_URL", "TWILIO_API_BASE_URL"):
+        os.environ.setdefault(name, args.fake_url)
+    os.environ.setdefault("ANTHROPIC_API_KEY", "loadtest")
+
+    real_stdout = sys.stdout
+    if args.quiet:
+        sys.stdout = open(os.devnull, "w")
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        if args.quiet:
+            sys.stdout.close()
+            sys.stdout = real_stdout
+    report["fake_services"] = asyncio.run(fetch_fake_stats(args.fake_url))
+
+    print_report(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ Database connection and session management.
 """
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -12,12 +13,36 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable not set")
 
+
+def _to_async_url(url: str) -> str:
+    """Convert a sync PostgreSQL URL (psycopg2) to its asyncpg equivalent."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+
+# Async driver URL (override with ASYNC_DATABASE_URL if the derived one doesn't fit)
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _to_async_url(DATABASE_URL)
+
 # Create database engine
 # echo=True logs all SQL statements (useful for debugging)
 engine = create_engine(DATABASE_URL, echo=False)
 
-# Session factory
+# Async engine for the live message path (webhook → orchestrator → tools)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    echo=False,
+    # Sized for 2 connections per live turn (session + chat advisory lock, see agent/chat_lock.py)
+    pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    pool_pre_ping=True,
+)
+
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: async sessions can't lazy-load expired attributes after commit
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for all models
 Base = declarative_base()
@@ -49,3 +74,20 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """
+    Dependency to get an async database session.
+
+    Usage (FastAPI):
+        @app.get("/")
+        async def endpoint(db: AsyncSession = Depends(get_async_db)):
+            await db.execute(...)
+
+    Usage (async code):
+        async with AsyncSessionLocal() as db:
+            await db.execute(...)
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -7,5 +7,7 @@ from .order import Order
 from .customer import Customer
 from .conversation import Conversation, Message
 from .product import Product
+from .job import BackgroundJob
+from .outbox import OutboundMessage
 
-__all__ = ['Base', 'Tenant', 'Order', 'Customer', 'Conversation', 'Message', 'Product']
+__all__ = ['Base', 'Tenant', 'Order', 'Customer', 'Conversation', 'Message', 'Product', 'BackgroundJob', 'OutboundMessage']
@@ -1,7 +1,7 @@
 """
 Conversation and Message models - stores chat history.
 """
-from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Text
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from storage.database import Base
@@ -43,6 +43,13 @@ class Message(Base):
     Stores role (user/assistant), content, and channel source.
     """
     __tablename__ = "messages"
+    __table_args__ = (
+        # Newest-first history reads per conversation (ORDER BY created_at DESC LIMIT n).
+        # Not covering: it finds the n rows, their role/content/token_count come from the table
+        Index("ix_messages_conversation_created", "conversation_id", "created_at"),
+        # One row per provider delivery - a redelivered webhook can't be stored twice
+        Index("ux_messages_external_message_id", "external_message_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     conversation_id = Column(Integer, ForeignKey("conversations.id"), nullable=False)
@@ -54,6 +61,12 @@ class Message(Base):
     # Channel source (telegram, whatsapp, web, etc.)
     channel = Column(String, nullable=True, default="unknown")
 
+    # Estimated prompt tokens for this message (cached; filled lazily for older rows)
+    token_count = Column(Integer, nullable=True)
+
+    # Inbound delivery key (ChannelMessage.dedup_key) - NULL for assistant and CLI messages
+    external_message_id = Column(String, nullable=True)
+
     # Timestamp
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -0,0 +1,50 @@
+"""
+Background job model - durable queue for work that runs outside the live turn.
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Text, JSON, Index, text
+from sqlalchemy.sql import func
+from storage.database import Base
+
+
+class BackgroundJob(Base):
+    """
+    BackgroundJob = a unit of deferred work (summarization, profile extraction).
+
+    The live path only inserts a row; workers claim rows with
+    SELECT ... FOR UPDATE SKIP LOCKED, so jobs survive deploys and crashes
+    and several workers never pick the same job.
+    """
+    __tablename__ = "background_jobs"
+    __table_args__ = (
+        Index('ix_background_jobs_claim', 'status', 'priority', 'run_after'),
+        # At most one queued/running job per dedup_key, of any type - see AsyncJobRepository.enqueue
+        Index(
+            'ux_background_jobs_active',
+            'dedup_key',
+            unique=True,
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Job definition
+    job_type = Column(String, nullable=False)  # e.g., "summarize_conversation"
+    payload = Column(JSON, nullable=False, default=dict)
+    priority = Column(Integer, nullable=False, default=100)  # Lower runs first
+    dedup_key = Column(String, nullable=True)  # e.g., "conversation:42" - NULL never deduplicates
+
+    # Execution state
+    status = Column(String, nullable=False, default="pending")  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # Retry backoff
+    locked_at = Column(DateTime(timezone=True), nullable=True)  # When a worker claimed it
+    last_error = Column(Text, nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<BackgroundJob(id={self.id}, type='{self.job_type}', status='{self.status}')>"
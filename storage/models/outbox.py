@@ -0,0 +1,48 @@
+"""
+Outbound message model - transactional outbox for channel replies.
+"""
+from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey, Index
+from sqlalchemy.sql import func
+from storage.database import Base
+
+
+class OutboundMessage(Base):
+    """
+    OutboundMessage = a reply waiting to be delivered through a channel.
+
+    Written in the same commit as the assistant Message, so a reply is never
+    saved without being queued for delivery (or the other way around). The
+    outbox dispatcher claims rows with SELECT ... FOR UPDATE SKIP LOCKED and
+    delivers them in id order per chat.
+    """
+    __tablename__ = "outbound_messages"
+    __table_args__ = (
+        Index('ix_outbound_messages_claim', 'status', 'next_attempt_at'),
+        Index('ix_outbound_messages_chat', 'tenant_id', 'channel', 'recipient_id', 'id'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(String, ForeignKey("tenants.id"), nullable=False)
+    message_id = Column(Integer, ForeignKey("messages.id"), nullable=True)  # Assistant message, if saved
+
+    # Delivery target
+    channel = Column(String, nullable=False)  # telegram, whatsapp
+    recipient_id = Column(String, nullable=False)  # chat_id / phone number
+    text = Column(Text, nullable=False)
+    edit_message_id = Column(String, nullable=True)  # Streamed placeholder to replace with the final text
+
+    # Delivery state
+    status = Column(String, nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=8)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<OutboundMessage(id={self.id}, channel='{self.channel}', to='{self.recipient_id}', status='{self.status}')>"
@@ -43,6 +43,14 @@ class Tenant(Base):
     # Business settings
     currency = Column(String, default="NIS", nullable=False)  # e.g., "NIS", "USD", "EUR"
 
+    # Agent tuning (JSON, all keys optional)
+    # agent_settings: {"coalesce_window_ms": 1500, "coalesce_max_wait_ms": 5000,
+    #                  "history_token_budget": 6000, "fast_path": true,
+    #                  "fast_path_templates": {"he": {"price": "..."}},
+    #                  "model_policy": "signals", "models": {"fast": {"model": "...", "max_tokens": 512}},
+    #                  "hedge_delay_seconds": 10, "turn_deadline_seconds": 45}
+    agent_settings = Column(JSON, nullable=True)
+
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -1,12 +1,22 @@
 """
 Repository layer - data access for all models.
 Repositories abstract database operations from business logic.
+
+Sync repositories (Session) serve the admin API and scripts.
+Async repositories (AsyncSession) serve the live message path.
 """
 from .tenant_repo import TenantRepository
 from .order_repo import OrderRepository
 from .customer_repo import CustomerRepository
 from .conversation_repo import ConversationRepository
 from .product_repo import ProductRepository
+from .async_tenant_repo import AsyncTenantRepository
+from .async_order_repo import AsyncOrderRepository
+from .async_customer_repo import AsyncCustomerRepository
+from .async_conversation_repo import AsyncConversationRepository
+from .async_product_repo import AsyncProductRepository
+from .async_job_repo import AsyncJobRepository
+from .async_outbox_repo import AsyncOutboxRepository
 
 __all__ = [
     "TenantRepository",
@@ -14,4 +24,11 @@ __all__ = [
     "CustomerRepository",
     "ConversationRepository",
     "ProductRepository",
+    "AsyncTenantRepository",
+    "AsyncOrderRepository",
+    "AsyncCustomerRepository",
+    "AsyncConversationRepository",
+    "AsyncProductRepository",
+    "AsyncJobRepository",
+    "AsyncOutboxRepository",
 ]
@@ -0,0 +1,274 @@
+"""
+Async Conversation Repository - non-blocking conversation and message access for the live message path.
+"""
+from typing import Optional, List, Tuple, Dict
+from sqlalchemy import select, update, func, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from storage.models.conversation import Conversation, Message
+from storage.models.outbox import OutboundMessage
+
+
+class AsyncConversationRepository:
+    """Async repository for Conversation and Message operations."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    # === Conversation Operations ===
+
+    async def get_conversation_by_id(self, conversation_id: int) -> Optional[Conversation]:
+        """Get conversation by ID."""
+        return await self.db.get(Conversation, conversation_id)
+
+    async def get_active_conversation(self, customer_id: int) -> Optional[Conversation]:
+        """Get active conversation for customer."""
+        result = await self.db.execute(
+            select(Conversation).where(
+                Conversation.customer_id == customer_id,
+                Conversation.status == "active",
+            )
+        )
+        return result.scalars().first()
+
+    async def get_or_create_active_conversation(
+        self, tenant_id: str, customer_id: int
+    ) -> Conversation:
+        """
+        Get active conversation or create new one.
+        Used when customer sends a message.
+        """
+        conversation = await self.get_active_conversation(customer_id)
+        if not conversation:
+            conversation = Conversation(
+                tenant_id=tenant_id,
+                customer_id=customer_id,
+                status="active",
+            )
+            self.db.add(conversation)
+            await self.db.commit()
+            await self.db.refresh(conversation)
+        return conversation
+
+    # === Message Operations ===
+
+    async def add_message(
+        self,
+        conversation_id: int,
+        role: str,
+        content: str,
+        channel: Optional[str] = "unknown",
+        token_count: Optional[int] = None,
+        outbound: Optional[OutboundMessage] = None,
+        external_message_id: Optional[str] = None,
+    ) -> Message:
+        """
+        Add message to conversation and increment total_message_count.
+
+        Args:
+            conversation_id: The conversation to add the message to
+            role: 'user' or 'assistant'
+            content: Message text content
+            channel: Channel source (telegram, whatsapp, etc.). Defaults to 'unknown'.
+            token_count: Estimated prompt tokens (cached for history budgeting)
+            outbound: Outbox row delivering this message, written in the same commit
+            external_message_id: Provider delivery key of an inbound message (unique -
+                storing a redelivery raises IntegrityError)
+        """
+        # Increment total message count under a row lock (safe under concurrent writers);
+        # populate_existing refreshes an already-loaded instance with the locked row
+        result = await self.db.execute(
+            select(Conversation)
+            .where(Conversation.id == conversation_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        conversation = result.scalars().first()
+        if conversation:
+            conversation.total_message_count = (conversation.total_message_count or 0) + 1
+
+        message = Message(
+            conversation_id=conversation_id,
+            role=role,
+            content=content,
+            channel=channel,
+            token_count=token_count,
+            external_message_id=external_message_id,
+        )
+        self.db.add(message)
+        if outbound is not None:
+            await self.db.flush()
+            outbound.message_id = message.id
+            self.db.add(outbound)
+        await self.db.commit()
+        await self.db.refresh(message)
+        return message
+
+    async def add_messages(
+        self,
+        conversation_id: int,
+        role: str,
+        contents: List[str],
+        channel: Optional[str] = "unknown",
+        token_counts: Optional[List[Optional[int]]] = None,
+        external_message_ids: Optional[List[Optional[str]]] = None,
+    ) -> None:
+        """
+        Add several messages (e.g., a coalesced burst) in one transaction - all or none.
+
+        Args:
+            conversation_id: The conversation to add the messages to
+            role: 'user' or 'assistant'
+            contents: Message texts, in order
+            channel: Channel source (telegram, whatsapp, etc.)
+            token_counts: Estimated prompt tokens per message
+            external_message_ids: Provider delivery key per message (if any key is already
+                stored, IntegrityError is raised on commit and nothing is written)
+        """
+        token_counts = token_counts or [None] * len(contents)
+        external_message_ids = external_message_ids or [None] * len(contents)
+
+        result = await self.db.execute(
+            select(Conversation)
+            .where(Conversation.id == conversation_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        conversation = result.scalars().first()
+        if conversation:
+            conversation.total_message_count = (conversation.total_message_count or 0) + len(contents)
+
+        for content, token_count, external_message_id in zip(contents, token_counts, external_message_ids):
+            self.db.add(Message(
+                conversation_id=conversation_id,
+                role=role,
+                content=content,
+                channel=channel,
+                token_count=token_count,
+                external_message_id=external_message_id,
+            ))
+        await self.db.commit()
+
+    async def find_external_ids(self, external_message_ids: List[str]) -> set:
+        """Which of these provider delivery keys are already stored (one indexed lookup)."""
+        if not external_message_ids:
+            return set()
+        result = await self.db.execute(
+            select(Message.external_message_id)
+            .where(Message.external_message_id.in_(external_message_ids))
+        )
+        return set(result.scalars().all())
+
+    async def get_messages(
+        self, conversation_id: int, limit: Optional[int] = None
+    ) -> List[Message]:
+        """
+        Get messages for a conversation.
+        Returns in chronological order (oldest first).
+        """
+        query = (
+            select(Message)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.asc())
+        )
+        if limit:
+            query = query.limit(limit)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
+
+    async def get_recent_history(
+        self, conversation_id: int, limit: int, token_budget: Optional[int] = None
+    ) -> List[Row]:
+        """
+        Get the newest messages of a conversation, bounded in the database.
+
+        Selects only id/role/content/token_count columns with
+        ORDER BY created_at DESC LIMIT. ix_messages_conversation_created finds the
+        newest rows (the selected columns are then read from the table, n rows only),
+        so the cost doesn't grow with conversation length.
+
+        Args:
+            conversation_id: The conversation
+            limit: Max messages to fetch
+            token_budget: If given, stop at the first message that starts past the
+                budget (running sum of token_count; uncached rows use a low
+                content-length estimate so nothing is cut early). The caller trims exactly.
+
+        Returns:
+            Rows with .id, .role, .content, .token_count in chronological order (oldest first)
+        """
+        query = (
+            select(Message.id, Message.role, Message.content, Message.token_count)
+            .where(Message.conversation_id == conversation_id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(limit)
+        )
+        if token_budget is not None:
+            # Running token total newest-first; keep rows that start within the budget
+            tokens = func.coalesce(Message.token_count, func.length(Message.content) / 4 + 4)
+            running = func.sum(tokens).over(
+                order_by=(Message.created_at.desc(), Message.id.desc())
+            )
+            recent = query.add_columns((running - tokens).label("tokens_before")).subquery()
+            query = (
+                select(recent.c.id, recent.c.role, recent.c.content, recent.c.token_count)
+                .where(recent.c.tokens_before < token_budget)
+                .order_by(recent.c.tokens_before.asc())
+            )
+        result = await self.db.execute(query)
+        return list(result.all())[::-1]  # Reverse to chronological order
+
+    async def cache_token_counts(self, counts: Dict[int, int]) -> None:
+        """Store estimated token counts for messages (message_id -> tokens)."""
+        if not counts:
+            return
+        await self.db.execute(
+            update(Message),
+            [{"id": message_id, "token_count": tokens} for message_id, tokens in counts.items()]
+        )
+        await self.db.commit()
+
+    async def get_conversation_history(self, customer_id: int, limit: Optional[int] = None) -> List[dict]:
+        """
+        Get conversation history for customer as Claude-formatted messages.
+        With a limit, only the newest `limit` messages are fetched (role/content columns only).
+        Returns: [{"role": "user", "content": "..."}, ...] oldest first
+        """
+        conversation = await self.get_active_conversation(customer_id)
+        if not conversation:
+            return []
+
+        query = (
+            select(Message.role, Message.content)
+            .where(Message.conversation_id == conversation.id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+        )
+        if limit:
+            query = query.limit(limit)
+        result = await self.db.execute(query)
+        return [{"role": role, "content": content} for role, content in reversed(result.all())]
+
+    async def update_summary(
+        self, conversation_id: int, summary: str, summarized_at: int
+    ) -> Optional[Conversation]:
+        """Update the conversation summary and record when we summarized."""
+        conversation = await self.get_conversation_by_id(conversation_id)
+        if conversation:
+            conversation.summary = summary
+            conversation.last_summary_at = summarized_at
+            await self.db.commit()
+            await self.db.refresh(conversation)
+        return conversation
+
+    async def get_conversation_state(self, conversation_id: int) -> Tuple[Optional[str], Optional[int], int]:
+        """
+        Get conversation state for summarization logic.
+        Returns: (summary, last_summary_at, total_message_count)
+        """
+        conversation = await self.get_conversation_by_id(conversation_id)
+        if conversation:
+            return (
+                conversation.summary,
+                conversation.last_summary_at,
+                conversation.total_message_count or 0
+            )
+        return None, None, 0
@@ -0,0 +1,78 @@
+"""
+Async Customer Repository - non-blocking customer data access for the live message path.
+"""
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from storage.models.customer import Customer
+
+
+class AsyncCustomerRepository:
+    """Async repository for Customer operations."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, customer_id: int) -> Optional[Customer]:
+        """Get customer by ID."""
+        return await self.db.get(Customer, customer_id)
+
+    async def get_by_chat_id(self, tenant_id: str, chat_id: str) -> Optional[Customer]:
+        """Get customer by chat_id (Telegram/WhatsApp ID) for a specific tenant."""
+        result = await self.db.execute(
+            select(Customer).where(
+                Customer.tenant_id == tenant_id,
+                Customer.chat_id == chat_id
+            )
+        )
+        return result.scalars().first()
+
+    async def get_or_create_by_chat_id(self, tenant_id: str, chat_id: str) -> Customer:
+        """
+        Get existing customer or create new one.
+        Used when new user messages the bot.
+        """
+        customer = await self.get_by_chat_id(tenant_id, chat_id)
+        if not customer:
+            customer = Customer(
+                tenant_id=tenant_id,
+                chat_id=chat_id,
+            )
+            self.db.add(customer)
+            await self.db.commit()
+            await self.db.refresh(customer)
+        return customer
+
+    async def update_profile(
+        self,
+        customer: Customer,
+        name: Optional[str] = None,
+        phone: Optional[str] = None,
+        email: Optional[str] = None,
+        address: Optional[str] = None,
+        language: Optional[str] = None,
+        preferences: Optional[str] = None,
+        notes: Optional[str] = None,
+    ) -> Customer:
+        """
+        Update customer profile information.
+        Only updates fields that are provided (not None).
+        """
+        if name is not None:
+            customer.name = name
+        if phone is not None:
+            customer.phone = phone
+        if email is not None:
+            customer.email = email
+        if address is not None:
+            customer.address = address
+        if language is not None:
+            customer.language = language
+        if preferences is not None:
+            customer.preferences = preferences
+        if notes is not None:
+            customer.notes = notes
+
+        await self.db.commit()
+        await self.db.refresh(customer)
+        return customer
@@ -0,0 +1,148 @@
+"""
+Async Job Repository - durable background job queue (PostgreSQL-backed).
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import select, update, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from storage.models.job import BackgroundJob
+
+
+class AsyncJobRepository:
+    """Async repository for BackgroundJob operations."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: dict,
+        priority: int = 100,
+        max_attempts: int = 5,
+        dedup_key: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Insert a pending job.
+
+        With a dedup_key, nothing is inserted while a pending or running job
+        (of any type) has that key (the partial unique index
+        ux_background_jobs_active decides, so concurrent enqueues can't race).
+
+        Args:
+            job_type: Handler name (e.g., "summarize_conversation")
+            payload: JSON-serializable handler arguments
+            priority: Lower runs first
+            max_attempts: Attempts before the job is marked failed
+            dedup_key: Skip the insert if an active job has this key
+
+        Returns:
+            The new job's id, or None if an active duplicate already exists
+        """
+        statement = insert(BackgroundJob).values(
+            job_type=job_type,
+            payload=payload,
+            priority=priority,
+            dedup_key=dedup_key,
+            status="pending",
+            attempts=0,
+            max_attempts=max_attempts,
+        )
+        if dedup_key is not None:
+            statement = statement.on_conflict_do_nothing(
+                index_elements=["dedup_key"],
+                index_where=text("status IN ('pending', 'running')"),
+            )
+        result = await self.db.execute(statement.returning(BackgroundJob.id))
+        job_id = result.scalar_one_or_none()
+        await self.db.commit()
+        return job_id
+
+    async def claim(self, limit: int = 1) -> List[BackgroundJob]:
+        """
+        Claim up to `limit` due pending jobs for this worker.
+
+        Uses SELECT ... FOR UPDATE SKIP LOCKED so concurrent workers never
+        claim the same job and never wait on each other's locks.
+        """
+        result = await self.db.execute(
+            select(BackgroundJob)
+            .where(
+                BackgroundJob.status == "pending",
+                BackgroundJob.run_after <= datetime.now(timezone.utc),
+            )
+            .order_by(BackgroundJob.priority.asc(), BackgroundJob.id.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        jobs = list(result.scalars().all())
+        now = datetime.now(timezone.utc)
+        for job in jobs:
+            job.status = "running"
+            job.attempts = (job.attempts or 0) + 1
+            job.locked_at = now
+        await self.db.commit()
+        return jobs
+
+    async def complete(self, job_id: int) -> None:
+        """Mark a job as done."""
+        await self.db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id)
+            .values(status="done", last_error=None)
+        )
+        await self.db.commit()
+
+    async def fail(self, job: BackgroundJob, error: str, retry_delay: float) -> bool:
+        """
+        Record a failed attempt: reschedule after retry_delay seconds, or mark
+        the job failed once max_attempts is reached.
+
+        Returns:
+            True if the job will be retried, False if it is now failed
+        """
+        retry = job.attempts < job.max_attempts
+        await self.db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job.id)
+            .values(
+                status="pending" if retry else "failed",
+                run_after=datetime.now(timezone.utc) + timedelta(seconds=retry_delay),
+                last_error=error[:2000],
+            )
+        )
+        await self.db.commit()
+        return retry
+
+    async def heartbeat(self, job_id: int) -> None:
+        """Renew the claim of a job that is still running (see requeue_stale)."""
+        await self.db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, BackgroundJob.status == "running")
+            .values(locked_at=datetime.now(timezone.utc))
+        )
+        await self.db.commit()
+
+    async def requeue_stale(self, older_than_seconds: float) -> int:
+        """
+        Return jobs stuck in 'running' (worker crashed mid-job, claim not renewed) to 'pending'.
+
+        Returns:
+            Number of jobs requeued
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=older_than_seconds)
+        result = await self.db.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.status == "running", BackgroundJob.locked_at < cutoff)
+            .values(status="pending")
+        )
+        await self.db.commit()
+        return result.rowcount or 0
+
+    async def count_by_status(self) -> dict:
+        """Number of jobs per status."""
+        result = await self.db.execute(
+            select(BackgroundJob.status, func.count()).group_by(BackgroundJob.status)
+        )
+        return {status: count for status, count in result.all()}
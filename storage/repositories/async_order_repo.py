@@ -0,0 +1,123 @@
+"""
+Async Order Repository - non-blocking order data access for the live message path.
+"""
+from datetime import datetime
+from typing import Optional, List
+from sqlalchemy import select, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from storage.models.order import Order
+
+
+class AsyncOrderRepository:
+    """Async repository for Order operations."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, order_id: str) -> Optional[Order]:
+        """Get order by ID."""
+        return await self.db.get(Order, order_id)
+
+    async def get_by_customer(self, customer_id: int) -> List[Order]:
+        """Get all orders for a customer."""
+        result = await self.db.execute(
+            select(Order)
+            .where(Order.customer_id == customer_id)
+            .order_by(Order.created_at.desc())
+        )
+        return list(result.scalars().all())
+
+    async def find_by_customer(
+        self,
+        customer_id: int,
+        statuses: Optional[List[str]] = None,
+        open_statuses: Optional[List[str]] = None,
+        created_after: Optional[datetime] = None,
+        limit: int = 10,
+        offset: int = 0,
+    ) -> List[Order]:
+        """
+        Get one page of a customer's orders, newest first.
+
+        Args:
+            customer_id: Customer ID
+            statuses: Only orders in these statuses (None = any status)
+            open_statuses: With created_after - orders in these statuses are
+                kept regardless of age
+            created_after: Only orders created after this time
+            limit: Page size
+            offset: Orders to skip
+
+        Returns:
+            Up to `limit` orders
+        """
+        query = select(Order).where(Order.customer_id == customer_id)
+        if statuses:
+            query = query.where(Order.status.in_(statuses))
+        if created_after is not None:
+            recent = Order.created_at >= created_after
+            query = query.where(or_(recent, Order.status.in_(open_statuses)) if open_statuses else recent)
+        result = await self.db.execute(
+            query.order_by(Order.created_at.desc(), Order.id.desc()).limit(limit).offset(offset)
+        )
+        return list(result.scalars().all())
+
+    async def create(
+        self,
+        order_id: str,
+        tenant_id: str,
+        customer_id: int,
+        items: list,
+        total: float,
+        delivery_notes: Optional[str] = None,
+    ) -> Order:
+        """Create new order."""
+        order = Order(
+            id=order_id,
+            tenant_id=tenant_id,
+            customer_id=customer_id,
+            items=items,
+            total=total,
+            delivery_notes=delivery_notes,
+            status="pending",
+        )
+        self.db.add(order)
+        await self.db.commit()
+        await self.db.refresh(order)
+        return order
+
+    async def update_status(self, order_id: str, new_status: str) -> Optional[Order]:
+        """
+        Update order status.
+        Valid statuses: pending, confirmed, completed, cancelled
+        """
+        order = await self.get_by_id(order_id)
+        if order:
+            order.status = new_status
+            await self.db.commit()
+            await self.db.refresh(order)
+        return order
+
+    async def update_order(self, order_id: str, items: list, total: float, delivery_notes: Optional[str] = None) -> Optional[Order]:
+        """Update order items, total, and delivery notes."""
+        order = await self.get_by_id(order_id)
+        if order:
+            order.items = items
+            order.total = total
+            order.delivery_notes = delivery_notes
+            await self.db.commit()
+            await self.db.refresh(order)
+        return order
+
+    async def generate_order_id(self, tenant_id: str) -> str:
+        """
+        Generate next order ID for tenant.
+        Format: VALDMAN-ORD-0001, JOANNAS_BAKERY-ORD-0001, etc.
+        """
+        # Get count of orders for this tenant
+        count = await self.db.scalar(
+            select(func.count()).select_from(Order).where(Order.tenant_id == tenant_id)
+        )
+        # Include tenant prefix to ensure uniqueness across tenants
+        tenant_prefix = tenant_id.upper().replace('_', '-')
+        return f"{tenant_prefix}-ORD-{count + 1:04d}"
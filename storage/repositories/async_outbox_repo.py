@@ -0,0 +1,172 @@
+"""
+Async Outbox Repository - durable queue of channel replies (PostgreSQL-backed).
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import select, update, func, exists
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from storage.models.outbox import OutboundMessage
+
+
+class AsyncOutboxRepository:
+    """Async repository for OutboundMessage operations."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    @staticmethod
+    def build(
+        tenant_id: str,
+        channel: str,
+        recipient_id: str,
+        text: str,
+        hold_seconds: float = 0.0,
+        edit_message_id: Optional[str] = None,
+    ) -> OutboundMessage:
+        """
+        New outbox row, not yet added to a session (see AsyncConversationRepository.add_message).
+
+        Args:
+            hold_seconds: Keep the row from the dispatcher until released (or until this passes)
+            edit_message_id: Channel message to replace with the text instead of sending a new one
+        """
+        return OutboundMessage(
+            tenant_id=tenant_id,
+            channel=channel,
+            recipient_id=recipient_id,
+            text=text,
+            edit_message_id=edit_message_id,
+            status="pending",
+            attempts=0,
+            next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=hold_seconds),
+        )
+
+    async def enqueue(
+        self,
+        tenant_id: str,
+        channel: str,
+        recipient_id: str,
+        text: str,
+        hold_seconds: float = 0.0,
+        edit_message_id: Optional[str] = None,
+    ) -> OutboundMessage:
+        """Insert a pending reply on its own (no assistant message to commit with)."""
+        outbound = self.build(tenant_id, channel, recipient_id, text, hold_seconds, edit_message_id)
+        self.db.add(outbound)
+        await self.db.commit()
+        return outbound
+
+    async def release(self, outbox_id: int, edit_message_id: Optional[str] = None) -> None:
+        """Make a held reply due now, optionally replacing a streamed placeholder message."""
+        await self.db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.id == outbox_id, OutboundMessage.status == "pending")
+            .values(next_attempt_at=func.now(), edit_message_id=edit_message_id)
+        )
+        await self.db.commit()
+
+    async def claim(self, limit: int = 10) -> List[OutboundMessage]:
+        """
+        Claim up to `limit` due replies, oldest first.
+
+        A reply is only claimable when no earlier reply to the same chat is still
+        pending or being sent, so each chat receives its replies in order. Uses
+        SELECT ... FOR UPDATE SKIP LOCKED so concurrent dispatchers never claim
+        the same row.
+        """
+        earlier = aliased(OutboundMessage)
+        blocked = exists().where(
+            earlier.tenant_id == OutboundMessage.tenant_id,
+            earlier.channel == OutboundMessage.channel,
+            earlier.recipient_id == OutboundMessage.recipient_id,
+            earlier.id < OutboundMessage.id,
+            earlier.status.in_(("pending", "sending")),
+        )
+        result = await self.db.execute(
+            select(OutboundMessage)
+            .where(
+                OutboundMessage.status == "pending",
+                OutboundMessage.next_attempt_at <= datetime.now(timezone.utc),
+                ~blocked,
+            )
+            .order_by(OutboundMessage.id.asc())
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        rows = list(result.scalars().all())
+        now = datetime.now(timezone.utc)
+        for row in rows:
+            row.status = "sending"
+            row.attempts = (row.attempts or 0) + 1
+            row.locked_at = now
+        await self.db.commit()
+        return rows
+
+    async def complete(self, outbox_id: int) -> None:
+        """Mark a reply as delivered."""
+        await self.db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.id == outbox_id)
+            .values(status="sent", sent_at=func.now(), last_error=None)
+        )
+        await self.db.commit()
+
+    async def fail(self, outbound: OutboundMessage, error: str, retry_delay: float) -> bool:
+        """
+        Record a failed delivery: retry after retry_delay seconds, or mark the
+        reply failed once max_attempts is reached.
+
+        Returns:
+            True if the reply will be retried, False if it is now failed
+        """
+        retry = outbound.attempts < outbound.max_attempts
+        await self.db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.id == outbound.id)
+            .values(
+                status="pending" if retry else "failed",
+                next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=retry_delay),
+                last_error=error[:2000],
+            )
+        )
+        await self.db.commit()
+        return retry
+
+    async def defer(self, outbound: OutboundMessage, delay: float) -> None:
+        """Put a claimed reply back without counting the attempt (e.g., channel breaker open)."""
+        await self.db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.id == outbound.id)
+            .values(
+                status="pending",
+                attempts=max(0, outbound.attempts - 1),
+                next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+            )
+        )
+        await self.db.commit()
+
+    async def requeue_stale(self, older_than_seconds: float) -> int:
+        """
+        Return replies stuck in 'sending' (dispatcher crashed mid-send) to 'pending'.
+
+        Delivery is at-least-once: such a reply may be sent twice.
+
+        Returns:
+            Number of replies requeued
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=older_than_seconds)
+        result = await self.db.execute(
+            update(OutboundMessage)
+            .where(OutboundMessage.status == "sending", OutboundMessage.locked_at < cutoff)
+            .values(status="pending")
+        )
+        await self.db.commit()
+        return result.rowcount or 0
+
+    async def count_by_status(self) -> dict:
+        """Number of replies per status."""
+        result = await self.db.execute(
+            select(OutboundMessage.status, func.count()).group_by(OutboundMessage.status)
+        )
+        return {status: count for status, count in result.all()}
@@ -0,0 +1,29 @@
+"""
+Async Product Repository - non-blocking product catalog access for the live message path.
+"""
+from typing import Optional, List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from storage.models.product import Product
+
+
+class AsyncProductRepository:
+    """Async repository for Product operations."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, product_id: str) -> Optional[Product]:
+        """Get product by ID."""
+        return await self.db.get(Product, product_id)
+
+    async def get_by_tenant(self, tenant_id: str, available_only: bool = True) -> List[Product]:
+        """
+        Get all products for a tenant.
+        By default, only returns available products.
+        """
+        query = select(Product).where(Product.tenant_id == tenant_id)
+        if available_only:
+            query = query.where(Product.available == True)
+        result = await self.db.execute(query)
+        return list(result.scalars().all())
@@ -0,0 +1,17 @@
+"""
+Async Tenant Repository - non-blocking tenant data access for the live message path.
+"""
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from storage.models.tenant import Tenant
+
+
+class AsyncTenantRepository:
+    """Async repository for Tenant operations."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, tenant_id: str) -> Optional[Tenant]:
+        """Get tenant by ID."""
+        return await self.db.get(Tenant, tenant_id)
@@ -81,7 +81,12 @@ class ConversationRepository:
     # === Message Operations ===
 
     def add_message(
-        self, conversation_id: int, role: str, content: str, channel: Optional[str] = "unknown"
+        self,
+        conversation_id: int,
+        role: str,
+        content: str,
+        channel: Optional[str] = "unknown",
+        token_count: Optional[int] = None,
     ) -> Message:
         """
         Add message to conversation and increment total_message_count.
@@ -91,6 +96,7 @@ class ConversationRepository:
             role: 'user' or 'assistant'
             content: Message text content
             channel: Channel source (telegram, whatsapp, etc.). Defaults to 'unknown'.
+            token_count: Estimated prompt tokens (cached for history budgeting)
         """
         # Increment total message count
         conversation = self.get_conversation_by_id(conversation_id)
@@ -102,6 +108,7 @@ class ConversationRepository:
             role=role,
             content=content,
             channel=channel,
+            token_count=token_count,
         )
         self.db.add(message)
         self.db.commit()
@@ -136,17 +143,24 @@ class ConversationRepository:
             .all()
         )[::-1]  # Reverse to chronological order
 
-    def get_conversation_history(self, customer_id: int) -> List[dict]:
+    def get_conversation_history(self, customer_id: int, limit: Optional[int] = None) -> List[dict]:
         """
-        Get full conversation history for customer as Claude-formatted messages.
-        Returns: [{"role": "user", "content": "..."}, ...]
+        Get conversation history for customer as Claude-formatted messages.
+        With a limit, only the newest `limit` messages are fetched (role/content columns only).
+        Returns: [{"role": "user", "content": "..."}, ...] oldest first
         """
         conversation = self.get_active_conversation(customer_id)
         if not conversation:
             return []
 
-        messages = self.get_messages(conversation.id)
-        return [{"role": msg.role, "content": msg.content} for msg in messages]
+        query = (
+            self.db.query(Message.role, Message.content)
+            .filter(Message.conversation_id == conversation.id)
+            .order_by(Message.created_at.desc(), Message.id.desc())
+        )
+        if limit:
+            query = query.limit(limit)
+        return [{"role": role, "content": content} for role, content in reversed(query.all())]
 
     def update_summary(
         self, conversation_id: int, summary: str, summarized_at: int
@@ -4,6 +4,7 @@ Product Repository - manages product catalog.
 from typing import Optional, List
 from sqlalchemy.orm import Session
 from storage.models.product import Product
+from tenants.cache import invalidate_tenant_config
 
 
 class ProductRepository:
@@ -63,6 +64,7 @@ class ProductRepository:
         self.db.add(product)
         self.db.commit()
         self.db.refresh(product)
+        invalidate_tenant_config(tenant_id)
         return product
 
     def update_availability(self, product_id: str, available: bool) -> Optional[Product]:
@@ -72,6 +74,7 @@ class ProductRepository:
             product.available = available
             self.db.commit()
             self.db.refresh(product)
+            invalidate_tenant_config(product.tenant_id)
         return product
 
     def update_price(self, product_id: str, new_price: float) -> Optional[Product]:
@@ -81,4 +84,5 @@ class ProductRepository:
             product.price = new_price
             self.db.commit()
             self.db.refresh(product)
+            invalidate_tenant_config(product.tenant_id)
         return product
@@ -4,6 +4,7 @@ Tenant Repository - manages tenant data access.
 from typing import Optional, List
 from sqlalchemy.orm import Session
 from storage.models.tenant import Tenant
+from tenants.cache import invalidate_tenant_config
 
 
 class TenantRepository:
@@ -55,6 +56,7 @@ class TenantRepository:
         """Update existing tenant."""
         self.db.commit()
         self.db.refresh(tenant)
+        invalidate_tenant_config(tenant.id)
         return tenant
 
     def delete(self, tenant_id: str) -> bool:
@@ -63,5 +65,6 @@ class TenantRepository:
         if tenant:
             self.db.delete(tenant)
             self.db.commit()
+            invalidate_tenant_config(tenant_id)
             return True
         return False
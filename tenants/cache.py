@@ -0,0 +1,95 @@
+"""
+In-process tenant configuration cache.
+
+Tenant rows and product catalogs change rarely (about once a day), but every
+message used to reload them. Entries are resolved tenants (tenants/loader.py:
+prompt config plus channel configs), shared by webhooks, the orchestrator and
+the outbox dispatcher. Entries are keyed by (tenant_id, catalog_version):
+- Repositories call invalidate_tenant_config() after tenant/product writes,
+  which bumps the version so stale entries are never served by this process.
+- A TTL bounds staleness for writes made by other processes (seed scripts,
+  other workers), since the version counter is per-process.
+
+Kept free of storage/agent imports so repositories can call the invalidation hook.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+# Seconds before a cached tenant config is reloaded from the database
+TENANT_CACHE_TTL = float(os.getenv("TENANT_CACHE_TTL_SECONDS", "300"))
+
+
+@dataclass
+class CachedTenantConfig:
+    """A cached tenant config entry."""
+    config: Any
+    version: int
+    loaded_at: float
+
+    def is_fresh(self) -> bool:
+        """Check if the entry is still within its TTL."""
+        return time.monotonic() - self.loaded_at < TENANT_CACHE_TTL
+
+
+_lock = threading.Lock()
+_versions: Dict[str, int] = {}
+_entries: Dict[Tuple[str, int], CachedTenantConfig] = {}
+
+
+def get_catalog_version(tenant_id: str) -> int:
+    """Current catalog version for a tenant (0 until first invalidation)."""
+    with _lock:
+        return _versions.get(tenant_id, 0)
+
+
+def get_cached_config(tenant_id: str) -> Optional[Any]:
+    """
+    Get a cached tenant config if present and fresh.
+
+    Returns:
+        The cached config, or None on miss/expiry
+    """
+    with _lock:
+        version = _versions.get(tenant_id, 0)
+        entry = _entries.get((tenant_id, version))
+        if entry and entry.is_fresh():
+            return entry.config
+        return None
+
+
+def put_cached_config(tenant_id: str, version: int, config: Any) -> None:
+    """
+    Store a loaded tenant config under the version it was loaded at.
+
+    If the tenant was invalidated while loading, the version has moved on and
+    the entry is simply never read.
+    """
+    with _lock:
+        if version != _versions.get(tenant_id, 0):
+            return
+        _entries[(tenant_id, version)] = CachedTenantConfig(
+            config=config,
+            version=version,
+            loaded_at=time.monotonic(),
+        )
+
+
+def invalidate_tenant_config(tenant_id: str) -> None:
+    """
+    Invalidate a tenant's cached config (call after tenant or product writes).
+    """
+    with _lock:
+        _versions[tenant_id] = _versions.get(tenant_id, 0) + 1
+        for key in [k for k in _entries if k[0] == tenant_id]:
+            del _entries[key]
+
+
+def clear_tenant_cache() -> None:
+    """Drop all cached tenant configs."""
+    with _lock:
+        for tenant_id in {k[0] for k in _entries}:
+            _versions[tenant_id] = _versions.get(tenant_id, 0) + 1
+        _entries.clear()
@@ -1,35 +1,60 @@
 """
 Tenant configuration loader.
-Loads tenant configuration from database.
+Loads tenant configuration from database, served from the in-process cache (tenants/cache.py).
+
+The cache holds one ResolvedTenant per tenant: the prompt config plus the
+per-channel configs, so webhooks, the orchestrator and the outbox dispatcher
+share one lookup instead of each re-reading the tenant row.
 """
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, List, Mapping, Optional
 from sqlalchemy.orm import Session
-from storage.repositories import TenantRepository, ProductRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from channels import ChannelType, get_channel_config
+from storage.database import AsyncSessionLocal
+from storage.models.tenant import Tenant
+from storage.models.product import Product
+from storage.repositories import (
+    TenantRepository,
+    ProductRepository,
+    AsyncTenantRepository,
+    AsyncProductRepository,
+)
+from tenants.cache import get_cached_config, put_cached_config, get_catalog_version
 
 
-class TenantConfig:
-    """Dynamic tenant configuration loaded from database."""
+def _freeze(value: Any) -> Any:
+    """Read-only copy of JSON-like data: dicts become MappingProxyType, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
 
-    def __init__(self, tenant_id: str, db: Session):
-        tenant_repo = TenantRepository(db)
-        product_repo = ProductRepository(db)
 
-        # Load tenant from database
-        tenant = tenant_repo.get_by_id(tenant_id)
-        if not tenant:
-            raise ValueError(f"Tenant '{tenant_id}' not found in database")
+class TenantConfig:
+    """
+    Dynamic tenant configuration loaded from database.
 
-        # Load products
-        products = product_repo.get_by_tenant(tenant_id, available_only=True)
+    Shared by every request through the tenant cache, so SETTINGS and PRODUCTS
+    are read-only (mappings and tuples).
+    """
 
+    def __init__(self, tenant: Tenant, products: List[Product]):
         # Set attributes (matches old valdman.py structure)
         self.COMPANY_NAME = tenant.company_name
         self.COMPANY_TYPE = tenant.company_type
         self.BUSINESS_DESCRIPTION = tenant.business_description
         self.AGENT_ROLE = tenant.agent_role
         self.AGENT_INSTRUCTIONS = tenant.agent_instructions
+        self.CURRENCY = tenant.currency
+
+        # Per-tenant agent tuning knobs (see Tenant.agent_settings)
+        self.SETTINGS = _freeze(tenant.agent_settings or {})
 
         # Convert products to format expected by agent
-        self.PRODUCTS = [
+        self.PRODUCTS = _freeze([
             {
                 "name": p.name,
                 "category": p.category,
@@ -38,12 +63,43 @@ class TenantConfig:
                 "description": p.description,
             }
             for p in products
-        ]
+        ])
+
+
+@dataclass(frozen=True)
+class ResolvedTenant:
+    """
+    A tenant resolved for the message path (immutable, shared via the cache).
+
+    config is the read-only TenantConfig (agent.prompt_builder renders its static
+    prompt once per config, outside the record); channel_configs maps channel
+    name -> read-only channel config.
+    """
+    tenant_id: str
+    config: TenantConfig
+    channel_configs: Mapping[str, Mapping]
+
+    def channel_config(self, channel: ChannelType) -> Optional[Mapping]:
+        """Channel-specific configuration, or None if the tenant has none for this channel."""
+        return self.channel_configs.get(channel.value)
+
+
+def _resolve(tenant: Tenant, products: List[Product]) -> ResolvedTenant:
+    channel_configs = {}
+    for channel in ChannelType:
+        channel_config = get_channel_config(tenant, channel)
+        if channel_config:
+            channel_configs[channel.value] = MappingProxyType(dict(channel_config))
+    return ResolvedTenant(
+        tenant_id=tenant.id,
+        config=TenantConfig(tenant, products),
+        channel_configs=MappingProxyType(channel_configs),
+    )
 
 
 def load_tenant_config(tenant_id: str = "valdman", db: Session = None) -> TenantConfig:
     """
-    Load tenant configuration from database.
+    Load tenant configuration (cached per process, reloaded after TTL or invalidation).
 
     Args:
         tenant_id: Identifier for the tenant (e.g., "valdman")
@@ -58,4 +114,66 @@ def load_tenant_config(tenant_id: str = "valdman", db: Session = None) -> Tenant
     if db is None:
         raise ValueError("Database session is required")
 
-    return TenantConfig(tenant_id, db)
+    resolved = get_cached_config(tenant_id)
+    if resolved:
+        return resolved.config
+
+    version = get_catalog_version(tenant_id)
+    tenant = TenantRepository(db).get_by_id(tenant_id)
+    if not tenant:
+        raise ValueError(f"Tenant '{tenant_id}' not found in database")
+
+    products = ProductRepository(db).get_by_tenant(tenant_id, available_only=True)
+    resolved = _resolve(tenant, products)
+    put_cached_config(tenant_id, version, resolved)
+    return resolved.config
+
+
+async def resolve_tenant(tenant_id: str, db: Optional[AsyncSession] = None) -> Optional[ResolvedTenant]:
+    """
+    Resolve a tenant for the live message path (cached per process, reloaded after TTL or invalidation).
+
+    Args:
+        tenant_id: Identifier for the tenant (e.g., "valdman")
+        db: Async database session (a short-lived one is opened on a cache miss if omitted)
+
+    Returns:
+        ResolvedTenant, or None if the tenant doesn't exist
+    """
+    resolved = get_cached_config(tenant_id)
+    if resolved:
+        return resolved
+
+    if db is None:
+        async with AsyncSessionLocal() as session:
+            return await resolve_tenant(tenant_id, session)
+
+    version = get_catalog_version(tenant_id)
+    tenant = await AsyncTenantRepository(db).get_by_id(tenant_id)
+    if not tenant:
+        return None
+
+    products = await AsyncProductRepository(db).get_by_tenant(tenant_id, available_only=True)
+    resolved = _resolve(tenant, products)
+    put_cached_config(tenant_id, version, resolved)
+    return resolved
+
+
+async def load_tenant_config_async(tenant_id: str, db: AsyncSession) -> TenantConfig:
+    """
+    Async variant of load_tenant_config for the live message path.
+
+    Args:
+        tenant_id: Identifier for the tenant (e.g., "valdman")
+        db: Async database session
+
+    Returns:
+        TenantConfig object with tenant data
+
+    Raises:
+        ValueError: If tenant not found in database
+    """
+    resolved = await resolve_tenant(tenant_id, db)
+    if not resolved:
+        raise ValueError(f"Tenant '{tenant_id}' not found in database")
+    return resolved.config
@@ -0,0 +1,37 @@
+"""
+Fast path price matching - generic words must fall back to the LLM, not answer a confident wrong price.
+"""
+from agent.fast_path import try_fast_path
+
+
+class FakeTenantConfig:
+    COMPANY_NAME = "Valdman"
+    CURRENCY = "NIS"
+    SETTINGS = {"fast_path": True}
+    PRODUCTS = [
+        {"name": "Beef Sausages", "category": "Beef", "price": 60, "unit": "kg", "description": ""},
+        {"name": "Premium Ribeye Steak", "category": "Beef", "price": 180, "unit": "kg", "description": ""},
+        {"name": "Chicken Breast", "category": "Chicken", "price": 45, "unit": "kg", "description": ""},
+        {"name": "Chicken Wings", "category": "Chicken", "price": 35, "unit": "kg", "description": ""},
+    ]
+
+
+def test_category_word_falls_back_to_llm():
+    assert try_fast_path(FakeTenantConfig, ["How much does beef cost"]) is None
+
+
+def test_word_shared_by_several_products_falls_back_to_llm():
+    assert try_fast_path(FakeTenantConfig, ["how much is chicken?"]) is None
+
+
+def test_distinctive_product_word_is_answered():
+    answer = try_fast_path(FakeTenantConfig, ["how much is the ribeye?"])
+    assert answer is not None
+    assert answer.intent == "price"
+    assert "Premium Ribeye Steak costs 180 NIS" in answer.text
+
+
+def test_full_product_name_is_answered():
+    answer = try_fast_path(FakeTenantConfig, ["price of beef sausages"])
+    assert answer is not None
+    assert "Beef Sausages costs 60 NIS" in answer.text
@@ -0,0 +1,95 @@
+"""
+History assembler - newest-first token budget, same-role merging, and the
+user-first rule.
+"""
+from types import SimpleNamespace
+
+from agent import history
+from agent.history import assemble_history, estimate_tokens
+
+
+def _message(id, role, content, token_count=None):
+    return SimpleNamespace(id=id, role=role, content=content, token_count=token_count)
+
+
+def _conversation(count, tokens=10):
+    return [
+        _message(i, "user" if i % 2 == 0 else "assistant", f"message {i}", tokens)
+        for i in range(count)
+    ]
+
+
+def test_budget_keeps_the_newest_messages():
+    window = assemble_history(_conversation(10), token_budget=40)
+
+    assert [m["content"] for m in window.messages] == ["message 6", "message 7", "message 8", "message 9"]
+    assert window.tokens == 40
+
+
+def test_newest_message_is_kept_even_over_budget():
+    messages = _conversation(3)
+    messages.append(_message(3, "user", "a pasted price list", 500))
+
+    window = assemble_history(messages, token_budget=100)
+
+    assert window.messages == [{"role": "user", "content": "a pasted price list"}]
+    assert window.tokens == 500
+
+
+def test_oversized_older_message_ends_the_window():
+    messages = [
+        _message(0, "user", "hi", 10),
+        _message(1, "assistant", "a long catalog", 500),
+        _message(2, "user", "thanks", 10),
+    ]
+
+    window = assemble_history(messages, token_budget=100)
+
+    assert window.messages == [{"role": "user", "content": "thanks"}]
+
+
+def test_max_messages_caps_the_window(monkeypatch):
+    monkeypatch.setattr(history, "HISTORY_MAX_MESSAGES", 3)
+
+    window = assemble_history(_conversation(10, tokens=1), token_budget=1000)
+
+    assert [m["content"] for m in window.messages] == ["message 8", "message 9"]
+
+
+def test_same_role_messages_are_merged():
+    messages = [
+        _message(0, "user", "hi", 5),
+        _message(1, "user", "price of beef?", 5),
+        _message(2, "assistant", "89 per kg", 5),
+        _message(3, "user", "and chicken?", 5),
+        _message(4, "user", "2 kg each", 5),
+    ]
+
+    window = assemble_history(messages, token_budget=1000)
+
+    assert window.messages == [
+        {"role": "user", "content": "hi\n\nprice of beef?"},
+        {"role": "assistant", "content": "89 per kg"},
+        {"role": "user", "content": "and chicken?\n\n2 kg each"},
+    ]
+    assert window.tokens == 25
+
+
+def test_leading_assistant_message_is_dropped():
+    window = assemble_history(_conversation(10), token_budget=50)
+
+    assert window.messages[0] == {"role": "user", "content": "message 6"}
+    assert window.tokens == 40  # The dropped message isn't counted
+
+
+def test_missing_token_counts_are_estimated_for_caching():
+    messages = [
+        _message(1, "user", "hi", 7),
+        _message(2, "assistant", "hello there"),
+        _message(None, "user", "unsaved"),
+    ]
+
+    window = assemble_history(messages, token_budget=1000)
+
+    assert window.new_token_counts == {2: estimate_tokens("hello there")}
+    assert window.tokens == 7 + estimate_tokens("hello there") + estimate_tokens("unsaved")
@@ -0,0 +1,126 @@
+"""
+LLM gateway circuit breaker - a cancelled half-open probe must not wedge the breaker,
+and rate limiting (429) is backed off without counting as a provider failure.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from anthropic import InternalServerError, RateLimitError
+
+from agent import llm_gateway
+from agent.llm_gateway import CircuitBreaker
+
+
+@pytest.fixture
+def half_open_breaker(monkeypatch):
+    """Gateway breaker that has opened and is now half-open."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0.05)
+    breaker.record_failure()
+    breaker._opened_at = time.monotonic() - 1
+    assert breaker.state == "half-open"
+    monkeypatch.setattr(llm_gateway, "breaker", breaker)
+    return breaker
+
+
+async def _hang(**kwargs):
+    await asyncio.sleep(3600)
+
+
+def test_cancelled_create_probe_releases_breaker(half_open_breaker, monkeypatch):
+    monkeypatch.setattr(llm_gateway.client.messages, "create", _hang)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(llm_gateway.create_message(model="m", max_tokens=1, messages=[]), 0.05)
+
+    asyncio.run(run())
+    assert half_open_breaker.state == "half-open"
+    assert half_open_breaker.admit() == "probe"
+
+
+def test_cancelled_stream_probe_releases_breaker(half_open_breaker, monkeypatch):
+    class HangingStream:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(llm_gateway.client.messages, "stream", lambda **kwargs: HangingStream())
+
+    async def consume():
+        async with llm_gateway.stream_message(model="m", max_tokens=1, messages=[]):
+            await asyncio.sleep(3600)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(consume(), 0.05)
+
+    asyncio.run(run())
+    assert half_open_breaker.admit() == "probe"
+
+
+def test_probe_failure_reopens_breaker(half_open_breaker):
+    assert half_open_breaker.admit() == "probe"
+    assert half_open_breaker.admit() is None
+    half_open_breaker.record_failure()
+    assert half_open_breaker.state == "open"
+
+
+def _status_error(error_class, status_code):
+    request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+    return error_class("error", response=httpx.Response(status_code, request=request), body=None)
+
+
+def test_rate_limits_back_off_without_opening_breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    monkeypatch.setattr(llm_gateway, "breaker", breaker)
+    monkeypatch.setattr(llm_gateway, "LLM_RETRY_MAX_DELAY", 0)
+
+    async def rate_limited(**kwargs):
+        raise _status_error(RateLimitError, 429)
+
+    monkeypatch.setattr(llm_gateway.client.messages, "create", rate_limited)
+
+    with pytest.raises(llm_gateway.LLMUnavailableError):
+        asyncio.run(llm_gateway.create_message(model="m", max_tokens=1, messages=[]))
+    assert breaker.state == "closed"
+
+
+def test_server_errors_open_breaker(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    monkeypatch.setattr(llm_gateway, "breaker", breaker)
+    monkeypatch.setattr(llm_gateway, "LLM_RETRY_MAX_DELAY", 0)
+    calls = []
+
+    async def overloaded(**kwargs):
+        calls.append(1)
+        raise _status_error(InternalServerError, 529)
+
+    monkeypatch.setattr(llm_gateway.client.messages, "create", overloaded)
+
+    with pytest.raises(llm_gateway.LLMUnavailableError):
+        asyncio.run(llm_gateway.create_message(model="m", max_tokens=1, messages=[]))
+    assert breaker.state == "open"
+    assert len(calls) == 2  # Gave up as soon as the breaker opened
+
+
+def test_probe_backoff_does_not_claim_another_probe(half_open_breaker, monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_RETRY_MAX_DELAY", 0)
+    attempts = []
+
+    async def rate_limited_once(**kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise _status_error(RateLimitError, 429)
+        return SimpleNamespace(usage=None)
+
+    monkeypatch.setattr(llm_gateway.client.messages, "create", rate_limited_once)
+
+    asyncio.run(llm_gateway.create_message(model="m", max_tokens=1, messages=[]))
+    assert len(attempts) == 2
+    assert half_open_breaker.state == "closed"
+    assert half_open_breaker.short_circuited == 0
@@ -0,0 +1,75 @@
+"""
+LLM scheduler - grants that never report usage are refunded, so failures and
+cancellations don't drain the buckets.
+"""
+import asyncio
+
+import httpx
+import pytest
+from anthropic import BadRequestError
+
+from agent import llm_gateway
+from agent.llm_scheduler import CallCost, LLMScheduler
+
+COST = CallCost(input_tokens=1000, output_tokens=100)
+
+
+def _scheduler():
+    return LLMScheduler(requests_per_minute=600, input_tpm=60000, output_tpm=6000)
+
+
+def test_granted_then_cancelled_waiter_is_refunded():
+    scheduler = _scheduler()
+
+    async def run():
+        scheduler.input_tokens.level = 0  # Empty - the waiter queues
+        task = asyncio.create_task(scheduler.acquire(COST))
+        await asyncio.sleep(0)
+        scheduler.input_tokens.level = scheduler.input_tokens.capacity
+        requests_before = scheduler.requests.level
+        scheduler._pump()  # Granted...
+        task.cancel()      # ...and cancelled before it resumed
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return requests_before
+
+    requests_before = asyncio.run(run())
+
+    assert scheduler.input_tokens.level == pytest.approx(scheduler.input_tokens.capacity)
+    assert scheduler.requests.level == pytest.approx(requests_before, abs=0.1)
+
+
+def test_failed_call_refunds_its_tokens(monkeypatch):
+    scheduler = _scheduler()
+    monkeypatch.setattr(llm_gateway, "scheduler", scheduler)
+
+    async def bad_request(**kwargs):
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+        raise BadRequestError("bad", response=httpx.Response(400, request=request), body=None)
+
+    monkeypatch.setattr(llm_gateway.client.messages, "create", bad_request)
+
+    for _ in range(5):
+        with pytest.raises(BadRequestError):
+            asyncio.run(llm_gateway.create_message(model="m", max_tokens=100, messages=[]))
+
+    assert scheduler.input_tokens.level == pytest.approx(scheduler.input_tokens.capacity)
+    assert scheduler.output_tokens.level == pytest.approx(scheduler.output_tokens.capacity)
+
+
+def test_cancelled_call_refunds_its_tokens(monkeypatch):
+    scheduler = _scheduler()
+    monkeypatch.setattr(llm_gateway, "scheduler", scheduler)
+
+    async def hang(**kwargs):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(llm_gateway.client.messages, "create", hang)
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(llm_gateway.create_message(model="m", max_tokens=100, messages=[]), 0.02)
+
+    asyncio.run(run())
+
+    assert scheduler.output_tokens.level == pytest.approx(scheduler.output_tokens.capacity)
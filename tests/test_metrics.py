@@ -0,0 +1,36 @@
+"""
+Prometheus rendering - stats keyed by model are exported with a model label,
+not as one metric name per model.
+"""
+from agent.metrics import render_prometheus
+
+STATS = {
+    "models": {
+        "tiers": {
+            "fast": {"calls": 3, "models": {"claude-haiku-4-5": 2, "claude-sonnet-4-5": 1}},
+        },
+        "escalations": 1,
+    },
+    "dedup": {"enabled": True},
+}
+
+
+def _gauge_lines(text):
+    return [line for line in text.splitlines() if line.startswith(("agent_models", "agent_dedup", "# TYPE agent_models"))]
+
+
+def test_model_names_are_labels():
+    lines = _gauge_lines(render_prometheus(STATS))
+
+    assert 'agent_models_tiers_fast_models{model="claude-haiku-4-5"} 2' in lines
+    assert 'agent_models_tiers_fast_models{model="claude-sonnet-4-5"} 1' in lines
+    assert not any("claude" in line.split("{")[0] for line in lines)
+
+
+def test_each_gauge_is_typed_once():
+    lines = _gauge_lines(render_prometheus(STATS))
+
+    assert lines.count("# TYPE agent_models_tiers_fast_models gauge") == 1
+    assert "agent_models_tiers_fast_calls 3" in lines
+    assert "agent_models_escalations 1" in lines
+    assert "agent_dedup_enabled 1" in lines
@@ -2,6 +2,7 @@
 Tools module for agent function calling.
 Organizes tools by domain (orders, products, customers, etc.).
 """
+import json
 
 from .orders import (
     create_order,
@@ -22,8 +23,14 @@ TOOL_DEFINITIONS = [
     UPDATE_ORDER_DEF,
 ]
 
+# Tools that only read data - safe to run concurrently with each other.
+# Any tool not listed here is treated as mutating and runs sequentially.
+READ_ONLY_TOOLS = {
+    "get_customer_orders",
+}
 
-def execute_tool(tool_name: str, tool_input: dict, tenant_id: str, chat_id: str, db, config=None):
+
+async def execute_tool(tool_name: str, tool_input: dict, tenant_id: str, chat_id: str, db, config=None):
     """
     Execute a tool by name and return the result.
 
@@ -32,23 +39,35 @@ def execute_tool(tool_name: str, tool_input: dict, tenant_id: str, chat_id: str,
         tool_input: Input parameters for the tool
         tenant_id: Tenant identifier (e.g., "valdman")
         chat_id: Current customer's chat ID
-        db: Database session
+        db: Async database session
         config: Tenant configuration (for future tools)
 
     Returns:
         Tool execution result
     """
     if tool_name == "get_customer_orders":
-        return get_customer_orders(tenant_id, chat_id, db)
+        return await get_customer_orders(tenant_id, chat_id, tool_input, db)
 
     elif tool_name == "create_order":
-        return create_order(tenant_id, chat_id, tool_input, db)
+        return await create_order(tenant_id, chat_id, tool_input, db)
 
     elif tool_name == "cancel_order":
-        return cancel_order(tenant_id, chat_id, tool_input, db)
+        return await cancel_order(tenant_id, chat_id, tool_input, db)
 
     elif tool_name == "update_order":
-        return update_order(tenant_id, chat_id, tool_input, db)
+        return await update_order(tenant_id, chat_id, tool_input, db)
 
     else:
         return {"error": f"Unknown tool: {tool_name}"}
+
+
+def serialize_tool_result(tool_result) -> str:
+    """
+    Serialize a tool result for a tool_result block.
+
+    Compact, stable JSON: no whitespace, sorted keys (identical results give
+    identical prompt bytes), and non-ASCII text kept as-is rather than escaped.
+    """
+    if isinstance(tool_result, str):
+        return tool_result
+    return json.dumps(tool_result, ensure_ascii=False, separators=(",", ":"), sort_keys=True, default=str)
@@ -4,8 +4,8 @@ Cancel Order Tool
 Cancels an existing order for the customer.
 """
 
-from sqlalchemy.orm import Session
-from storage.repositories import OrderRepository, CustomerRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from storage.repositories import AsyncOrderRepository, AsyncCustomerRepository
 
 # Tool definition for Claude API
 TOOL_DEF = {
@@ -24,7 +24,7 @@ TOOL_DEF = {
 }
 
 
-def cancel_order(tenant_id: str, chat_id: str, tool_input: dict, db: Session) -> dict:
+async def cancel_order(tenant_id: str, chat_id: str, tool_input: dict, db: AsyncSession) -> dict:
     """
     Cancel an existing order.
 
@@ -32,7 +32,7 @@ def cancel_order(tenant_id: str, chat_id: str, tool_input: dict, db: Session) ->
         tenant_id: Tenant ID (e.g., "valdman")
         chat_id: Telegram/WhatsApp chat ID of the customer
         tool_input: Tool input with order_id
-        db: Database session
+        db: Async database session
 
     Returns:
         dict: Result of the cancellation attempt
@@ -43,15 +43,15 @@ def cancel_order(tenant_id: str, chat_id: str, tool_input: dict, db: Session) ->
         return {"success": False, "error": "No order ID provided"}
 
     # Verify customer exists
-    customer_repo = CustomerRepository(db)
-    customer = customer_repo.get_by_chat_id(tenant_id, chat_id)
+    customer_repo = AsyncCustomerRepository(db)
+    customer = await customer_repo.get_by_chat_id(tenant_id, chat_id)
 
     if not customer:
         return {"success": False, "error": "No orders found for this customer"}
 
     # Get the order
-    order_repo = OrderRepository(db)
-    order = order_repo.get_by_id(order_id)
+    order_repo = AsyncOrderRepository(db)
+    order = await order_repo.get_by_id(order_id)
 
     if not order:
         return {"success": False, "error": f"Order {order_id} not found"}
@@ -68,7 +68,7 @@ def cancel_order(tenant_id: str, chat_id: str, tool_input: dict, db: Session) ->
         }
 
     # Cancel the order
-    order_repo.update_status(order_id, "cancelled")
+    await order_repo.update_status(order_id, "cancelled")
 
     print(f"[Live][Tool] cancel_order → {order_id} | cancelled")
 
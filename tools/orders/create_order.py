@@ -4,8 +4,8 @@ Create Order Tool
 Creates a new order for the customer with structured data.
 """
 
-from sqlalchemy.orm import Session
-from storage.repositories import OrderRepository, CustomerRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from storage.repositories import AsyncOrderRepository, AsyncCustomerRepository
 
 # Tool definition for Claude API
 TOOL_DEF = {
@@ -54,7 +54,7 @@ TOOL_DEF = {
 }
 
 
-def create_order(tenant_id: str, chat_id: str, tool_input: dict, db: Session) -> dict:
+async def create_order(tenant_id: str, chat_id: str, tool_input: dict, db: AsyncSession) -> dict:
     """
     Create and store a new order in the database.
 
@@ -62,20 +62,20 @@ def create_order(tenant_id: str, chat_id: str, tool_input: dict, db: Session) ->
         tenant_id: Tenant ID (e.g., "valdman")
         chat_id: Telegram/WhatsApp chat ID of the customer
         tool_input: Order data from the tool call
-        db: Database session
+        db: Async database session
 
     Returns:
         dict: Created order object with order_id
     """
     # Get or create customer
-    customer_repo = CustomerRepository(db)
-    customer = customer_repo.get_or_create_by_chat_id(tenant_id, chat_id)
+    customer_repo = AsyncCustomerRepository(db)
+    customer = await customer_repo.get_or_create_by_chat_id(tenant_id, chat_id)
 
     # Generate order ID and create order
-    order_repo = OrderRepository(db)
-    order_id = order_repo.generate_order_id(tenant_id)
+    order_repo = AsyncOrderRepository(db)
+    order_id = await order_repo.generate_order_id(tenant_id)
 
-    order = order_repo.create(
+    order = await order_repo.create(
         order_id=order_id,
         tenant_id=tenant_id,
         customer_id=customer.id,
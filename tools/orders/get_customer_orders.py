@@ -1,57 +1,121 @@
 """
 Get Customer Orders Tool
 
-Retrieves all orders for the current customer.
+Retrieves the current customer's orders, one page at a time.
 This tool allows the agent to access order history when customers ask about their orders.
+By default only open orders and orders from the last RECENT_ORDER_DAYS are returned, so
+the result stays small for repeat customers with a long history.
 """
 
-from sqlalchemy.orm import Session
-from storage.repositories import OrderRepository, CustomerRepository
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from storage.repositories import AsyncOrderRepository, AsyncCustomerRepository
+
+OPEN_STATUSES = ["pending", "confirmed"]
+ORDER_STATUSES = ["pending", "confirmed", "completed", "cancelled"]
+RECENT_ORDER_DAYS = 30
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
 
 # Tool definition for Claude API
 TOOL_DEF = {
     "name": "get_customer_orders",
-    "description": "Retrieves all orders for the current customer. Use this when the customer asks about their orders, order history, or what they've ordered.",
+    "description": (
+        "Retrieves the current customer's orders, newest first. Use this when the customer asks about "
+        "their orders, order history, or what they've ordered. By default returns open orders and orders "
+        f"from the last {RECENT_ORDER_DAYS} days; use status \"all\" and offset to page through older history."
+    ),
     "input_schema": {
         "type": "object",
-        "properties": {},
+        "properties": {
+            "status": {
+                "type": "string",
+                "enum": ["recent", "open", "all"] + ORDER_STATUSES,
+                "description": (
+                    f"\"recent\" (default): open orders plus orders from the last {RECENT_ORDER_DAYS} days. "
+                    "\"open\": pending and confirmed orders. \"all\": every order. Or a single status."
+                )
+            },
+            "limit": {
+                "type": "integer",
+                "description": f"Maximum orders to return (default {DEFAULT_LIMIT}, max {MAX_LIMIT})"
+            },
+            "offset": {
+                "type": "integer",
+                "description": "Orders to skip, for the next page (use next_offset from the previous result)"
+            }
+        },
         "required": []
     }
 }
 
 
-def get_customer_orders(tenant_id: str, chat_id: str, db: Session) -> list:
+def _order_to_dict(order) -> dict:
+    """Compact order summary - empty fields are left out."""
+    result = {
+        "order_id": order.id,
+        "status": order.status,
+        "total": order.total,
+        "items": [
+            {k: v for k, v in item.items() if v is not None}
+            for item in (order.items or [])
+        ],
+        "created_at": order.created_at.isoformat(timespec="minutes") if order.created_at else None,
+    }
+    if order.delivery_notes:
+        result["delivery_notes"] = order.delivery_notes
+    return result
+
+
+async def get_customer_orders(tenant_id: str, chat_id: str, tool_input: dict, db: AsyncSession) -> dict:
     """
-    Retrieve all orders for a specific customer from database.
+    Retrieve one page of a customer's orders from database.
 
     Args:
         tenant_id: Tenant ID (e.g., "valdman")
         chat_id: Telegram/WhatsApp chat ID of the customer
-        db: Database session
+        tool_input: Optional status, limit and offset
+        db: Async database session
 
     Returns:
-        list: List of order dictionaries for this customer
+        dict: {"orders": [...], "has_more": bool, "next_offset": int (only if has_more)}
     """
+    status = tool_input.get("status") or "recent"
+    try:
+        limit = min(max(int(tool_input.get("limit") or DEFAULT_LIMIT), 1), MAX_LIMIT)
+        offset = max(int(tool_input.get("offset") or 0), 0)
+    except (TypeError, ValueError):
+        return {"success": False, "error": "limit and offset must be integers"}
+
+    if status not in ("recent", "open", "all") and status not in ORDER_STATUSES:
+        return {"success": False, "error": f"Unknown status: {status}"}
+
     # Get customer
-    customer_repo = CustomerRepository(db)
-    customer = customer_repo.get_by_chat_id(tenant_id, chat_id)
+    customer_repo = AsyncCustomerRepository(db)
+    customer = await customer_repo.get_by_chat_id(tenant_id, chat_id)
 
     if not customer:
-        return []
-
-    # Get orders
-    order_repo = OrderRepository(db)
-    orders = order_repo.get_by_customer(customer.id)
-
-    # Convert to dictionaries for Claude
-    return [
-        {
-            "order_id": order.id,
-            "items": order.items,
-            "total": order.total,
-            "delivery_notes": order.delivery_notes,
-            "status": order.status,
-            "created_at": order.created_at.isoformat() if order.created_at else None,
-        }
-        for order in orders
-    ]
+        return {"orders": [], "has_more": False}
+
+    # Get one extra order to know whether there is a next page
+    order_repo = AsyncOrderRepository(db)
+    if status == "recent":
+        orders = await order_repo.find_by_customer(
+            customer.id,
+            open_statuses=OPEN_STATUSES,
+            created_after=datetime.now(timezone.utc) - timedelta(days=RECENT_ORDER_DAYS),
+            limit=limit + 1,
+            offset=offset,
+        )
+    else:
+        statuses = {"open": OPEN_STATUSES, "all": None}.get(status, [status])
+        orders = await order_repo.find_by_customer(customer.id, statuses=statuses, limit=limit + 1, offset=offset)
+
+    has_more = len(orders) > limit
+    result = {
+        "orders": [_order_to_dict(order) for order in orders[:limit]],
+        "has_more": has_more,
+    }
+    if has_more:
+        result["next_offset"] = offset + limit
+    return result
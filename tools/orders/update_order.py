@@ -4,8 +4,8 @@ Update Order Tool
 Updates an existing pending order with new items and total.
 """
 
-from sqlalchemy.orm import Session
-from storage.repositories import OrderRepository, CustomerRepository
+from sqlalchemy.ext.asyncio import AsyncSession
+from storage.repositories import AsyncOrderRepository, AsyncCustomerRepository
 
 # Tool definition for Claude API
 TOOL_DEF = {
@@ -58,7 +58,7 @@ TOOL_DEF = {
 }
 
 
-def update_order(tenant_id: str, chat_id: str, tool_input: dict, db: Session) -> dict:
+async def update_order(tenant_id: str, chat_id: str, tool_input: dict, db: AsyncSession) -> dict:
     """
     Update an existing pending order.
 
@@ -66,7 +66,7 @@ def update_order(tenant_id: str, chat_id: str, tool_input: dict, db: Session) ->
         tenant_id: Tenant ID (e.g., "valdman")
         chat_id: Telegram/WhatsApp chat ID of the customer
         tool_input: Tool input with order_id, items, total, delivery_notes
-        db: Database session
+        db: Async database session
 
     Returns:
         dict: Result of the update attempt
@@ -77,15 +77,15 @@ def update_order(tenant_id: str, chat_id: str, tool_input: dict, db: Session) ->
         return {"success": False, "error": "No order ID provided"}
 
     # Verify customer exists
-    customer_repo = CustomerRepository(db)
-    customer = customer_repo.get_by_chat_id(tenant_id, chat_id)
+    customer_repo = AsyncCustomerRepository(db)
+    customer = await customer_repo.get_by_chat_id(tenant_id, chat_id)
 
     if not customer:
         return {"success": False, "error": "No orders found for this customer"}
 
     # Get the order
-    order_repo = OrderRepository(db)
-    order = order_repo.get_by_id(order_id)
+    order_repo = AsyncOrderRepository(db)
+    order = await order_repo.get_by_id(order_id)
 
     if not order:
         return {"success": False, "error": f"Order {order_id} not found"}
@@ -106,7 +106,7 @@ def update_order(tenant_id: str, chat_id: str, tool_input: dict, db: Session) ->
     total = tool_input.get("total", 0)
     delivery_notes = tool_input.get("delivery_notes") or order.delivery_notes
 
-    order_repo.update_order(order_id, items, total, delivery_notes)
+    await order_repo.update_order(order_id, items, total, delivery_notes)
 
     items_str = ", ".join([f"{i['quantity']} {i['product_name']}" for i in items])
     notes_str = f" | notes={delivery_notes}" if delivery_notes else ""